@@ -0,0 +1,461 @@
+"""! Local stand-in of Github repository API, for benchmarks and tests."""
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
+
+# login of the authenticated user, owner of /user/repos repositories.
+DEFAULT_LOGIN = "polytope"
+# default requests per token per window, as Github does for a PAT.
+DEFAULT_RATE_LIMIT = 5000
+# default seconds of a rate limit window.
+DEFAULT_RATE_LIMIT_WINDOW = 3600.0
+
+# template repository generated by GithubRepository.create.
+TEMPLATE_OWNER = "Studio-Polytope"
+TEMPLATE_NAME = "Polytope-repository-template"
+TEMPLATE_FILES = {"polytope.yaml": b"name: polytope\n"}
+
+# fields of GithubRepositoryConfig only used on creation.
+_CREATION_ONLY_FIELDS = ("auto_init", "gitignore_template", "license_template")
+
+
+class FakeGithubServer:
+    """! Local stand-in of Github repository API for load testing.
+
+    Serves template generation, /user/repos, repository GET/PATCH/DELETE
+    and contents from in-memory state, with Github-like rate limit
+    headers and ETags. Latency and errors can be injected on demand.
+    The Polytope template repository exists from the start.
+
+    Point a requester at base_url, e.g.
+    Requester(token, server.base_url, headers=GITHUB_API_HEADERS).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: int = DEFAULT_RATE_LIMIT,
+        rate_limit_window: float = DEFAULT_RATE_LIMIT_WINDOW,
+        login: str = DEFAULT_LOGIN,
+        clock: Callable[[], float] = time.time,
+        rand: Callable[[], float] = random.random,
+    ):
+        """! FakeGithubServer class initializer.
+
+        @param host                 Host to bind.
+        @param port                 Port to bind. 0 for any free port.
+        @param latency              Seconds slept before every response.
+        @param error_rate           Probability of answering error_status.
+        @param error_status         Status code of injected errors.
+        @param rate_limit           Requests per token per window.
+        @param rate_limit_window    Seconds of a rate limit window.
+        @param login                Login of the authenticated user.
+        @param clock                A function returning epoch seconds.
+        @param rand                 A function returning a float in [0, 1).
+        """
+        assert 0 <= latency
+        assert 0 <= error_rate <= 1
+        assert 0 < rate_limit
+
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.rate_limit: int = rate_limit
+        self.rate_limit_window: float = rate_limit_window
+        self.login: str = login
+        self._clock: Callable[[], float] = clock
+        self._rand: Callable[[], float] = rand
+
+        # lowercased "owner/name" -> repository JSON and files.
+        self._repositories: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Dict[str, bytes]] = {}
+        # token -> (window reset epoch, requests used in the window).
+        self._windows: Dict[str, Tuple[float, int]] = {}
+        self._failures: List[int] = []
+        self._requests_served: int = 0
+        self._lock = threading.Lock()
+        self._add_template()
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        setattr(self._httpd, "fake_github", self)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeGithubServer":
+        """! Serve requests on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """! Stop serving and release the port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeGithubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def requests_served(self) -> int:
+        with self._lock:
+            return self._requests_served
+
+    def add_repository(
+        self,
+        owner: str,
+        name: str,
+        files: Optional[Dict[str, bytes]] = None,
+        **fields,
+    ) -> Dict[str, Any]:
+        """! Add a repository to the state.
+
+        @param owner    Owner of the repository.
+        @param name     Name of the repository.
+        @param files    Root directory files, by name.
+        @param **fields Repository fields overriding defaults.
+        @return  Repository JSON.
+        """
+        with self._lock:
+            return self._add_repository(owner, name, files or {}, fields)
+
+    def repository(self, owner: str, name: str) -> Optional[Dict[str, Any]]:
+        """! Repository JSON, None if absent."""
+        with self._lock:
+            repository = self._repositories.get(_key(owner, name))
+            return dict(repository) if repository is not None else None
+
+    def fail_next(self, count: int = 1, status: Optional[int] = None) -> None:
+        """! Answer the next requests with an error.
+
+        @param count    Number of requests to fail.
+        @param status   Status code of the errors. error_status if None.
+        """
+        with self._lock:
+            self._failures.extend([status or self.error_status] * count)
+
+    def reset(self) -> None:
+        """! Drop state but the template, e.g. between load test runs."""
+        with self._lock:
+            self._repositories.clear()
+            self._files.clear()
+            self._windows.clear()
+            self._failures.clear()
+            self._add_template()
+
+    def _add_template(self) -> None:
+        self._add_repository(
+            TEMPLATE_OWNER,
+            TEMPLATE_NAME,
+            TEMPLATE_FILES,
+            {"is_template": True},
+        )
+
+    def _add_repository(
+        self,
+        owner: str,
+        name: str,
+        files: Dict[str, bytes],
+        fields: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        config = asdict(GithubRepositoryConfig(name))
+        for field in _CREATION_ONLY_FIELDS:
+            config.pop(field)
+        config.update(
+            (key, value) for key, value in fields.items() if key in config
+        )
+        config["name"] = name
+        repository = {
+            **config,
+            "full_name": f"{owner}/{name}",
+            "owner": {"login": owner},
+        }
+        self._repositories[_key(owner, name)] = repository
+        self._files[_key(owner, name)] = dict(files)
+        return dict(repository)
+
+    def _handle(
+        self, verb: str, path: str, token: str, body: bytes
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """! Answer a request. Returns status, headers and JSON body."""
+        with self._lock:
+            self._requests_served += 1
+            headers = self._charge(token)
+            if headers["X-RateLimit-Remaining"] == "-1":
+                headers["X-RateLimit-Remaining"] = "0"
+                return 403, headers, _error("API rate limit exceeded")
+
+            if self._failures:
+                status = self._failures.pop(0)
+                return status, headers, _error("Injected failure")
+            if self.error_rate and self._rand() < self.error_rate:
+                return self.error_status, headers, _error("Injected failure")
+
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                return 400, headers, _error("Problems parsing JSON")
+
+            status, payload = self._route(verb, path, data)
+            return status, headers, payload
+
+    def _charge(self, token: str) -> Dict[str, str]:
+        now = self._clock()
+        reset_at, used = self._windows.get(token, (0.0, 0))
+        if reset_at <= now:
+            reset_at, used = now + self.rate_limit_window, 0
+        self._windows[token] = (reset_at, used + 1)
+        return self._rate_limit_headers(reset_at, used + 1)
+
+    def _refund(self, token: str) -> Dict[str, str]:
+        """! Give back the charge of a request, e.g. answered by 304."""
+        with self._lock:
+            reset_at, used = self._windows[token]
+            used = max(0, used - 1)
+            self._windows[token] = (reset_at, used)
+            return self._rate_limit_headers(reset_at, used)
+
+    def _rate_limit_headers(
+        self, reset_at: float, used: int
+    ) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(
+                -1 if used > self.rate_limit else self.rate_limit - used
+            ),
+            "X-RateLimit-Used": str(min(used, self.rate_limit)),
+            "X-RateLimit-Reset": str(int(reset_at)),
+            "X-RateLimit-Resource": "core",
+        }
+
+    def _route(
+        self, verb: str, path: str, data: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        parts = [part for part in path.split("/") if part]
+
+        if verb == "POST" and parts == ["user", "repos"]:
+            return self._create(self.login, data, {})
+        if parts[:1] != ["repos"] or len(parts) < 3:
+            return 404, _error("Not Found")
+
+        owner, name = parts[1], parts[2]
+        if verb == "POST" and parts[3:] == ["generate"]:
+            template = self._repositories.get(_key(owner, name))
+            if template is None:
+                return 404, _error("Not Found")
+            return self._create(
+                data.get("owner", ""),
+                data,
+                self._files[_key(owner, name)],
+            )
+
+        key = _key(owner, name)
+        repository = self._repositories.get(key)
+        if repository is None:
+            return 404, _error("Not Found")
+
+        if parts[3:4] == ["contents"] and verb in ("GET", "HEAD"):
+            return self._contents(key, "/".join(parts[4:]))
+        if len(parts) > 3:
+            return 404, _error("Not Found")
+
+        if verb in ("GET", "HEAD"):
+            return 200, repository
+        if verb == "PATCH":
+            return self._update(key, repository, data)
+        if verb == "DELETE":
+            del self._repositories[key]
+            del self._files[key]
+            return 204, None
+        return 405, _error("Method Not Allowed")
+
+    def _create(
+        self, owner: str, data: Dict[str, Any], files: Dict[str, bytes]
+    ) -> Tuple[int, Any]:
+        name = data.get("name", "")
+        if not owner or not name:
+            return 422, _error(
+                "Validation Failed",
+                [{"resource": "Repository", "code": "missing_field"}],
+            )
+        if _key(owner, name) in self._repositories:
+            return 422, _error(
+                "Repository creation failed.",
+                [
+                    {
+                        "resource": "Repository",
+                        "code": "custom",
+                        "field": "name",
+                        "message": "name already exists on this account",
+                    }
+                ],
+            )
+        return 201, self._add_repository(owner, name, files, data)
+
+    def _update(
+        self, key: str, repository: Dict[str, Any], data: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        owner = repository["owner"]["login"]
+        name = data.get("name") or repository["name"]
+        new_key = _key(owner, name)
+        if new_key != key and new_key in self._repositories:
+            return 422, _error(
+                "Validation Failed",
+                [
+                    {
+                        "resource": "Repository",
+                        "code": "custom",
+                        "field": "name",
+                    }
+                ],
+            )
+
+        fields = {
+            field: value
+            for field, value in data.items()
+            if field in repository and field not in ("owner", "full_name")
+        }
+        files = self._files.pop(key)
+        del self._repositories[key]
+        updated = {**repository, **fields}
+        updated.pop("owner")
+        updated.pop("full_name")
+        return 200, self._add_repository(owner, name, files, updated)
+
+    def _contents(self, key: str, path: str) -> Tuple[int, Any]:
+        files = self._files[key]
+        if not path:
+            return 200, [
+                _file_entry(file_name, content, with_content=False)
+                for file_name, content in sorted(files.items())
+            ]
+        if path not in files:
+            return 404, _error("Not Found")
+        return 200, _file_entry(path, files[path], with_content=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """! Request handler of FakeGithubServer."""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, so Nagle would delay the body.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_HEAD(self) -> None:
+        self._dispatch("HEAD")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PATCH(self) -> None:
+        self._dispatch("PATCH")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, verb: str) -> None:
+        fake: FakeGithubServer = getattr(self.server, "fake_github")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        token = self.headers.get("Authorization", "").rsplit(" ", 1)[-1]
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        status, headers, payload = fake._handle(
+            verb, urlsplit(self.path).path, token, body
+        )
+
+        content_type = "application/json; charset=utf-8"
+        if (
+            "raw" in self.headers.get("Accept", "")
+            and isinstance(payload, dict)
+            and "content" in payload
+        ):
+            # files are served raw on request, directories stay JSON.
+            content = base64.b64decode(payload["content"])
+            content_type = "application/vnd.github.raw"
+        elif payload is None:
+            content = b""
+        else:
+            content = json.dumps(payload).encode()
+        if status == 200:
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, content = 304, b""
+                # Github does not charge 304 against the rate limit.
+                headers.update(fake._refund(token))
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if content:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if verb != "HEAD":
+            self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # keep load tests quiet.
+        pass
+
+
+# Github names are case-insensitive.
+def _key(owner: str, name: str) -> str:
+    return f"{owner}/{name}".lower()
+
+
+def _error(
+    message: str, errors: Optional[List[Dict[str, str]]] = None
+) -> Dict[str, Any]:
+    return {"message": message, "errors": errors or []}
+
+
+def _file_entry(
+    name: str, content: bytes, with_content: bool
+) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "type": "file",
+        "name": name.rsplit("/", 1)[-1],
+        "path": name,
+        "size": len(content),
+        "sha": hashlib.sha1(content).hexdigest(),
+    }
+    if with_content:
+        entry["encoding"] = "base64"
+        entry["content"] = base64.b64encode(content).decode()
+    return entry
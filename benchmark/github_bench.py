@@ -0,0 +1,438 @@
+"""! Benchmarks of hot paths of the Github client.
+
+Runs Requester, GithubRepository CRUD and response parsing against a mock
+session with injected latency, over payload sizes and concurrency levels.
+Reports throughput, p50/p99 latency and peak allocation per operation.
+With --server, CRUD also runs over HTTP against a local FakeGithubServer.
+
+Usage:
+    PYTHONPATH=src python benchmark/github_bench.py [--quick] [--server]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+
+With --compare, exits with status 1 if any case lost more throughput
+than the threshold against the baseline.
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import (
+    ConnectionPoolConfig,
+    MockSession,
+    RequestsSession,
+    Session,
+)
+from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+from polytope.github.repository.InternalCode import (
+    GithubRepositoryInternalCode as GHIC,
+)
+from polytope.github.repository.Repository import (
+    GITHUB_API_HEADERS,
+    GITHUB_API_URL,
+    GithubRepository,
+    parse_polytope_config_file,
+    post_process_error_response,
+)
+
+from fake_github_server import FakeGithubServer
+
+# default seconds of latency injected to every mocked request.
+DEFAULT_LATENCY = 0.001
+
+# payload sizes: entries of a contents listing, or errors of an error body.
+PAYLOAD_SIZES = (10, 1_000, 10_000)
+CONCURRENCY_LEVELS = (1, 8, 32)
+
+# operations per case, full and with --quick.
+OPERATIONS = 400
+QUICK_OPERATIONS = 50
+
+# operations traced for allocations, which is much slower.
+TRACED_OPERATIONS = 10
+
+
+@dataclass
+class CaseResult:
+    """! Measurements of a benchmark case."""
+
+    name: str
+    operations: int
+    seconds: float
+    throughput: float
+    p50: float
+    p99: float
+    # peak bytes allocated by one operation, traced single-threaded.
+    alloc_peak: int
+
+
+class FakeGithub:
+    """! Minimal in-memory Github API served through a MockSession."""
+
+    def __init__(self, latency: float = DEFAULT_LATENCY, listing_size=10):
+        self.latency = latency
+        self.listing = json.dumps(
+            [
+                {"type": "file", "name": f"file{i}.txt"}
+                for i in range(listing_size - 1)
+            ]
+            + [{"type": "file", "name": "polytope.yaml"}]
+        ).encode()
+        self.lock = threading.Lock()
+        self.repositories: Dict[str, Dict[str, Any]] = {}
+
+    def session(self) -> Session:
+        session = MockSession()
+        session.inject_request(self.serve)
+        return session
+
+    def serve(
+        self, verb: RequestVerb, url: str, **kwargs
+    ) -> requests.Response:
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = url.removeprefix(GITHUB_API_URL)
+        parts = path.strip("/").split("/")
+        data = json.loads(kwargs["data"]) if kwargs.get("data") else {}
+
+        with self.lock:
+            if verb == RequestVerb.POST and parts[-1] == "generate":
+                key = f"{data['owner']}/{data['name']}"
+                self.repositories[key] = data
+                return _response(201, data)
+            if parts[0] != "repos" or len(parts) < 3:
+                return _response(404, {"message": "Not Found", "errors": []})
+
+            key = f"{parts[1]}/{parts[2]}"
+            repository = self.repositories.get(key)
+            if repository is None:
+                return _response(404, {"message": "Not Found", "errors": []})
+            if len(parts) > 3 and parts[3] == "contents":
+                return _response(200, self.listing)
+            if verb == RequestVerb.GET:
+                return _response(200, repository)
+            if verb == RequestVerb.PATCH:
+                repository.update(data)
+                return _response(200, repository)
+            if verb == RequestVerb.DELETE:
+                del self.repositories[key]
+                return _response(204, None)
+        return _response(405, {"message": "Method Not Allowed", "errors": []})
+
+
+def _response(status_code: int, body: Any) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    if isinstance(body, bytes):
+        response._content = body
+    else:
+        response._content = b"" if body is None else json.dumps(body).encode()
+    return response
+
+
+def _error_response(size: int) -> requests.Response:
+    errors = [
+        {"resource": "Repository", "code": "custom", "field": f"f{i}"}
+        for i in range(size)
+    ]
+    return _response(422, {"message": "Validation Failed", "errors": errors})
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_case(
+    name: str,
+    operation: Callable[[int], Any],
+    operations: int,
+    concurrency: int = 1,
+) -> CaseResult:
+    """! Measure an operation called with indices 0..operations-1."""
+    latencies: List[float] = [0.0] * operations
+
+    def timed(i: int) -> None:
+        started = time.perf_counter()
+        operation(i)
+        latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        for i in range(operations):
+            timed(i)
+    else:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(timed, range(operations)))
+    seconds = time.perf_counter() - started
+
+    # allocations are traced apart, so tracing does not skew timings.
+    alloc_peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(operations, operations + TRACED_OPERATIONS):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            operation(i)
+            alloc_peak = max(
+                alloc_peak, tracemalloc.get_traced_memory()[1] - baseline
+            )
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return CaseResult(
+        name=name,
+        operations=operations,
+        seconds=seconds,
+        throughput=operations / seconds if seconds else float("inf"),
+        p50=_percentile(latencies, 0.5),
+        p99=_percentile(latencies, 0.99),
+        alloc_peak=alloc_peak,
+    )
+
+
+def bench_requester(
+    operations: int, latency: float, concurrency: int
+) -> CaseResult:
+    github = FakeGithub(latency)
+    github.repositories["owner/repo"] = {"name": "repo"}
+    requester = Requester(
+        Token("token"),
+        GITHUB_API_URL,
+        session=github.session(),
+        headers=GITHUB_API_HEADERS,
+    )
+    return run_case(
+        f"requester.get[c={concurrency}]",
+        lambda i: requester.request(RequestVerb.GET, "/repos/owner/repo"),
+        operations,
+        concurrency,
+    )
+
+
+def bench_crud(
+    operations: int, latency: float, concurrency: int, listing_size: int
+) -> CaseResult:
+    github = FakeGithub(latency, listing_size)
+    requester = Requester(
+        Token("token"),
+        GITHUB_API_URL,
+        session=github.session(),
+        headers=GITHUB_API_HEADERS,
+    )
+    # expire detection results at once, so every update and delete detects.
+    cache = PolytopeConfigFileCache(ttl=0)
+
+    def crud(i: int) -> None:
+        repository = GithubRepository(
+            "owner",
+            f"repo{i}",
+            Token("token"),
+            requester=requester,
+            config_file_cache=cache,
+        )
+        for response in (
+            repository.create(),
+            repository.get(),
+            repository.update(),
+            repository.delete(),
+        ):
+            assert response.internal_code == GHIC.Success, response
+
+    return run_case(
+        f"repository.crud[c={concurrency},listing={listing_size}]",
+        crud,
+        operations,
+        concurrency,
+    )
+
+
+def bench_server_crud(
+    operations: int, latency: float, concurrency: int
+) -> CaseResult:
+    with FakeGithubServer(latency=latency) as server:
+        pool_config = ConnectionPoolConfig(pool_maxsize=concurrency)
+        requester = Requester(
+            Token("token"),
+            server.base_url,
+            session=RequestsSession(pool_config),
+            headers=GITHUB_API_HEADERS,
+        )
+        cache = PolytopeConfigFileCache(ttl=0)
+
+        def crud(i: int) -> None:
+            repository = GithubRepository(
+                "owner",
+                f"repo{i}",
+                Token("token"),
+                requester=requester,
+                config_file_cache=cache,
+            )
+            for response in (
+                repository.create(),
+                repository.get(),
+                repository.update(),
+                repository.delete(),
+            ):
+                assert response.internal_code == GHIC.Success, response
+
+        return run_case(
+            f"server.crud[c={concurrency}]", crud, operations, concurrency
+        )
+
+
+def bench_parse_config(operations: int, size: int) -> CaseResult:
+    content = FakeGithub(0, size).listing
+    return run_case(
+        f"parse_polytope_config_file[entries={size}]",
+        lambda i: parse_polytope_config_file(content),
+        operations,
+    )
+
+
+def bench_error_response(operations: int, size: int) -> CaseResult:
+    response = _error_response(size)
+    return run_case(
+        f"post_process_error_response[errors={size}]",
+        lambda i: post_process_error_response(response, GHIC.FailedToUpdate),
+        operations,
+    )
+
+
+def run_all(
+    operations: int, latency: float, server: bool = False
+) -> List[CaseResult]:
+    results = []
+    for concurrency in CONCURRENCY_LEVELS:
+        results.append(bench_requester(operations, latency, concurrency))
+    for concurrency in CONCURRENCY_LEVELS:
+        for size in PAYLOAD_SIZES:
+            # each CRUD operation is four to six requests.
+            results.append(
+                bench_crud(max(operations // 4, 1), latency, concurrency, size)
+            )
+    if server:
+        for concurrency in CONCURRENCY_LEVELS:
+            results.append(
+                bench_server_crud(
+                    max(operations // 4, 1), latency, concurrency
+                )
+            )
+    for size in PAYLOAD_SIZES:
+        results.append(bench_parse_config(operations, size))
+    for size in PAYLOAD_SIZES:
+        results.append(bench_error_response(operations, size))
+    return results
+
+
+def print_results(
+    results: List[CaseResult], baseline: Optional[Dict[str, Any]] = None
+) -> None:
+    header = (
+        f"{'case':<48} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}"
+        f" {'alloc KiB':>10}"
+    )
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        line = (
+            f"{result.name:<48} {result.throughput:>10.1f}"
+            f" {result.p50 * 1000:>9.3f} {result.p99 * 1000:>9.3f}"
+            f" {result.alloc_peak / 1024:>10.1f}"
+        )
+        if baseline is not None:
+            base = baseline.get(result.name)
+            if base is not None and base["throughput"]:
+                ratio = result.throughput / base["throughput"]
+                line += f" {ratio:>7.2f}x"
+            else:
+                line += f" {'new':>8}"
+        print(line)
+
+
+def find_regressions(
+    results: List[CaseResult], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """! Names of cases losing more throughput than threshold."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None or not base["throughput"]:
+            continue
+        if result.throughput < base["throughput"] * (1 - threshold):
+            regressions.append(result.name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer operations per case"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY,
+        help="seconds of latency injected to every request",
+    )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="also run CRUD over HTTP against a local FakeGithubServer",
+    )
+    parser.add_argument("--save", help="save results as a baseline JSON")
+    parser.add_argument("--compare", help="compare with a baseline JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="throughput loss ratio reported as regression",
+    )
+    args = parser.parse_args(argv)
+
+    operations = QUICK_OPERATIONS if args.quick else OPERATIONS
+    results = run_all(operations, args.latency, args.server)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "latency": args.latency,
+                    "results": {
+                        result.name: asdict(result) for result in results
+                    },
+                },
+                f,
+                indent=2,
+            )
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name in regressions:
+            print(f"regression: {name}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
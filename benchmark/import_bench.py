@@ -0,0 +1,141 @@
+"""! Import time benchmark of Polytope modules.
+
+Imports each module in a fresh interpreter, so every run pays the full
+startup cost a CLI invocation or a worker process would pay.
+
+Usage:
+    PYTHONPATH=src python benchmark/import_bench.py [--runs 20]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+
+With --compare, exits with status 1 if any module got slower than the
+threshold against the baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+MODULES = (
+    "polytope",
+    "polytope.main",
+    "polytope.models",
+    "polytope.utils",
+    "polytope.github",
+    "polytope.github.Token",
+    "polytope.github.repository.RepositoryConfig",
+    "polytope.github.Requester",
+    "polytope.github.repository.Repository",
+)
+
+# heavy dependencies reported when an import loads them.
+HEAVY_MODULES = ("requests", "dotenv", "asyncio")
+
+RUNS = 20
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+@dataclass
+class ImportResult:
+    """! Import time of a module."""
+
+    module: str
+    # seconds, over fresh interpreters.
+    median: float
+    p90: float
+    # heavy dependencies loaded by the import.
+    heavy: List[str]
+
+
+def measure(module: str, runs: int) -> ImportResult:
+    probe = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    samples = []
+    heavy: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        samples.append(result["elapsed"])
+        heavy = result["heavy"]
+
+    samples.sort()
+    return ImportResult(
+        module=module,
+        median=statistics.median(samples),
+        p90=samples[min(int(0.9 * len(samples)), len(samples) - 1)],
+        heavy=heavy,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--runs", type=int, default=RUNS, help="interpreters per module"
+    )
+    parser.add_argument("--save", help="save results as a baseline JSON")
+    parser.add_argument("--compare", help="compare with a baseline JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="import time increase ratio reported as regression",
+    )
+    args = parser.parse_args(argv)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = [measure(module, args.runs) for module in MODULES]
+
+    regressions = []
+    print(f"{'module':<46} {'median ms':>10} {'p90 ms':>8}  loads")
+    for result in results:
+        line = (
+            f"{result.module:<46} {result.median * 1000:>10.2f}"
+            f" {result.p90 * 1000:>8.2f}  {', '.join(result.heavy) or '-'}"
+        )
+        base = baseline.get(result.module) if baseline is not None else None
+        if base is not None and base["median"]:
+            ratio = result.median / base["median"]
+            line += f"  {ratio:.2f}x"
+            if 1 + args.threshold < ratio:
+                regressions.append(result.module)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "results": {
+                        result.module: asdict(result) for result in results
+                    },
+                },
+                f,
+                indent=2,
+            )
+
+    for module in regressions:
+        print(f"regression: {module}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
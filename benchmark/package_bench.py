@@ -0,0 +1,133 @@
+"""! Benchmark of Polytope packages against JSON of dataclasses.
+
+Usage:
+    PYTHONPATH=src python benchmark/package_bench.py [--tests 100 1000]
+"""
+import argparse
+import io
+import json
+import sys
+import time
+from dataclasses import asdict
+from enum import Enum
+from typing import Any, Callable, List, Optional
+
+from polytope.models import (
+    PackageSection,
+    Problem,
+    ProblemChecker,
+    ProblemSolution,
+    ProblemSolutionType,
+    ProblemStatement,
+    ProblemTestRaw,
+    ProblemValidator,
+    SourceCode,
+    SourceCodeLanguage,
+    read_problem,
+    write_problem,
+)
+from polytope.utils import uuid_bulk
+
+DEFAULT_TESTS = [100, 1000]
+DEFAULT_TEST_SIZE = 4096
+REPEAT = 5
+
+
+def make_problem(tests: int, test_size: int) -> Problem:
+    line = "1000000000 -1000000000\n"
+    test_input = (line * (test_size // len(line) + 1))[:test_size]
+    ids = uuid_bulk(tests + 10)
+    return Problem(
+        _id=ids[0],
+        name="A + B",
+        note="",
+        time_limit_in_ms=1000,
+        memory_limit_in_mib=256,
+        tags=["math"],
+        owners=["polytope"],
+        statements={
+            "en": ProblemStatement(lang="en", context="Add. " * 200),
+        },
+        checker=ProblemChecker(),
+        validator=ProblemValidator(),
+        tests=[ProblemTestRaw(_id=_id, input=test_input) for _id in ids[10:]],
+        solutions=[
+            ProblemSolution(
+                _id=_id,
+                author="polytope",
+                name=f"solution {i}",
+                code=SourceCode(
+                    context="print(sum(map(int, input().split())))",
+                    lang=SourceCodeLanguage.Python3_10,
+                ),
+                type=ProblemSolutionType.Correct,
+            )
+            for i, _id in enumerate(ids[1:10])
+        ],
+    )
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    raise TypeError(type(value).__name__)
+
+
+def json_dump(problem: Problem) -> bytes:
+    return json.dumps(asdict(problem), default=json_default).encode()
+
+
+def package_dump(problem: Problem) -> bytes:
+    file = io.BytesIO()
+    write_problem(problem, file)
+    return file.getvalue()
+
+
+def measure(func: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tests", type=int, nargs="+", default=DEFAULT_TESTS)
+    parser.add_argument("--test-size", type=int, default=DEFAULT_TEST_SIZE)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<32} {'tests':>8} {'seconds':>9} {'bytes':>12}")
+    for tests in args.tests:
+        problem = make_problem(tests, args.test_size)
+        json_data = json_dump(problem)
+        package_data = package_dump(problem)
+
+        # JSON has no loader into dataclasses, so its load is parsing only.
+        cases = {
+            "json dump": (lambda: json_dump(problem), len(json_data)),
+            "json load": (lambda: json.loads(json_data), len(json_data)),
+            "package dump": (
+                lambda: package_dump(problem),
+                len(package_data),
+            ),
+            "package load": (
+                lambda: read_problem(io.BytesIO(package_data)),
+                len(package_data),
+            ),
+            "package load solutions": (
+                lambda: read_problem(
+                    io.BytesIO(package_data), [PackageSection.Solutions]
+                ),
+                len(package_data),
+            ),
+        }
+        for name, (func, size) in cases.items():
+            seconds = measure(func)
+            print(f"{name:<32} {tests:>8} {seconds:>9.4f} {size:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""! Benchmark of Polytope UUID generation.
+
+Usage:
+    PYTHONPATH=src python benchmark/uuid_bench.py [--counts 10000 1000000]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+
+from polytope.utils.uuidgen import PolytopeUUID, SortablePolytopeUUID
+
+DEFAULT_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def per_character(generator: PolytopeUUID, count: int) -> List[str]:
+    """! Reference: one random.choice per character, deduplicated by set."""
+    uuids: set = set()
+    while len(uuids) < count:
+        uuids.add(
+            "".join(
+                random.choice(generator.alphabet)
+                for _ in range(generator.length)
+            )
+        )
+    return list(uuids)
+
+
+def measure(func: Callable[[], List[str]]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=DEFAULT_COUNTS
+    )
+    args = parser.parse_args(argv)
+
+    generator = PolytopeUUID()
+    sortable = SortablePolytopeUUID()
+    print(f"{'case':<32} {'count':>10} {'seconds':>9} {'ids/s':>12}")
+    for count in args.counts:
+        cases = {
+            "uuid_bulk": lambda: generator.uuid_bulk(count),
+            "iter_uuids": lambda: list(generator.iter_uuids(count)),
+            "sortable uuid_bulk": lambda: sortable.uuid_bulk(count),
+            "per_character": lambda: per_character(generator, count),
+        }
+        for name, func in cases.items():
+            seconds = measure(func)
+            print(
+                f"{name:<32} {count:>10} {seconds:>9.3f}"
+                f" {count / seconds:>12.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
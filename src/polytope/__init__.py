@@ -1 +1,20 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
+
+# subpackages, imported on first access.
+_SUBPACKAGES = ("github", "models", "utils")
+
+if TYPE_CHECKING:
+    from . import github, models, utils  # noqa: F401
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f"{__name__}.{name}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_SUBPACKAGES))
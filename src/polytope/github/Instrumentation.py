@@ -0,0 +1,255 @@
+import bisect
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from polytope.github.RequestVerb import RequestVerb
+
+# upper bounds of latency histogram buckets, in seconds.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# path segments replaced by placeholders, so one endpoint is one metric.
+_ENDPOINT_PATTERNS = (
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{owner}/{repo}"),
+    (re.compile(r"^/orgs/[^/]+"), "/orgs/{org}"),
+    (re.compile(r"^/users/[^/]+"), "/users/{user}"),
+    (re.compile(r"/contents/.+$"), "/contents/{path}"),
+)
+
+
+@dataclass
+class RequestEvent:
+    """! Measurements of a request through a requester."""
+
+    verb: RequestVerb
+    # relative URL of API.
+    api_url: str
+    # normalized api_url, e.g. /repos/{owner}/{repo}.
+    endpoint: str
+    # status code of the final response. None if no response.
+    status_code: Optional[int] = None
+    # exception raised instead of a response.
+    error: Optional[str] = None
+    # body bytes sent, and received (Content-Length if streamed).
+    bytes_out: int = 0
+    bytes_in: int = 0
+    # requests sent to the session, including retries and requeues.
+    attempts: int = 0
+    # retries after transient failures.
+    retries: int = 0
+    # whether the response was served from the response cache.
+    from_cache: bool = False
+    # whether the response was shared from an identical request in flight.
+    coalesced: bool = False
+    # seconds from start to end of the request in the requester.
+    total_time: float = 0.0
+    # seconds spent in the session, i.e. on the network.
+    network_time: float = 0.0
+    # seconds slept before retries.
+    retry_wait: float = 0.0
+    # seconds held by the rate limit scheduler.
+    rate_limit_wait: float = 0.0
+    # monotonic clock time at start.
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def overhead_time(self) -> float:
+        """! Seconds spent in the requester itself, outside network and waits."""
+        return max(
+            self.total_time
+            - self.network_time
+            - self.retry_wait
+            - self.rate_limit_wait,
+            0.0,
+        )
+
+
+class Instrument:
+    """! Hooks called around every request of a requester.
+
+    Hooks run on the requesting thread, so they must be cheap and
+    thread-safe. Exceptions raised by hooks propagate to the caller.
+    """
+
+    def before_request(self, event: RequestEvent) -> None:
+        """! Called before a request is sent. Only request fields are set."""
+
+    def after_request(self, event: RequestEvent) -> None:
+        """! Called after a request finished, successfully or not."""
+
+
+class MetricsAggregator(Instrument):
+    """! In-memory aggregator of request metrics per endpoint.
+
+    Keeps counters and a fixed-bucket latency histogram per endpoint,
+    so recording a request costs a few additions.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        """! MetricsAggregator class initializer.
+
+        @param buckets  Ascending upper bounds of latency buckets, in seconds.
+        """
+        assert list(buckets) == sorted(buckets)
+
+        self.buckets: Tuple[float, ...] = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """! Drop all recorded metrics."""
+        with self._lock:
+            self._endpoints: Dict[str, _EndpointMetrics] = {}
+            self._started_at: float = time.monotonic()
+
+    def after_request(self, event: RequestEvent) -> None:
+        key = f"{event.verb} {event.endpoint}"
+        with self._lock:
+            metrics = self._endpoints.get(key)
+            if metrics is None:
+                metrics = _EndpointMetrics(len(self.buckets) + 1)
+                self._endpoints[key] = metrics
+            metrics.record(
+                event, bisect.bisect_left(self.buckets, event.total_time)
+            )
+
+    def quantile(self, endpoint: str, q: float) -> Optional[float]:
+        """! Estimate a latency quantile from the histogram.
+
+        @param endpoint     "VERB /normalized/endpoint" key.
+        @param q            Quantile in [0, 1].
+        @return  Upper bound of the bucket holding the quantile.
+                 None if no request, infinity for the overflow bucket.
+        """
+        assert 0 <= q <= 1
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None or metrics.count == 0:
+                return None
+            histogram = list(metrics.histogram)
+            count = metrics.count
+
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(histogram):
+            seen += bucket_count
+            if rank <= seen and bucket_count:
+                break
+        return self.buckets[i] if i < len(self.buckets) else float("inf")
+
+    def export(self) -> Dict[str, Any]:
+        """! Snapshot of all metrics as plain data, e.g. for JSON."""
+        with self._lock:
+            endpoints = {
+                key: metrics.export()
+                for key, metrics in self._endpoints.items()
+            }
+            elapsed = time.monotonic() - self._started_at
+
+        for key, exported in endpoints.items():
+            exported["p50"] = self.quantile(key, 0.5)
+            exported["p99"] = self.quantile(key, 0.99)
+
+        return {
+            "elapsed": elapsed,
+            "buckets": list(self.buckets),
+            "endpoints": endpoints,
+        }
+
+
+class _EndpointMetrics:
+    """! Counters of an endpoint."""
+
+    def __init__(self, bucket_count: int) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.from_cache: int = 0
+        self.coalesced: int = 0
+        self.attempts: int = 0
+        self.retries: int = 0
+        self.bytes_out: int = 0
+        self.bytes_in: int = 0
+        self.total_time: float = 0.0
+        self.network_time: float = 0.0
+        self.retry_wait: float = 0.0
+        self.rate_limit_wait: float = 0.0
+        self.max_time: float = 0.0
+        self.statuses: Dict[str, int] = {}
+        self.histogram: List[int] = [0] * bucket_count
+
+    def record(self, event: RequestEvent, bucket: int) -> None:
+        self.count += 1
+        self.errors += int(event.error is not None)
+        self.from_cache += int(event.from_cache)
+        self.coalesced += int(event.coalesced)
+        self.attempts += event.attempts
+        self.retries += event.retries
+        self.bytes_out += event.bytes_out
+        self.bytes_in += event.bytes_in
+        self.total_time += event.total_time
+        self.network_time += event.network_time
+        self.retry_wait += event.retry_wait
+        self.rate_limit_wait += event.rate_limit_wait
+        self.max_time = max(self.max_time, event.total_time)
+        status = str(event.status_code)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.histogram[bucket] += 1
+
+    def export(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "from_cache": self.from_cache,
+            "coalesced": self.coalesced,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "total_time": self.total_time,
+            "network_time": self.network_time,
+            "retry_wait": self.retry_wait,
+            "rate_limit_wait": self.rate_limit_wait,
+            "overhead_time": max(
+                self.total_time
+                - self.network_time
+                - self.retry_wait
+                - self.rate_limit_wait,
+                0.0,
+            ),
+            "max_time": self.max_time,
+            "statuses": dict(self.statuses),
+            "histogram": list(self.histogram),
+        }
+
+
+def normalize_endpoint(api_url: str) -> str:
+    """! Replace names in a relative API URL by placeholders, dropping query."""
+    endpoint = api_url.split("?", 1)[0]
+    for pattern, placeholder in _ENDPOINT_PATTERNS:
+        endpoint = pattern.sub(placeholder, endpoint)
+    return endpoint
+
+
+def body_size(kwargs: Dict[str, Any]) -> int:
+    """! Size of a request body given as requests arguments."""
+    data = kwargs.get("data")
+    if isinstance(data, str):
+        return len(data.encode())
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return 0
@@ -0,0 +1,219 @@
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Hashable, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+# default fraction of the limit below which requests are spread evenly.
+DEFAULT_PACE_THRESHOLD = 0.1
+# default longest time to hold a request for the budget, in seconds.
+DEFAULT_MAX_WAIT = 60.0
+
+# rate limit resources of Github, each with its own budget.
+CORE_RESOURCE = "core"
+GRAPHQL_RESOURCE = "graphql"
+SEARCH_RESOURCE = "search"
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    """! Rate limit budget of a token for a resource, as reported by Github."""
+
+    # maximum number of requests per window. None if not reported yet.
+    limit: Optional[int] = None
+    # requests left in the current window. None if not reported yet.
+    remaining: Optional[int] = None
+    # epoch seconds when the window resets.
+    reset_at: Optional[float] = None
+    # epoch seconds until which Github asked to hold requests (Retry-After).
+    retry_after_until: Optional[float] = None
+    # rate limit resource of the last response (core, search, graphql, ...).
+    resource: Optional[str] = None
+
+
+class RateLimiter:
+    """! Rate-limit-aware request scheduler.
+
+    Tracks the budget of each key, e.g. a (token, resource) pair, from
+    response headers, and holds requests before they would exceed it:
+
+    * while a Retry-After period is running, requests wait for its end.
+    * when the budget is exhausted, requests wait for the window reset.
+    * when the budget falls below a threshold, requests are spread evenly
+      over the rest of the window.
+    """
+
+    def __init__(
+        self,
+        pace_threshold: float = DEFAULT_PACE_THRESHOLD,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """! RateLimiter class initializer.
+
+        @param pace_threshold   Fraction of the limit below which requests are paced.
+        @param max_wait         Longest time to hold a request. Longer waits are skipped.
+        @param clock            A function returning epoch seconds.
+        @param sleep            A function sleeping for given seconds.
+        """
+        assert 0 <= pace_threshold <= 1
+        assert 0 <= max_wait
+
+        self.pace_threshold: float = pace_threshold
+        self.max_wait: float = max_wait
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+
+        self._budgets: Dict[Hashable, RateLimitBudget] = {}
+        self._next_slot: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, key: Hashable) -> RateLimitBudget:
+        """! Current budget of a key.
+
+        @param key  A budget key, e.g. (token, resource).
+        """
+        with self._lock:
+            return self._budgets.get(key, RateLimitBudget())
+
+    def delay(self, key: Hashable) -> float:
+        """! Seconds a request of a key should wait before it is sent.
+
+        @param key  A budget key, e.g. (token, resource).
+        """
+        with self._lock:
+            return self._delay(key, self._clock())
+
+    def acquire(self, key: Hashable) -> float:
+        """! Hold until a request of a key may be sent, and reserve it.
+
+        Waits longer than max_wait are skipped, so the request is sent
+        right away and fails on Github side.
+
+        @param key  A budget key, e.g. (token, resource).
+        @return  Seconds waited.
+        """
+        with self._lock:
+            now = self._clock()
+            wait = self._delay(key, now)
+            if wait > self.max_wait:
+                wait = 0.0
+
+            budget = self._budgets.get(key)
+            if budget is not None:
+                if budget.remaining is not None and budget.remaining > 0:
+                    # Count the request in advance, so concurrent callers
+                    # see the budget it is going to consume.
+                    budget = replace(budget, remaining=budget.remaining - 1)
+                self._budgets[key] = budget
+                self._next_slot[key] = (
+                    now + wait + self._interval(budget, now + wait)
+                )
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def update(self, key: Hashable, response: requests.Response) -> None:
+        """! Update the budget of a key from response headers.
+
+        @param key      A budget key, e.g. (token, resource).
+        @param response A response of Github API.
+        """
+        headers = response.headers
+        with self._lock:
+            now = self._clock()
+            budget = self._budgets.get(key, RateLimitBudget())
+
+            limit = _int_header(headers, "X-RateLimit-Limit")
+            remaining = _int_header(headers, "X-RateLimit-Remaining")
+            reset = _int_header(headers, "X-RateLimit-Reset")
+            if limit is not None:
+                budget = replace(budget, limit=limit)
+            if remaining is not None:
+                budget = replace(budget, remaining=remaining)
+            if reset is not None:
+                budget = replace(budget, reset_at=float(reset))
+            if "X-RateLimit-Resource" in headers:
+                budget = replace(
+                    budget, resource=headers["X-RateLimit-Resource"]
+                )
+
+            retry_after = _int_header(headers, "Retry-After")
+            if retry_after is not None:
+                budget = replace(budget, retry_after_until=now + retry_after)
+
+            self._budgets[key] = budget
+
+    def should_requeue(
+        self, key: Hashable, response: requests.Response
+    ) -> bool:
+        """! Whether a rate-limited response is worth sending again.
+
+        @param key      A budget key, e.g. (token, resource).
+        @param response A response already passed to update.
+        """
+        return is_rate_limited(response) and self.delay(key) <= self.max_wait
+
+    def _delay(self, key: Hashable, now: float) -> float:
+        budget = self._budgets.get(key)
+        if budget is None:
+            return 0.0
+
+        wait = 0.0
+        if budget.retry_after_until is not None:
+            wait = max(wait, budget.retry_after_until - now)
+        if (
+            budget.remaining is not None
+            and budget.remaining <= 0
+            and budget.reset_at is not None
+        ):
+            wait = max(wait, budget.reset_at - now)
+        wait = max(wait, self._next_slot.get(key, now) - now)
+        return max(wait, 0.0)
+
+    def _interval(self, budget: RateLimitBudget, now: float) -> float:
+        if (
+            budget.limit is None
+            or budget.remaining is None
+            or budget.reset_at is None
+            or budget.remaining > budget.limit * self.pace_threshold
+        ):
+            return 0.0
+        return max(budget.reset_at - now, 0.0) / max(budget.remaining, 1)
+
+
+def rate_limit_resource(api_url: str) -> str:
+    """! Rate limit resource a request counts against, from its API path.
+
+    @param api_url  A path of Github API, e.g. "/graphql".
+    """
+    path = urlsplit(api_url).path.rstrip("/")
+    if path == "/graphql":
+        return GRAPHQL_RESOURCE
+    if path.startswith("/search/"):
+        return SEARCH_RESOURCE
+    return CORE_RESOURCE
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    """! Whether a response is a rejection by primary or secondary rate limit."""
+    if response.status_code not in (403, 429):
+        return False
+    return (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
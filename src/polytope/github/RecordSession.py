@@ -0,0 +1,286 @@
+import base64
+import collections
+import datetime
+import gzip
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import RequestsSession, Session
+
+RECORDING_FORMAT = "polytope-recording"
+RECORDING_VERSION = 1
+
+
+@dataclass
+class RecordedExchange:
+    """! A request and its response, as recorded."""
+
+    verb: str
+    url: str
+    # query parameters, None if not given.
+    params: Optional[Dict[str, Any]]
+    # SHA-256 of the request body, None if no body.
+    body_digest: Optional[str]
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+    # seconds from sending the request to receiving the whole response.
+    latency: float = 0.0
+    # seconds from start of recording to sending the request.
+    offset: float = 0.0
+
+    @property
+    def key(self) -> Tuple[str, str, str, Optional[str]]:
+        """! Key matching a replayed request to this exchange."""
+        return _request_key(self.verb, self.url, self.params, self.body_digest)
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.url = self.url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.elapsed = datetime.timedelta(seconds=self.latency)
+        return response
+
+
+class RecordingSession(Session):
+    """! A session recording requests and responses of a wrapped session.
+
+    Bodies of streamed responses are read in full to be recorded.
+    """
+
+    def __init__(
+        self,
+        SessionClass: Type[Session] = RequestsSession,
+        session: Optional[Session] = None,
+    ):
+        """! RecordingSession class initializer.
+
+        @param SessionClass     A session class to wrap.
+        @param session          A session instance to wrap instead of creating one.
+        """
+        if session is None:
+            session = SessionClass()
+        self._session: Session = session
+        self._exchanges: List[RecordedExchange] = []
+        self._started_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        verb: RequestVerb,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """! Request through the wrapped session, recording the exchange.
+
+        @param verb     A HTTPS verb.
+        @param url      A full-path URL.
+        @param **kwargs Additional arguments for requesting.
+        @return  A response.
+        """
+        sent_at = time.monotonic()
+        response = self._session.request(verb, url, **kwargs)
+        content = response.content or b""
+        latency = time.monotonic() - sent_at
+
+        exchange = RecordedExchange(
+            verb=str(verb),
+            url=url,
+            params=kwargs.get("params"),
+            body_digest=_body_digest(kwargs.get("data")),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=content.encode() if isinstance(content, str) else content,
+            latency=latency,
+            offset=sent_at - self._started_at,
+        )
+        with self._lock:
+            self._exchanges.append(exchange)
+        return response
+
+    def save(self, path: str) -> None:
+        """! Save recorded exchanges to a gzip-compressed JSON lines file."""
+        save_recording(path, self.exchanges)
+
+    @property
+    def exchanges(self) -> List[RecordedExchange]:
+        with self._lock:
+            return list(self._exchanges)
+
+    @property
+    def headers(self):
+        return self._session.headers
+
+    @headers.setter
+    def headers(self, value):
+        self._session.headers = value
+
+
+class ReplaySession(Session):
+    """! A session answering requests with recorded responses.
+
+    Requests are matched by verb, URL, query parameters and body. Identical
+    requests get their recorded responses in recorded order.
+
+    With a speed, a response is held until its recorded offset from the
+    first recorded request, counted from the first replayed request, and
+    then for its recorded latency. Think time between recorded requests
+    is replayed as well, while a client slower than the recording is
+    never held further.
+    """
+
+    def __init__(
+        self,
+        exchanges: List[RecordedExchange],
+        speed: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """! ReplaySession class initializer.
+
+        @param exchanges    Recorded exchanges to replay.
+        @param speed        Replay speed relative to the recording.
+                            1.0 for recorded speed, None for as fast as possible.
+        @param clock        A function returning current time in seconds.
+        @param sleep        A function sleeping for given seconds.
+        """
+        assert speed is None or 0 < speed
+
+        self.speed: Optional[float] = speed
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+        # recorded offset of the first exchange, and when replay started.
+        self._first_offset: float = min(
+            (exchange.offset for exchange in exchanges), default=0.0
+        )
+        self._replay_started_at: Optional[float] = None
+        self._headers: CaseInsensitiveDict = CaseInsensitiveDict()
+        self._queues: Dict[
+            Tuple[str, str, str, Optional[str]], Deque[RecordedExchange]
+        ] = collections.defaultdict(collections.deque)
+        for exchange in exchanges:
+            self._queues[exchange.key].append(exchange)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path: str, speed: Optional[float] = None) -> "ReplaySession":
+        """! Create a replay session from a recording file."""
+        return ReplaySession(load_recording(path), speed)
+
+    def request(
+        self,
+        verb: RequestVerb,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """! Answer a request with its recorded response.
+
+        @param verb     A HTTPS verb.
+        @param url      A full-path URL.
+        @param **kwargs Additional arguments for requesting.
+        @return  A response.
+        @exception LookupError  if no recorded response is left for the request.
+        """
+        key = _request_key(
+            str(verb),
+            url,
+            kwargs.get("params"),
+            _body_digest(kwargs.get("data")),
+        )
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise LookupError(f"no recorded response for {verb} {url}")
+            exchange = queue.popleft()
+            if self._replay_started_at is None:
+                self._replay_started_at = self._clock()
+            started_at = self._replay_started_at
+
+        if self.speed is not None:
+            offset = (exchange.offset - self._first_offset) / self.speed
+            think_time = started_at + offset - self._clock()
+            self._sleep(max(0.0, think_time) + exchange.latency / self.speed)
+        return exchange.to_response()
+
+    @property
+    def remaining(self) -> int:
+        """! Number of recorded responses not replayed yet."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = value
+
+
+def save_recording(path: str, exchanges: List[RecordedExchange]) -> None:
+    """! Save exchanges to a gzip-compressed JSON lines file.
+
+    The first line is a header, and each following line is an exchange.
+    """
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        header = {"format": RECORDING_FORMAT, "version": RECORDING_VERSION}
+        f.write(json.dumps(header) + "\n")
+        for exchange in exchanges:
+            line = asdict(exchange)
+            line["content"] = base64.b64encode(exchange.content).decode()
+            f.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+
+def load_recording(path: str) -> List[RecordedExchange]:
+    """! Load exchanges saved by save_recording.
+
+    @exception ValueError   if the file is not a recording of this version.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != (
+            RECORDING_FORMAT
+        ):
+            raise ValueError(f"'{path}' is not a Polytope recording")
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(
+                f"unsupported recording version: {header.get('version')}"
+            )
+
+        exchanges = []
+        for line in f:
+            fields = json.loads(line)
+            fields["content"] = base64.b64decode(fields["content"])
+            exchanges.append(RecordedExchange(**fields))
+        return exchanges
+
+
+def _request_key(
+    verb: str,
+    url: str,
+    params: Optional[Dict[str, Any]],
+    digest: Optional[str],
+) -> Tuple[str, str, str, Optional[str]]:
+    return verb, url, json.dumps(params, sort_keys=True, default=str), digest
+
+
+def _body_digest(data: Any) -> Optional[str]:
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode()
+    if not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(data).hexdigest()
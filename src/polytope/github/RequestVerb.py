@@ -26,3 +26,13 @@ class RequestVerb(str, Enum):
     PUT = auto()
     DELETE = auto()
     PATCH = auto()
+
+    @property
+    def is_idempotent(self) -> bool:
+        """! Whether repeating the request has the same effect as sending it once."""
+        return self in (
+            RequestVerb.GET,
+            RequestVerb.HEAD,
+            RequestVerb.PUT,
+            RequestVerb.DELETE,
+        )
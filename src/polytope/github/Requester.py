@@ -1,11 +1,55 @@
-from typing import Type, Optional, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Type,
+    Optional,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+)
 
+import copy
+import functools
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
 import requests
+from requests.structures import CaseInsensitiveDict
+from polytope.github.Instrumentation import (
+    Instrument,
+    RequestEvent,
+    body_size,
+    normalize_endpoint,
+)
+from polytope.github.RateLimit import (
+    CORE_RESOURCE,
+    RateLimitBudget,
+    RateLimiter,
+    rate_limit_resource,
+)
 from polytope.github.RequestVerb import RequestVerb
+from polytope.github.ResponseCache import (
+    CachedResponse,
+    ResponseCache,
+    cache_key,
+)
+from polytope.github.Retry import RetryPolicy, RetryStats, RetryStatsCounter
 
-from polytope.github.Session import RequestsSession, Session
+from polytope.github.Session import AsyncSession, RequestsSession, Session
 from polytope.github.Token import Token
 
+T = TypeVar("T")
+
+# default number of times a rate-limited request is sent again.
+DEFAULT_MAX_REQUEUE = 2
+# default number of items per page of list endpoints. Maximum of Github.
+DEFAULT_PER_PAGE = 100
+
 
 class Requester:
     """! API request wrapper class."""
@@ -16,6 +60,13 @@ class Requester:
         base_url: str,
         SessionClass: Type[Session] = RequestsSession,
         headers: Optional[Dict[str, str]] = None,
+        session: Optional[Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_requeue: int = DEFAULT_MAX_REQUEUE,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        instruments: Optional[List[Instrument]] = None,
+        coalesce_requests: bool = False,
     ):
         """! Requester class initializer.
 
@@ -23,13 +74,42 @@ class Requester:
         @param base_url         A base URL of API.
         @param SessionClass     A class to use for a session.
         @param headers          Additional headers other than Authorization to fix in session.
+        @param session          A session instance to use instead of creating one from SessionClass.
+        @param rate_limiter     A scheduler tracking rate limit budgets. Share one to share budgets.
+        @param max_requeue      Number of times a rate-limited request is sent again.
+        @param retry_policy     A policy to retry transient failures.
+        @param cache            A cache of GET/HEAD responses revalidated by conditional requests.
+        @param instruments      Hooks called around every request.
+        @param coalesce_requests    Share one in-flight request among concurrent identical GET/HEAD requests.
         """
         assert 0 < len(base_url)
 
         self._token: Token = token
         self._base_url: str = base_url
 
-        self._session: Session = SessionClass()
+        if session is None:
+            session = SessionClass()
+        self._session: Session = session
+
+        assert 0 <= max_requeue
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+        self._rate_limiter: RateLimiter = rate_limiter
+        self.max_requeue: int = max_requeue
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self._retry_policy: RetryPolicy = retry_policy
+        self._retry_stats = RetryStatsCounter()
+
+        self._cache: Optional[ResponseCache] = cache
+        self._instruments: List[Instrument] = list(instruments or [])
+
+        self.coalesce_requests: bool = coalesce_requests
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._coalesced: int = 0
+
         self._session.headers["Authorization"] = self._token.token
 
         if headers:
@@ -42,13 +122,26 @@ class Requester:
         self,
         verb: RequestVerb,
         api_url: str,
+        *,
+        allow_retry: Optional[bool] = None,
         **kwargs,
     ) -> requests.Response:
         """! API request wrapper with token authorization.
 
-        @param verb     A HTTPS verb.
-        @param api_url  A relative URL of API starting with '/'.
-        @param **kwargs Additional arguments for requesting.
+        Requests are held while the rate limit budget of the token is
+        exhausted, and rate-limited responses are sent again after waiting.
+        Transient failures (connection errors and retry statuses of the
+        policy) are retried with backoff when the request allows it.
+        With a cache, GET/HEAD requests are sent with validators of the
+        cached response, and 304 Not Modified is answered from the cache.
+        With coalesce_requests, a GET/HEAD request identical to one in
+        flight waits for it and gets a copy of its response instead.
+        Instruments are called before and after the request.
+
+        @param verb         A HTTPS verb.
+        @param api_url      A relative URL of API starting with '/'.
+        @param allow_retry  Whether to retry transient failures. None to retry idempotent verbs only.
+        @param **kwargs     Additional arguments for requesting.
 
         @return  A response.
         """
@@ -56,8 +149,473 @@ class Requester:
         assert "/" == api_url[0]
 
         url: str = self._base_url + api_url
-        return self._session.request(verb, url, **kwargs)
+
+        event = RequestEvent(
+            verb=verb,
+            api_url=api_url,
+            endpoint=normalize_endpoint(api_url),
+            bytes_out=body_size(kwargs),
+        )
+        for instrument in self._instruments:
+            instrument.before_request(event)
+
+        response: Optional[requests.Response] = None
+        try:
+            response = self._coalesce(verb, url, allow_retry, kwargs, event)
+            return response
+        finally:
+            event.total_time = time.monotonic() - event.started_at
+            if response is None:
+                event.error = repr(sys.exc_info()[1])
+            else:
+                event.status_code = response.status_code
+                event.bytes_in = _received_size(response, kwargs)
+            for instrument in self._instruments:
+                instrument.after_request(event)
+
+    def _coalesce(
+        self,
+        verb: RequestVerb,
+        url: str,
+        allow_retry: Optional[bool],
+        kwargs: Dict,
+        event: RequestEvent,
+    ) -> requests.Response:
+        """! Send a request, or share an identical one in flight."""
+        key = self._flight_key(verb, url, kwargs)
+        if key is None:
+            return self._request(verb, url, allow_retry, kwargs, event)
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            event.coalesced = True
+            return flight.wait()
+
+        try:
+            response = self._request(verb, url, allow_retry, kwargs, event)
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        else:
+            flight.land(response)
+            return response
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+
+    def _flight_key(
+        self, verb: RequestVerb, url: str, kwargs: Dict
+    ) -> Optional[str]:
+        """! Key of identical requests, None if the request is not shared.
+
+        Only GET/HEAD requests without body are shared, and streamed
+        responses cannot be read twice, so streamed requests are not.
+        """
+        if not self.coalesce_requests or verb not in (
+            RequestVerb.GET,
+            RequestVerb.HEAD,
+        ):
+            return None
+        if kwargs.get("stream") or kwargs.get("data") is not None:
+            return None
+
+        return json.dumps(
+            [
+                str(verb),
+                url,
+                kwargs.get("params"),
+                sorted((kwargs.get("headers") or {}).items()),
+                {k: v for k, v in kwargs.items() if k not in _FLIGHT_KWARGS},
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+    def _request(
+        self,
+        verb: RequestVerb,
+        url: str,
+        allow_retry: Optional[bool],
+        kwargs: Dict,
+        event: RequestEvent,
+    ) -> requests.Response:
+        """! Send a request through the response cache."""
+        entry_key = self._cache_key(verb, url, kwargs)
+        if entry_key is None:
+            return self._send(verb, url, allow_retry, kwargs, event)
+
+        assert self._cache is not None
+        entry = self._cache.get(entry_key)
+        if entry is not None:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                **entry.conditional_headers(),
+            }
+
+        response = self._send(verb, url, allow_retry, kwargs, event)
+
+        if entry is not None and response.status_code == 304:
+            self._cache.record(hit=True)
+            event.from_cache = True
+            return entry.to_response(url, response)
+
+        self._cache.record(hit=False)
+        if response.status_code == 200:
+            new_entry = CachedResponse.from_response(response)
+            if new_entry is not None:
+                self._cache.set(entry_key, new_entry)
+        return response
+
+    def _cache_key(
+        self, verb: RequestVerb, url: str, kwargs: Dict
+    ) -> Optional[str]:
+        """! Cache key of a request, None if the request bypasses cache.
+
+        Streamed requests and requests with caller's own validators bypass cache.
+        """
+        if self._cache is None or verb not in (
+            RequestVerb.GET,
+            RequestVerb.HEAD,
+        ):
+            return None
+        if kwargs.get("stream"):
+            return None
+
+        headers = {k.lower() for k in (kwargs.get("headers") or {})}
+        if headers & {"if-none-match", "if-modified-since"}:
+            return None
+
+        return cache_key(self._token.token, verb, url, kwargs.get("params"))
+
+    def _send(
+        self,
+        verb: RequestVerb,
+        url: str,
+        allow_retry: Optional[bool],
+        kwargs: Dict,
+        event: RequestEvent,
+    ) -> requests.Response:
+        """! Send a request with rate limit scheduling and retries."""
+        # Github keeps a budget per resource, e.g. GraphQL apart from REST.
+        api_url = url
+        if url.startswith(self._base_url):
+            prefix = len(self._base_url)
+            api_url = url[prefix:]
+        key: Tuple[str, str] = (
+            self._token.token,
+            rate_limit_resource(api_url),
+        )
+        retryable: bool = self._retry_policy.allows(verb, allow_retry)
+
+        attempts = 0
+        retries = 0
+        retry_wait = 0.0
+        requeued = 0
+        while True:
+            event.rate_limit_wait += self._rate_limiter.acquire(key)
+            attempts += 1
+            event.attempts = attempts
+            sent_at = time.monotonic()
+            try:
+                response = self._session.request(verb, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                event.network_time += time.monotonic() - sent_at
+                delay = (
+                    self._retry_policy.wait(retries, retry_wait)
+                    if retryable
+                    else None
+                )
+                if delay is None:
+                    self._retry_stats.record(
+                        attempts, retries, retry_wait, exhausted=retryable
+                    )
+                    raise
+                retries += 1
+                retry_wait += delay
+                event.retries, event.retry_wait = retries, retry_wait
+                continue
+
+            event.network_time += time.monotonic() - sent_at
+            self._rate_limiter.update(key, response)
+
+            if requeued < self.max_requeue and (
+                self._rate_limiter.should_requeue(key, response)
+            ):
+                requeued += 1
+                # a streamed body is never read, release its connection.
+                close_response(response)
+                continue
+
+            if (
+                retryable
+                and response.status_code in self._retry_policy.retry_statuses
+            ):
+                delay = self._retry_policy.wait(retries, retry_wait)
+                if delay is not None:
+                    retries += 1
+                    retry_wait += delay
+                    event.retries, event.retry_wait = retries, retry_wait
+                    close_response(response)
+                    continue
+                self._retry_stats.record(
+                    attempts, retries, retry_wait, exhausted=True
+                )
+                return response
+
+            self._retry_stats.record(
+                attempts, retries, retry_wait, exhausted=False
+            )
+            return response
+
+    def paginate(
+        self,
+        api_url: str,
+        *,
+        per_page: int = DEFAULT_PER_PAGE,
+        max_items: Optional[int] = None,
+        items_key: Optional[str] = None,
+        prefetch: bool = True,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """! Iterate items of a list endpoint across pages.
+
+        Pages are followed by `Link: rel="next"` headers and fetched lazily.
+        With prefetch, the next page is requested while the caller works
+        on items of the current one.
+
+        @param api_url      A relative URL of API starting with '/'.
+        @param per_page     Number of items per page.
+        @param max_items    Maximum number of items to yield. All items if None.
+        @param items_key    Key of the item list if pages are objects (e.g. "items" of search).
+        @param prefetch     Fetch the next page in background.
+        @param **kwargs     Additional arguments for requesting. params are sent with the first page.
+        @exception requests.HTTPError   if a page is not fetched successfully.
+        """
+        assert 0 < per_page
+        assert max_items is None or 0 <= max_items
+
+        params = {**(kwargs.pop("params", None) or {}), "per_page": per_page}
+
+        def fetch(page_url: str, page_params: Optional[Dict]) -> Any:
+            response = self.request(
+                RequestVerb.GET, page_url, params=page_params, **kwargs
+            )
+            if response.status_code != 200:
+                raise requests.HTTPError(
+                    f"failed to fetch page '{page_url}': {response.status_code}",
+                    response=response,
+                )
+            return response
+
+        if max_items == 0:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            next_page: Optional[Future] = None
+            response = fetch(api_url, params)
+            yielded = 0
+            while True:
+                body = response.json()
+                items = body if items_key is None else body[items_key]
+                if not isinstance(items, list):
+                    raise ValueError(f"non-list page of '{api_url}'")
+
+                next_url = self._next_page_url(response)
+                wanted = max_items is None or yielded + len(items) < max_items
+                if next_url is not None and wanted and executor is not None:
+                    next_page = executor.submit(fetch, next_url, None)
+
+                for item in items:
+                    yield item
+                    yielded += 1
+                    if max_items is not None and max_items <= yielded:
+                        return
+
+                if next_url is None:
+                    return
+                if next_page is not None:
+                    response = next_page.result()
+                    next_page = None
+                else:
+                    response = fetch(next_url, None)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _next_page_url(self, response: requests.Response) -> Optional[str]:
+        """! Relative URL of the next page, None on the last page.
+
+        @exception requests.HTTPError   if the next page is not under the
+                                        base URL, so the token is never
+                                        sent to another host.
+        """
+        url = response.links.get("next", {}).get("url")
+        if url is None:
+            return None
+
+        base = urlsplit(self._base_url)
+        base_path = base.path.rstrip("/")
+        parts = urlsplit(url)
+        if (
+            parts.scheme.lower() != base.scheme.lower()
+            or parts.netloc.lower() != base.netloc.lower()
+            or not parts.path.startswith(base_path + "/")
+        ):
+            raise requests.HTTPError(
+                f"next page '{url}' is not under '{self._base_url}'",
+                response=response,
+            )
+
+        base_length = len(base_path)
+        relative = parts.path[base_length:]
+        return f"{relative}?{parts.query}" if parts.query else relative
+
+    async def arequest(
+        self,
+        verb: RequestVerb,
+        api_url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """! Awaitable version of request.
+
+        @param verb     A HTTPS verb.
+        @param api_url  A relative URL of API starting with '/'.
+        @param **kwargs Additional arguments for requesting.
+
+        @return  A response.
+        """
+        return await self.run_async(self.request, verb, api_url, **kwargs)
+
+    async def run_async(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """! Run a blocking callable without blocking the event loop.
+
+        With an AsyncSession the callable runs in the session's bounded
+        worker pool, otherwise in the default executor of the running loop.
+
+        @param func     A blocking callable.
+        @param *args    Positional arguments for the callable.
+        @param **kwargs Keyword arguments for the callable.
+        @return  A return value of the callable.
+        """
+        if isinstance(self._session, AsyncSession):
+            return await self._session.run(func, *args, **kwargs)
+
+        # loaded by the running loop already; not needed at import time.
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    @property
+    def token(self) -> Token:
+        return self._token
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def rate_limit(self) -> RateLimitBudget:
+        """! Current core (REST) rate limit budget of the token."""
+        return self.resource_rate_limit(CORE_RESOURCE)
+
+    def resource_rate_limit(self, resource: str) -> RateLimitBudget:
+        """! Current rate limit budget of the token for a resource.
+
+        @param resource A rate limit resource, e.g. "graphql".
+        """
+        return self._rate_limiter.budget((self._token.token, resource))
+
+    @property
+    def coalesced_requests(self) -> int:
+        """! Number of requests answered by an identical one in flight."""
+        with self._flights_lock:
+            return self._coalesced
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """! Retry counters of requests made so far."""
+        return self._retry_stats.stats
+
+    def add_instrument(self, instrument: Instrument) -> None:
+        """! Add hooks called around every request."""
+        self._instruments.append(instrument)
+
+    @property
+    def instruments(self) -> List[Instrument]:
+        return self._instruments
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        return self._cache
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return self._retry_policy
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
 
     @property
     def session(self):
         return self._session
+
+
+# arguments already in the flight key, or not changing the response.
+_FLIGHT_KWARGS = ("params", "headers", "stream", "data", "timeout")
+
+
+class _Flight:
+    """! A request in flight, awaited by identical requests."""
+
+    def __init__(self) -> None:
+        self._landed = threading.Event()
+        self._response: Optional[requests.Response] = None
+        self._error: Optional[BaseException] = None
+
+    def land(self, response: requests.Response) -> None:
+        # read the body now, so every copy owns it.
+        response.content
+        self._response = response
+        self._landed.set()
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._landed.set()
+
+    def wait(self) -> requests.Response:
+        """! Wait for the request, and copy its response."""
+        self._landed.wait()
+        if self._error is not None:
+            raise self._error
+
+        assert self._response is not None
+        response = copy.copy(self._response)
+        response.headers = CaseInsensitiveDict(self._response.headers)
+        return response
+
+
+def close_response(response: requests.Response) -> None:
+    """! Release the connection of a response, even if built in memory."""
+    if response.raw is not None:
+        response.close()
+
+
+def _received_size(response: requests.Response, kwargs: Dict) -> int:
+    """! Body size of a response, without reading a streamed body."""
+    if kwargs.get("stream") and response.raw is not None:
+        length = response.headers.get("Content-Length", "0")
+        return int(length) if length.isdigit() else 0
+    return len(response.content or b"")
@@ -0,0 +1,107 @@
+import threading
+from typing import Dict, Optional, Tuple, Type
+
+from polytope.github.Requester import Requester
+from polytope.github.ResponseCache import ResponseCache
+from polytope.github.Session import (
+    ConnectionPoolConfig,
+    RequestsSession,
+    Session,
+)
+from polytope.github.Token import Token
+
+
+class RequesterPool:
+    """! A registry of requesters keyed by token and base URL.
+
+    Requesters from the same pool with the same token and base URL share
+    one session, and so one connection pool.
+    """
+
+    def __init__(
+        self,
+        pool_config: Optional[ConnectionPoolConfig] = None,
+        SessionClass: Type[Session] = RequestsSession,
+        cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = False,
+    ):
+        """! RequesterPool class initializer.
+
+        @param pool_config      Connection pool settings of each session.
+        @param SessionClass     A class to use for sessions.
+        @param cache            A response cache shared by all requesters.
+        @param coalesce_requests    Share in-flight identical GET/HEAD requests in each requester.
+        """
+        self._pool_config: ConnectionPoolConfig = (
+            pool_config or ConnectionPoolConfig()
+        )
+        self._SessionClass: Type[Session] = SessionClass
+        self._cache: Optional[ResponseCache] = cache
+        self._coalesce_requests: bool = coalesce_requests
+        self._requesters: Dict[Tuple[str, str], Requester] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        token: Token,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Requester:
+        """! Get a requester, creating it on first use.
+
+        Headers only apply when the requester is created.
+
+        @param token            A token for authorization.
+        @param base_url         A base URL of API.
+        @param headers          Additional headers other than Authorization to fix in session.
+        @return  A shared requester.
+        """
+        key = (token.token, base_url)
+
+        with self._lock:
+            requester = self._requesters.get(key)
+            if requester is None:
+                requester = Requester(
+                    token=token,
+                    base_url=base_url,
+                    headers=headers,
+                    session=self._create_session(),
+                    cache=self._cache,
+                    coalesce_requests=self._coalesce_requests,
+                )
+                self._requesters[key] = requester
+            return requester
+
+    def clear(self) -> None:
+        """! Drop all requesters of the pool."""
+        with self._lock:
+            self._requesters.clear()
+
+    def _create_session(self) -> Session:
+        if issubclass(self._SessionClass, RequestsSession):
+            return self._SessionClass(self._pool_config)
+        return self._SessionClass()
+
+    def __len__(self) -> int:
+        return len(self._requesters)
+
+    @property
+    def pool_config(self) -> ConnectionPoolConfig:
+        return self._pool_config
+
+
+_default_pool: RequesterPool = RequesterPool()
+
+
+def get_default_requester_pool() -> RequesterPool:
+    """! Process-wide requester pool."""
+    return _default_pool
+
+
+def set_default_requester_pool(pool: RequesterPool) -> None:
+    """! Replace the process-wide requester pool.
+
+    Requesters already handed out keep their sessions.
+    """
+    global _default_pool
+    _default_pool = pool
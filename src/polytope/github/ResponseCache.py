@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# header marking a response served from cache.
+CACHE_STATUS_HEADER = "X-Polytope-Cache"
+
+# default number of responses kept in memory.
+DEFAULT_MAX_ENTRIES = 1024
+# default number of body bytes kept in memory.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    """! A response stored with its validators."""
+
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @staticmethod
+    def from_response(
+        response: requests.Response,
+    ) -> Optional["CachedResponse"]:
+        """! Make a cache entry, if the response has a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return None
+
+        content = response.content or b""
+        if isinstance(content, str):
+            content = content.encode()
+
+        return CachedResponse(
+            status_code=response.status_code,
+            content=content,
+            headers=dict(response.headers),
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """! Headers to revalidate this entry."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(
+        self, url: str, not_modified: requests.Response
+    ) -> requests.Response:
+        """! Rebuild the full response from a 304 Not Modified response.
+
+        Headers of the 304 response (e.g. rate limit) take precedence.
+        """
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers.update(not_modified.headers)
+        response.headers[CACHE_STATUS_HEADER] = "HIT"
+        response._content = self.content
+        response.url = url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        return response
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+
+class ResponseCache(ABC):
+    """! A cache of responses for conditional requests."""
+
+    def __init__(self):
+        """! ResponseCache class initializer."""
+        self.hits: int = 0
+        self.misses: int = 0
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """! Get an entry, None if absent."""
+        ...
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """! Store an entry."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """! Remove an entry if present."""
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """! Remove all entries."""
+        ...
+
+    def record(self, hit: bool) -> None:
+        """! Count a revalidation result.
+
+        @param hit  True if the entry was served on 304 Not Modified.
+        """
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class LRUResponseCache(ResponseCache):
+    """! An in-memory cache bounded by entry count and body bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """! LRUResponseCache class initializer.
+
+        @param max_entries  Maximum number of entries.
+        @param max_bytes    Maximum total size of bodies.
+        """
+        super().__init__()
+        assert 0 < max_entries
+        assert 0 < max_bytes
+
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes: int = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if self.max_bytes < len(entry):
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._bytes += len(entry)
+
+            while (
+                self.max_entries < len(self._entries)
+                or self.max_bytes < self._bytes
+            ):
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self._bytes
+
+
+class DiskResponseCache(ResponseCache):
+    """! An on-disk cache, one file per entry.
+
+    Each file holds a line of JSON metadata followed by the raw body.
+    """
+
+    def __init__(self, directory: str):
+        """! DiskResponseCache class initializer.
+
+        @param directory    A directory to store entries in. Created if missing.
+        """
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory: str = directory
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "rb") as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+
+        return CachedResponse(
+            status_code=meta["status_code"],
+            content=content,
+            headers=meta["headers"],
+            etag=meta["etag"],
+            last_modified=meta["last_modified"],
+        )
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        meta = {
+            "status_code": entry.status_code,
+            "headers": entry.headers,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+
+        # write to a temporary file first, so readers never see partial entries.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n")
+                f.write(entry.content)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith(".cache"):
+                self.delete(name[: -len(".cache")])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".cache")
+
+
+def cache_key(token: str, verb: str, url: str, params=None) -> str:
+    """! Cache key of a request, distinct per token."""
+    raw = json.dumps([token, verb, url, params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
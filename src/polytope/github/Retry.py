@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, FrozenSet, Optional
+
+from polytope.github.RequestVerb import RequestVerb
+
+# default number of attempts of a request, including the first one.
+DEFAULT_MAX_ATTEMPTS = 3
+# default status codes considered as transient failures.
+DEFAULT_RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """! Retry policy of transient failures.
+
+    Idempotent verbs (GET, HEAD, PUT, DELETE) are retried by default.
+    Other verbs are retried only when the caller opts in.
+    Delays grow exponentially with full jitter, and all delays of a request
+    together never exceed max_retry_time.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_retry_time: float = 30.0,
+        retry_statuses: FrozenSet[int] = DEFAULT_RETRY_STATUSES,
+        jitter: bool = True,
+        sleep: Callable[[float], None] = time.sleep,
+        rand: Callable[[], float] = random.random,
+    ):
+        """! RetryPolicy class initializer.
+
+        @param max_attempts     Number of attempts of a request, including the first one.
+        @param backoff_base     Delay before the first retry, in seconds.
+        @param backoff_max      Longest delay between two attempts, in seconds.
+        @param max_retry_time   Longest total delay of a request, in seconds.
+        @param retry_statuses   Status codes considered as transient failures.
+        @param jitter           Randomize delays between zero and the exponential delay.
+        @param sleep            A function sleeping for given seconds.
+        @param rand             A function returning a random number in [0, 1).
+        """
+        assert 1 <= max_attempts
+        assert 0 <= backoff_base <= backoff_max
+        assert 0 <= max_retry_time
+
+        self.max_attempts: int = max_attempts
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.max_retry_time: float = max_retry_time
+        self.retry_statuses: FrozenSet[int] = retry_statuses
+        self.jitter: bool = jitter
+        self._sleep: Callable[[float], None] = sleep
+        self._rand: Callable[[], float] = rand
+
+    def allows(self, verb: RequestVerb, allow_retry: Optional[bool]) -> bool:
+        """! Whether a request may be retried.
+
+        @param verb         A HTTPS verb.
+        @param allow_retry  Caller's choice. None to follow idempotency of the verb.
+        """
+        if allow_retry is None:
+            return verb.is_idempotent
+        return allow_retry
+
+    def backoff(self, retries: int) -> float:
+        """! Delay before a retry.
+
+        @param retries  Number of retries already made.
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2.0**retries))
+        if self.jitter:
+            delay *= self._rand()
+        return delay
+
+    def wait(self, retries: int, waited: float) -> Optional[float]:
+        """! Sleep before the next retry, if any attempt is left.
+
+        @param retries  Number of retries already made.
+        @param waited   Seconds already waited for retries of the request.
+        @return  Seconds slept, or None to give up.
+        """
+        if self.max_attempts <= retries + 1:
+            return None
+
+        delay = self.backoff(retries)
+        if self.max_retry_time < waited + delay:
+            return None
+
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+@dataclass(frozen=True)
+class RetryStats:
+    """! Retry counters of a requester."""
+
+    # requests made by callers.
+    requests: int = 0
+    # attempts sent to the session, including retries.
+    attempts: int = 0
+    # retries after transient failures.
+    retries: int = 0
+    # requests which failed after all allowed retries.
+    exhausted: int = 0
+    # total seconds slept before retries.
+    retry_wait: float = 0.0
+
+
+class RetryStatsCounter:
+    """! Thread-safe accumulator of RetryStats."""
+
+    def __init__(self):
+        """! RetryStatsCounter class initializer."""
+        self._stats = RetryStats()
+        self._lock = threading.Lock()
+
+    def record(
+        self, attempts: int, retries: int, retry_wait: float, exhausted: bool
+    ) -> None:
+        """! Record a finished request.
+
+        @param attempts     Attempts sent for the request.
+        @param retries      Retries of the request after transient failures.
+        @param retry_wait   Seconds slept before retries of the request.
+        @param exhausted    Whether the request failed after all retries.
+        """
+        with self._lock:
+            self._stats = replace(
+                self._stats,
+                requests=self._stats.requests + 1,
+                attempts=self._stats.attempts + attempts,
+                retries=self._stats.retries + retries,
+                exhausted=self._stats.exhausted + int(exhausted),
+                retry_wait=self._stats.retry_wait + retry_wait,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = RetryStats()
+
+    @property
+    def stats(self) -> RetryStats:
+        with self._lock:
+            return self._stats
@@ -1,11 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from requests.structures import CaseInsensitiveDict
-from typing import Callable, List, Optional, Protocol
+from typing import Callable, List, Optional, Protocol, Type, TypeVar
 from polytope.github.RequestVerb import RequestVerb
 
+import functools
 import requests
 
 from abc import ABC, abstractmethod, abstractproperty
 
+T = TypeVar("T")
+
 
 class Session(ABC):
     """! A request session class."""
@@ -138,13 +143,45 @@ class MockSession(Session):
         return self._logs
 
 
+@dataclass
+class ConnectionPoolConfig:
+    """! Connection pool settings of a requests session."""
+
+    # number of host pools to cache.
+    pool_connections: int = 10
+    # maximum number of connections kept per host.
+    pool_maxsize: int = 10
+    # block when no free connection is left instead of opening a new one.
+    pool_block: bool = False
+    # retries of urllib3 on connection errors.
+    max_retries: int = 0
+    # keep connections alive between requests.
+    keep_alive: bool = True
+
+
 class RequestsSession(Session):
     """! A session class with requests session."""
 
-    def __init__(self):
-        """! RequestsSession class initializer."""
+    def __init__(self, pool_config: Optional[ConnectionPoolConfig] = None):
+        """! RequestsSession class initializer.
+
+        @param pool_config  Connection pool settings. Defaults of requests if None.
+        """
         self._session: requests.Session = requests.Session()
 
+        if pool_config is not None:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_config.pool_connections,
+                pool_maxsize=pool_config.pool_maxsize,
+                max_retries=pool_config.max_retries,
+                pool_block=pool_config.pool_block,
+            )
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+            if not pool_config.keep_alive:
+                self._session.headers["Connection"] = "close"
+
     def request(
         self,
         verb: RequestVerb,
@@ -181,3 +218,111 @@ class RequestsSession(Session):
     @headers.setter
     def headers(self, value):
         self._session.headers = value
+
+
+# default number of requests an AsyncSession runs at once.
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncSession(Session):
+    """! An asyncio session class.
+
+    Requests of the wrapped blocking session are dispatched to a bounded
+    worker pool, so that many of them can be awaited on one event loop.
+    """
+
+    def __init__(
+        self,
+        SessionClass: Type[Session] = RequestsSession,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """! AsyncSession class initializer.
+
+        @param SessionClass     A blocking session class to wrap.
+        @param max_concurrency  Maximum number of requests in flight.
+        """
+        assert 0 < max_concurrency
+
+        self._session: Session = SessionClass()
+        self._max_concurrency: int = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def request(
+        self,
+        verb: RequestVerb,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """! Blocking request through the wrapped session.
+
+        @param verb     A HTTPS verb.
+        @param url      A full-path URL.
+        @param **kwargs Additional arguments for requesting.
+        @return  A response.
+        """
+
+        return self._session.request(verb, url, **kwargs)
+
+    async def arequest(
+        self,
+        verb: RequestVerb,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """! Awaitable request through the wrapped session.
+
+        @param verb     A HTTPS verb.
+        @param url      A full-path URL.
+        @param **kwargs Additional arguments for requesting.
+        @return  A response.
+        """
+
+        return await self.run(self._session.request, verb, url, **kwargs)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """! Run a blocking callable in the worker pool of this session.
+
+        @param func     A blocking callable.
+        @param *args    Positional arguments for the callable.
+        @param **kwargs Keyword arguments for the callable.
+        @return  A return value of the callable.
+        """
+
+        # loaded by the running loop already; not needed at import time.
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def close(self) -> None:
+        """! Shut down the worker pool, waiting for running requests."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrency,
+                thread_name_prefix="polytope-async-session",
+            )
+        return self._executor
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    @property
+    def headers(self):
+        return self._session.headers
+
+    @headers.setter
+    def headers(self, value):
+        self._session.headers = value
@@ -1,9 +1,52 @@
+"""! Github API client.
+
+Exported names are imported on first access, so importing the package
+does not load requests until a requester is actually needed.
+"""
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any
+
 __all__ = [
     "Token",
     "RequestVerb",
     "Requester",
+    "RequesterPool",
 ]
 
-from .RequestVerb import RequestVerb
-from .Token import Token
-from .Requester import Requester
+if TYPE_CHECKING:
+    from .RequestVerb import RequestVerb
+    from .Token import Token
+    from .Requester import Requester
+    from .RequesterPool import RequesterPool
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # each exported name is a class of the submodule of the same name.
+    value = getattr(importlib.import_module(f"{__name__}.{name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+class _LazyModule(types.ModuleType):
+    """! Keeps exported names bound to classes, not to their submodules.
+
+    Importing submodule X binds package attribute X to the submodule,
+    which would shadow the class X once the submodule is imported.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in __all__ and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -0,0 +1,239 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from polytope.github import Requester
+from polytope.github.RequestVerb import RequestVerb
+
+from .ConfigFileCache import (
+    PolytopeConfigFileCache,
+    get_default_config_file_cache,
+)
+from .InternalCode import GithubRepositoryInternalCode as GHIC
+from .Repository import POLYTOPE_CONFIG_FILE_NAME, post_process_error_response
+from .RepositoryConfig import GithubRepositoryConfig
+from .Response import GithubRepositoryResponse
+
+# default number of repositories read by one GraphQL query.
+DEFAULT_BATCH_SIZE = 50
+
+GRAPHQL_URL = "/graphql"
+
+# GraphQL fields of a repository, and GithubRepositoryConfig fields they fill.
+# Creation-only settings and has_downloads are not exposed by GraphQL.
+_CONFIG_FIELDS = {
+    "name": "name",
+    "description": "description",
+    "homepageUrl": "homepage",
+    "isPrivate": "private",
+    "hasIssuesEnabled": "has_issues",
+    "hasProjectsEnabled": "has_projects",
+    "hasWikiEnabled": "has_wiki",
+    "hasDiscussionsEnabled": "has_discussions",
+    "squashMergeAllowed": "allow_squash_merge",
+    "mergeCommitAllowed": "allow_merge_commit",
+    "rebaseMergeAllowed": "allow_rebase_merge",
+    "autoMergeAllowed": "allow_auto_merge",
+    "deleteBranchOnMerge": "delete_branch_on_merge",
+    "squashMergeCommitTitle": "squash_merge_commit_title",
+    "squashMergeCommitMessage": "squash_merge_commit_message",
+    "mergeCommitTitle": "merge_commit_title",
+    "mergeCommitMessage": "merge_commit_message",
+    "isTemplate": "is_template",
+}
+
+_REPOSITORY_FRAGMENT = (
+    "fragment PolytopeRepositoryFields on Repository {\n"
+    f"  {' '.join(_CONFIG_FIELDS)}\n"
+    f'  polytopeConfigFile: object(expression: "HEAD:{POLYTOPE_CONFIG_FILE_NAME}")'
+    " { __typename }\n"
+    "}\n"
+)
+
+
+@dataclass
+class GithubRepositoryStatus:
+    """! Status of a repository read in a batch."""
+
+    # Github Username of Repository Owner.
+    owner: str
+    # Name of the repository.
+    name: str
+    # result of reading the repository.
+    response: GithubRepositoryResponse
+    # current settings. None if failed to read.
+    config: Optional[GithubRepositoryConfig] = None
+    # whether the repository has a Polytope config file. None if failed to read.
+    has_polytope_config_file: Optional[bool] = None
+
+
+def build_repository_status_query(
+    targets: Sequence[Tuple[str, str]],
+) -> Dict[str, Any]:
+    """! Build a GraphQL request body reading many repositories at once.
+
+    Repository i is aliased as r{i}, and its names are passed as variables.
+
+    @param targets: (owner, name) pairs of repositories.
+    @return GraphQL request body with query and variables.
+    """
+    parameters = []
+    selections = []
+    variables: Dict[str, str] = {}
+    for i, (owner, name) in enumerate(targets):
+        parameters.append(f"$owner{i}: String!, $name{i}: String!")
+        selections.append(
+            f"  r{i}: repository(owner: $owner{i}, name: $name{i})"
+            " { ...PolytopeRepositoryFields }"
+        )
+        variables[f"owner{i}"] = owner
+        variables[f"name{i}"] = name
+
+    query = (
+        f"query PolytopeRepositoryStatus({', '.join(parameters)}) {{\n"
+        + "\n".join(selections)
+        + "\n}\n"
+        + _REPOSITORY_FRAGMENT
+    )
+    return {"query": query, "variables": variables}
+
+
+def fetch_repository_statuses(
+    requester: Requester,
+    targets: Sequence[Tuple[str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    config_file_cache: Optional[PolytopeConfigFileCache] = None,
+) -> List[GithubRepositoryStatus]:
+    """! Read existence, settings and Polytope config file of many repositories.
+
+    Each batch of repositories is read by one GraphQL request. Detected
+    Polytope config files are stored in the config file cache, so later
+    updates and deletions skip their own detection request.
+
+    @param requester: requester of Github API.
+    @param targets: (owner, name) pairs of repositories.
+    @param batch_size: number of repositories per request.
+    @param config_file_cache: detection cache to fill. Cache of the token if None.
+    @return statuses in the order of targets.
+    """
+    assert 0 < batch_size
+
+    if config_file_cache is None:
+        config_file_cache = get_default_config_file_cache(requester)
+
+    statuses: List[GithubRepositoryStatus] = []
+    for start in range(0, len(targets), batch_size):
+        end = start + batch_size
+        batch = targets[start:end]
+        statuses.extend(_fetch_batch(requester, batch))
+
+    for status in statuses:
+        if status.has_polytope_config_file is not None:
+            config_file_cache.set(
+                status.owner,
+                status.name,
+                status.has_polytope_config_file,
+                "detected polytope.yaml file"
+                if status.has_polytope_config_file
+                else "could not detect polytope.yaml file",
+            )
+    return statuses
+
+
+def _fetch_batch(
+    requester: Requester, batch: Sequence[Tuple[str, str]]
+) -> List[GithubRepositoryStatus]:
+    def failed(
+        response: GithubRepositoryResponse,
+    ) -> List[GithubRepositoryStatus]:
+        return [
+            GithubRepositoryStatus(owner, name, response)
+            for owner, name in batch
+        ]
+
+    try:
+        # the query only reads, so it is safe to retry.
+        result = requester.request(
+            RequestVerb.POST,
+            GRAPHQL_URL,
+            allow_retry=True,
+            data=json.dumps(build_repository_status_query(batch)),
+        )
+    except requests.RequestException as e:
+        return failed(
+            GithubRepositoryResponse(
+                status_code=None,
+                internal_code=GHIC.RequestFailed,
+                error_msg=str(e),
+                errors="",
+            )
+        )
+
+    if result.status_code != 200:
+        return failed(post_process_error_response(result, GHIC.FailedToRead))
+
+    try:
+        body = json.loads(result.content)
+        data = body.get("data") or {}
+    except (ValueError, AttributeError):
+        return failed(post_process_error_response(result, GHIC.FailedToRead))
+
+    errors_by_alias: Dict[str, List[Dict]] = {}
+    for error in body.get("errors") or []:
+        path = error.get("path") or [None]
+        errors_by_alias.setdefault(path[0], []).append(error)
+
+    statuses = []
+    for i, (owner, name) in enumerate(batch):
+        alias = f"r{i}"
+        repository = data.get(alias)
+        if isinstance(repository, dict):
+            statuses.append(
+                GithubRepositoryStatus(
+                    owner=owner,
+                    name=name,
+                    response=GithubRepositoryResponse(
+                        status_code=result.status_code,
+                        internal_code=GHIC.Success,
+                        error_msg="",
+                        errors="",
+                    ),
+                    config=_parse_config(repository),
+                    has_polytope_config_file=_has_config_file(repository),
+                )
+            )
+        else:
+            errors = errors_by_alias.get(alias, [])
+            message = errors[0].get("message", "") if errors else ""
+            statuses.append(
+                GithubRepositoryStatus(
+                    owner=owner,
+                    name=name,
+                    response=GithubRepositoryResponse(
+                        status_code=result.status_code,
+                        internal_code=GHIC.FailedToRead,
+                        error_msg=json.dumps(message),
+                        errors=json.dumps(errors),
+                    ),
+                )
+            )
+    return statuses
+
+
+def _parse_config(repository: Dict[str, Any]) -> GithubRepositoryConfig:
+    config = GithubRepositoryConfig(repository["name"])
+    for graphql_field, config_field in _CONFIG_FIELDS.items():
+        value = repository.get(graphql_field)
+        if value is not None:
+            setattr(config, config_field, value)
+    return config
+
+
+def _has_config_file(repository: Dict[str, Any]) -> bool:
+    config_file = repository.get("polytopeConfigFile")
+    return (
+        isinstance(config_file, dict)
+        and config_file.get("__typename") == "Blob"
+    )
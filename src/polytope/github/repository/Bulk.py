@@ -0,0 +1,284 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import requests
+
+from polytope.github import Requester
+from polytope.models import Contest, ContestProblem
+
+from .BatchRead import DEFAULT_BATCH_SIZE, fetch_repository_statuses
+from .ConfigFileCache import PolytopeConfigFileCache
+from .InternalCode import GithubRepositoryInternalCode as GHIC
+from .NameValidation import validate_github_repository_targets
+from .Repository import GithubRepository
+from .RepositoryConfig import GithubRepositoryConfig
+from .Response import GithubRepositoryResponse
+
+# default number of repositories processed at once.
+DEFAULT_MAX_WORKERS = 8
+
+
+def contest_problem_repository_name(contest_problem: ContestProblem) -> str:
+    """! Default repository name of a contest problem, its problem ID."""
+    return contest_problem.problem.id
+
+
+class GithubRepositoryBulk:
+    """! Runs repository operations for many Github repositories in parallel.
+
+    Every repository shares one requester, so connections are reused.
+    A failure of one repository never stops the others.
+
+    @param requester    Requester shared by all repositories.
+    @param max_workers  Number of repositories processed at once.
+    @param config_file_cache    Polytope config file detection cache of
+                                the repositories. Cache of the token if None.
+    """
+
+    def __init__(
+        self,
+        requester: Requester,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        config_file_cache: Optional[PolytopeConfigFileCache] = None,
+    ) -> None:
+        assert 0 < max_workers
+
+        self._requester: Requester = requester
+        self.max_workers: int = max_workers
+        self._config_file_cache: Optional[
+            PolytopeConfigFileCache
+        ] = config_file_cache
+
+    def provision(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        description: str = "",
+        private: bool = True,
+        config: Optional[GithubRepositoryConfig] = None,
+    ) -> List[GithubRepositoryResponse]:
+        """! Create, check and configure repositories.
+
+        @param targets: (owner, name) pairs of repositories to provision.
+        @param description: short repository description.
+        @param private: true if repositories need to be kept private.
+        @param config: configuration to apply after creation. Name is replaced per repository.
+        @return responses in the order of targets. Each one is the response of the last step run.
+        """
+
+        def provision_one(repo: GithubRepository) -> GithubRepositoryResponse:
+            resp = repo.create(description=description, private=private)
+            if resp.internal_code != GHIC.Success:
+                return resp
+
+            resp = repo.get()
+            if resp.internal_code != GHIC.Success or config is None:
+                return resp
+
+            return repo.update(replace(config, name=repo.config.name))
+
+        return self.run(targets, provision_one)
+
+    def provision_contest(
+        self,
+        owner: str,
+        contest: Contest,
+        description: str = "",
+        private: bool = True,
+        config: Optional[GithubRepositoryConfig] = None,
+        repository_name: Callable[
+            [ContestProblem], str
+        ] = contest_problem_repository_name,
+    ) -> List[GithubRepositoryResponse]:
+        """! Provision one repository per problem of a contest.
+
+        @param owner: Github Username of Repository Owner.
+        @param contest: contest to provision repositories for.
+        @param repository_name: maps a contest problem to its repository name.
+        @return responses in the order of contest problems.
+        """
+        targets = [
+            (owner, repository_name(contest_problem))
+            for contest_problem in contest.problems
+        ]
+        return self.provision(targets, description, private, config)
+
+    def update(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        config: GithubRepositoryConfig,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> List[GithubRepositoryResponse]:
+        """! Update many repositories in two pipelined phases.
+
+        Polytope config files of all repositories are detected first, by
+        one GraphQL request per batch. Only repositories with the file are
+        then updated, and their own check is answered by the detection
+        cache, so each update costs one request instead of two.
+
+        @param targets: (owner, name) pairs of repositories to update.
+        @param config: configuration to apply. Name is replaced per repository.
+        @param batch_size: number of repositories detected by one request.
+        @return responses in the order of targets. Repositories failing detection get its response.
+        """
+        return self._mutate(
+            targets,
+            lambda repo: repo.update(replace(config, name=repo.config.name)),
+            GHIC.UpdateWithoutPolytopeFile,
+            batch_size,
+        )
+
+    def delete(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> List[GithubRepositoryResponse]:
+        """! Delete many repositories in two pipelined phases, as update.
+
+        @param targets: (owner, name) pairs of repositories to delete.
+        @param batch_size: number of repositories detected by one request.
+        @return responses in the order of targets. Repositories failing detection get its response.
+        """
+        return self._mutate(
+            targets,
+            lambda repo: repo.delete(),
+            GHIC.DeleteWithoutPolytopeFile,
+            batch_size,
+        )
+
+    def _mutate(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        operation: Callable[[GithubRepository], GithubRepositoryResponse],
+        without_file_code: GHIC,
+        batch_size: int,
+    ) -> List[GithubRepositoryResponse]:
+        """! Detect Polytope config files of all targets, then mutate."""
+        responses: List[Optional[GithubRepositoryResponse]] = [None] * len(
+            targets
+        )
+
+        checked: List[int] = []
+        for i, (owner, name) in enumerate(targets):
+            repo_or_error = self.open(owner, name)
+            if isinstance(repo_or_error, GithubRepositoryResponse):
+                responses[i] = repo_or_error
+            else:
+                checked.append(i)
+
+        # request failures come back as statuses with the failed response.
+        statuses = fetch_repository_statuses(
+            self._requester,
+            [targets[i] for i in checked],
+            batch_size,
+            self._config_file_cache,
+        )
+
+        passed: List[int] = []
+        for i, status in zip(checked, statuses):
+            if status.has_polytope_config_file is None:
+                responses[i] = status.response
+            elif not status.has_polytope_config_file:
+                responses[i] = GithubRepositoryResponse(
+                    status_code=None,
+                    internal_code=without_file_code,
+                    error_msg="could not detect polytope.yaml file",
+                    errors="",
+                )
+            else:
+                passed.append(i)
+
+        mutated = self.run([targets[i] for i in passed], operation)
+        for i, response in zip(passed, mutated):
+            responses[i] = response
+
+        assert all(response is not None for response in responses)
+        return [response for response in responses if response is not None]
+
+    def run(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        operation: Callable[[GithubRepository], GithubRepositoryResponse],
+    ) -> List[GithubRepositoryResponse]:
+        """! Run an operation for each repository in parallel.
+
+        @param targets: (owner, name) pairs of repositories.
+        @param operation: operation to run on a repository.
+        @return responses in the order of targets.
+        """
+        return self.run_each([(target, operation) for target in targets])
+
+    def run_each(
+        self,
+        jobs: Sequence[
+            Tuple[
+                Tuple[str, str],
+                Callable[[GithubRepository], GithubRepositoryResponse],
+            ]
+        ],
+    ) -> List[GithubRepositoryResponse]:
+        """! Run its own operation for each repository in parallel.
+
+        @param jobs: ((owner, name), operation) pairs. A repository may repeat.
+        @return responses in the order of jobs.
+        """
+
+        def run_one(
+            job: Tuple[
+                Tuple[str, str],
+                Callable[[GithubRepository], GithubRepositoryResponse],
+            ]
+        ) -> GithubRepositoryResponse:
+            (owner, name), operation = job
+            repo_or_error = self.open(owner, name)
+            if isinstance(repo_or_error, GithubRepositoryResponse):
+                return repo_or_error
+
+            try:
+                return operation(repo_or_error)
+            except requests.RequestException as e:
+                return GithubRepositoryResponse(
+                    status_code=None,
+                    internal_code=GHIC.RequestFailed,
+                    error_msg=str(e),
+                    errors="",
+                )
+
+        if not jobs:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(jobs)),
+            thread_name_prefix="polytope-bulk",
+        ) as executor:
+            return list(executor.map(run_one, jobs))
+
+    def open(
+        self, owner: str, name: str
+    ) -> GithubRepository | GithubRepositoryResponse:
+        """! Open a repository with the shared requester.
+
+        @return repository, or an error response if names are invalid.
+        """
+        errors = validate_github_repository_targets([(owner, name)])
+        if errors:
+            return GithubRepositoryResponse(
+                status_code=None,
+                internal_code=GHIC.InvalidName,
+                error_msg=f'invalid repository name: "{owner}/{name}"',
+                errors=json.dumps(
+                    [
+                        {"field": error.field, "reason": error.reason.name}
+                        for error in errors
+                    ]
+                ),
+            )
+
+        return GithubRepository(
+            owner,
+            name,
+            self._requester.token,
+            requester=self._requester,
+            config_file_cache=self._config_file_cache,
+        )
@@ -0,0 +1,138 @@
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Tuple
+
+from polytope.github import Requester
+
+# default seconds a detection result stays fresh.
+DEFAULT_TTL = 300.0
+
+
+@dataclass(frozen=True)
+class PolytopeConfigFileCacheEntry:
+    """! Cached detection result of Polytope config file of a repository."""
+
+    # whether the repository has a Polytope config file.
+    has_polytope_config_file: bool
+    # reason of the detection result.
+    reason: str
+    # clock time after which the entry needs revalidation.
+    expires_at: float
+    # ETag of the response the result was detected from.
+    etag: Optional[str] = None
+    # lookup the ETag belongs to, e.g. "Listing". Other lookups request
+    # other URLs, so they must not send it.
+    etag_lookup: Optional[str] = None
+
+
+class PolytopeConfigFileCache:
+    """! Polytope config file detection results, shared across repositories.
+
+    Entries are keyed by owner/repository and stay fresh for a TTL.
+    Expired entries are kept with their ETag, so the next detection can
+    revalidate them with a conditional request.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """! PolytopeConfigFileCache class initializer.
+
+        @param ttl      Seconds a detection result stays fresh.
+        @param clock    A function returning current time in seconds.
+        """
+        assert 0 <= ttl
+
+        self.ttl: float = ttl
+        self._clock: Callable[[], float] = clock
+        self._entries: Dict[Tuple[str, str], PolytopeConfigFileCacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, owner: str, name: str
+    ) -> Optional[PolytopeConfigFileCacheEntry]:
+        """! Get an entry, fresh or expired. None if absent."""
+        with self._lock:
+            return self._entries.get(_key(owner, name))
+
+    def is_fresh(self, entry: PolytopeConfigFileCacheEntry) -> bool:
+        return self._clock() < entry.expires_at
+
+    def set(
+        self,
+        owner: str,
+        name: str,
+        has_polytope_config_file: bool,
+        reason: str,
+        etag: Optional[str] = None,
+        etag_lookup: Optional[str] = None,
+    ) -> None:
+        """! Store a fresh detection result."""
+        with self._lock:
+            self._entries[_key(owner, name)] = PolytopeConfigFileCacheEntry(
+                has_polytope_config_file=has_polytope_config_file,
+                reason=reason,
+                expires_at=self._clock() + self.ttl,
+                etag=etag,
+                etag_lookup=etag_lookup if etag is not None else None,
+            )
+
+    def refresh(self, owner: str, name: str) -> None:
+        """! Make an entry fresh again, after a successful revalidation."""
+        with self._lock:
+            key = _key(owner, name)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = replace(
+                    entry, expires_at=self._clock() + self.ttl
+                )
+
+    def invalidate(self, owner: str, name: str) -> None:
+        """! Drop the entry of a repository."""
+        with self._lock:
+            self._entries.pop(_key(owner, name), None)
+
+    def clear(self) -> None:
+        """! Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Github names are case-insensitive.
+def _key(owner: str, name: str) -> Tuple[str, str]:
+    return owner.lower(), name.lower()
+
+
+# default caches, one per (token, base URL), so instances built with the
+# same token share results, and results read with one token are never
+# served to a requester holding another.
+_default_caches: Dict[Tuple[str, str], PolytopeConfigFileCache] = {}
+_default_caches_lock = threading.Lock()
+
+
+def get_default_config_file_cache(
+    requester: Requester,
+) -> PolytopeConfigFileCache:
+    """! Polytope config file detection cache shared by users of a token.
+
+    @param requester    Requester whose responses fill the cache.
+    """
+    key = (requester.token.token, requester.base_url)
+    with _default_caches_lock:
+        cache = _default_caches.get(key)
+        if cache is None:
+            cache = _default_caches[key] = PolytopeConfigFileCache()
+        return cache
+
+
+def clear_default_config_file_caches() -> None:
+    """! Forget results of all default caches, e.g. between tests."""
+    with _default_caches_lock:
+        for cache in _default_caches.values():
+            cache.clear()
@@ -25,3 +25,7 @@ class GithubRepositoryInternalCode(Enum):
     UpdateWithoutPolytopeFile = auto()
     # Cannot delete repository without Polytope config file.
     DeleteWithoutPolytopeFile = auto()
+    # Owner or repository name is not valid on Github.
+    InvalidName = auto()
+    # Request raised before receiving a response (e.g. connection error).
+    RequestFailed = auto()
@@ -0,0 +1,177 @@
+import functools
+import re
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# alphanumeric or hyphen, starts & ends with alphanumeric
+GITHUB_USERNAME_REGEX = (
+    r"^[a-zA-Z\d](?:[a-zA-Z\d]|-(?=[a-zA-Z\d])){0,37}[a-zA-Z\d]$"
+)
+# alphanumeric, hyphen, underscore. starts & ends with alphanumeric.
+GITHUB_REPONAME_REGEX = r"^[a-z0-9]+(?:(?:(?:[._]|__|[-]*)[a-z0-9]+)+)?$"
+
+_GITHUB_USERNAME_PATTERN = re.compile(GITHUB_USERNAME_REGEX)
+_GITHUB_REPONAME_PATTERN = re.compile(GITHUB_REPONAME_REGEX)
+_GITHUB_USERNAME_CHARACTERS = re.compile(r"^[a-zA-Z\d-]*$")
+_GITHUB_REPONAME_CHARACTERS = re.compile(r"^[a-z0-9._-]*$")
+
+# longest Github username.
+GITHUB_USERNAME_MAX_LENGTH = 39
+
+# number of names whose validation result is memoized, per kind of name.
+NAME_CACHE_SIZE = 16 * 1024
+
+
+class NameValidationFailure(Enum):
+    """! Why a name is not valid on Github."""
+
+    # Name is empty.
+    Empty = auto()
+    # Name is shorter than Github allows.
+    TooShort = auto()
+    # Name is longer than Github allows.
+    TooLong = auto()
+    # Name contains a character Github does not allow.
+    InvalidCharacter = auto()
+    # Name starts or ends with a non-alphanumeric character.
+    InvalidBoundary = auto()
+    # Name has consecutive or mixed separators, e.g. "a--b" or "a._b".
+    InvalidSeparator = auto()
+    # Name is not a string, e.g. None.
+    InvalidType = auto()
+
+
+@dataclass(frozen=True)
+class GithubNameError:
+    """! An invalid name of a repository target."""
+
+    # position of the target in the validated list.
+    index: int
+    # "owner" or "name".
+    field: str
+    # the invalid name, as given.
+    value: object
+    # why it is invalid.
+    reason: NameValidationFailure
+
+
+def github_user_name_failure(name: object) -> Optional[NameValidationFailure]:
+    """! Why a Github username is invalid. None if valid."""
+    if not isinstance(name, str):
+        return NameValidationFailure.InvalidType
+    return _github_user_name_failure(name)
+
+
+def github_repository_name_failure(
+    name: object,
+) -> Optional[NameValidationFailure]:
+    """! Why a Github repository name is invalid. None if valid."""
+    if not isinstance(name, str):
+        return NameValidationFailure.InvalidType
+    return _github_repository_name_failure(name)
+
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def _github_user_name_failure(name: str) -> Optional[NameValidationFailure]:
+    if _GITHUB_USERNAME_PATTERN.match(name) is not None:
+        return None
+    if not name:
+        return NameValidationFailure.Empty
+    if _GITHUB_USERNAME_CHARACTERS.match(name) is None:
+        return NameValidationFailure.InvalidCharacter
+    if name[0] == "-" or name[-1] == "-":
+        return NameValidationFailure.InvalidBoundary
+    if GITHUB_USERNAME_MAX_LENGTH < len(name):
+        return NameValidationFailure.TooLong
+    if len(name) == 1:
+        return NameValidationFailure.TooShort
+    return NameValidationFailure.InvalidSeparator
+
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def _github_repository_name_failure(
+    name: str,
+) -> Optional[NameValidationFailure]:
+    if _GITHUB_REPONAME_PATTERN.match(name) is not None:
+        return None
+    if not name:
+        return NameValidationFailure.Empty
+    if _GITHUB_REPONAME_CHARACTERS.match(name) is None:
+        return NameValidationFailure.InvalidCharacter
+    if not (name[0].isalnum() and name[-1].isalnum()):
+        return NameValidationFailure.InvalidBoundary
+    return NameValidationFailure.InvalidSeparator
+
+
+def is_valid_github_repository_name(name: object) -> bool:
+    return github_repository_name_failure(name) is None
+
+
+def is_valid_github_user_name(name: object) -> bool:
+    return github_user_name_failure(name) is None
+
+
+def validate_github_user_names(
+    names: Iterable[object],
+) -> Dict[str, NameValidationFailure]:
+    """! Validate many Github usernames at once.
+
+    @param names: usernames, duplicates allowed.
+    @return failure reasons of invalid names. Empty if all are valid.
+            Names which are not strings are keyed by their repr.
+    """
+    return _validate_names(names, _github_user_name_failure)
+
+
+def validate_github_repository_names(
+    names: Iterable[object],
+) -> Dict[str, NameValidationFailure]:
+    """! Validate many Github repository names at once.
+
+    @param names: repository names, duplicates allowed.
+    @return failure reasons of invalid names. Empty if all are valid.
+            Names which are not strings are keyed by their repr.
+    """
+    return _validate_names(names, _github_repository_name_failure)
+
+
+def _validate_names(
+    names: Iterable[object],
+    name_failure: Callable[[str], Optional[NameValidationFailure]],
+) -> Dict[str, NameValidationFailure]:
+    failures = {}
+    checked: Set[str] = set()
+    for name in names:
+        if not isinstance(name, str):
+            failures[repr(name)] = NameValidationFailure.InvalidType
+        elif name not in checked:
+            checked.add(name)
+            failure = name_failure(name)
+            if failure is not None:
+                failures[name] = failure
+    return failures
+
+
+def validate_github_repository_targets(
+    targets: Iterable[Tuple[object, object]],
+) -> List[GithubNameError]:
+    """! Validate (owner, name) pairs of repositories at once.
+
+    Never raises on invalid names, so a large manifest can be checked
+    before any repository is touched.
+
+    @param targets: (owner, name) pairs of repositories.
+    @return errors in the order of targets, owner first. Empty if all are valid.
+    """
+    errors = []
+    for index, (owner, name) in enumerate(targets):
+        owner_failure = github_user_name_failure(owner)
+        if owner_failure is not None:
+            errors.append(
+                GithubNameError(index, "owner", owner, owner_failure)
+            )
+        name_failure = github_repository_name_failure(name)
+        if name_failure is not None:
+            errors.append(GithubNameError(index, "name", name, name_failure))
+    return errors
@@ -0,0 +1,319 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields, replace
+from enum import Enum, auto
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import requests
+
+from polytope.github import Requester
+from polytope.github.RequestVerb import RequestVerb
+
+from .Bulk import DEFAULT_MAX_WORKERS, GithubRepositoryBulk
+from .ConfigFileCache import PolytopeConfigFileCache
+from .InternalCode import GithubRepositoryInternalCode as GHIC
+from .Repository import GithubRepository, post_process_error_response
+from .RepositoryConfig import GithubRepositoryConfig
+from .Response import GithubRepositoryResponse
+
+# settings only applied on creation, never reported back by Github.
+CREATION_ONLY_FIELDS = ("auto_init", "gitignore_template", "license_template")
+
+# settings compared with the remote repository. Renames are not reconciled.
+RECONCILED_FIELDS = tuple(
+    config_field.name
+    for config_field in fields(GithubRepositoryConfig)
+    if config_field.name not in CREATION_ONLY_FIELDS + ("name",)
+)
+
+# desired configuration, or a function giving it per (owner, name).
+DesiredConfig = (
+    GithubRepositoryConfig | Callable[[str, str], GithubRepositoryConfig]
+)
+
+
+class ReconcileAction(Enum):
+    """! What reconciliation does to a repository."""
+
+    # Settings already match. Nothing is sent.
+    Skip = auto()
+    # Changed settings are sent.
+    Update = auto()
+    # Failed to read the repository. Nothing is sent.
+    Failed = auto()
+
+
+@dataclass
+class ReconcilePlanEntry:
+    """! Planned reconciliation of a repository."""
+
+    # Github Username of Repository Owner.
+    owner: str
+    # Name of the repository.
+    name: str
+    # what to do with the repository.
+    action: ReconcileAction
+    # desired settings, with the repository name.
+    desired: Optional[GithubRepositoryConfig] = None
+    # changed settings, as field -> (current, desired).
+    changes: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+    # response of reading the repository.
+    response: Optional[GithubRepositoryResponse] = None
+
+    def describe(self) -> str:
+        """! One line per change, e.g. for a dry run."""
+        target = f"{self.owner}/{self.name}"
+        if self.action == ReconcileAction.Skip:
+            return f"{target}: in sync"
+        if self.action == ReconcileAction.Failed:
+            assert self.response is not None
+            return (
+                f"{target}: failed to read"
+                f" ({self.response.internal_code.name})"
+            )
+
+        lines = [f"{target}: update"]
+        for change_field, (current, desired) in sorted(self.changes.items()):
+            lines.append(
+                f"  {change_field}: {json.dumps(current)}"
+                f" -> {json.dumps(desired)}"
+            )
+        return "\n".join(lines)
+
+
+class GithubRepositoryReconciler:
+    """! Brings settings of many repositories to a desired configuration.
+
+    A plan is made first by reading current settings and diffing them
+    with the desired ones. Applying the plan sends only changed fields,
+    and repositories already in sync get no request at all. Updates
+    keep the Polytope config file check of GithubRepository.update.
+
+    @param requester    Requester shared by all repositories.
+    @param max_workers  Number of repositories processed at once.
+    @param config_file_cache    Polytope config file detection cache.
+                                Cache of the token if None.
+    """
+
+    def __init__(
+        self,
+        requester: Requester,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        config_file_cache: Optional[PolytopeConfigFileCache] = None,
+    ) -> None:
+        self._requester: Requester = requester
+        self._bulk = GithubRepositoryBulk(
+            requester, max_workers, config_file_cache
+        )
+
+    def plan(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        desired: DesiredConfig,
+    ) -> List[ReconcilePlanEntry]:
+        """! Plan reconciliation of repositories, reading each of them.
+
+        @param targets: (owner, name) pairs of repositories.
+        @param desired: desired configuration. Name is replaced per repository.
+        @return plan entries in the order of targets.
+        """
+        return self._plan_all(
+            [(owner, name, None) for owner, name in targets], desired
+        )
+
+    def plan_organization(
+        self,
+        org: str,
+        desired: DesiredConfig,
+        include: Callable[[str], bool] = lambda name: True,
+    ) -> List[ReconcilePlanEntry]:
+        """! Plan reconciliation of repositories of an organization.
+
+        Repositories are read from the paginated organization listing.
+        Only repositories whose listing lacks some settings (e.g. merge
+        settings, reported to admins only) are read one by one.
+
+        @param org: organization name.
+        @param desired: desired configuration. Name is replaced per repository.
+        @param include: filter of repository names.
+        @return plan entries in the order of the listing.
+        @exception requests.HTTPError   if the listing is not fetched successfully.
+        """
+        listed = [
+            (org, repository["name"], repository)
+            for repository in self._requester.paginate(f"/orgs/{org}/repos")
+            if include(repository["name"])
+        ]
+        return self._plan_all(listed, desired)
+
+    def apply(
+        self, plan: Sequence[ReconcilePlanEntry]
+    ) -> List[GithubRepositoryResponse]:
+        """! Apply a plan, sending only changed fields.
+
+        @return responses in the order of the plan. Skipped repositories
+                succeed without a request, failed reads keep their response.
+        """
+
+        def update_with(
+            entry: ReconcilePlanEntry,
+        ) -> Callable[[GithubRepository], GithubRepositoryResponse]:
+            def update_one(repo: GithubRepository) -> GithubRepositoryResponse:
+                assert entry.desired is not None
+                return repo.update(entry.desired, only_fields=entry.changes)
+
+            return update_one
+
+        # one job per entry, so a repository planned twice is updated twice.
+        updated = iter(
+            self._bulk.run_each(
+                [
+                    ((entry.owner, entry.name), update_with(entry))
+                    for entry in plan
+                    if entry.action == ReconcileAction.Update
+                ]
+            )
+        )
+
+        responses = []
+        for entry in plan:
+            if entry.action == ReconcileAction.Update:
+                responses.append(next(updated))
+            elif entry.action == ReconcileAction.Failed:
+                assert entry.response is not None
+                responses.append(entry.response)
+            else:
+                responses.append(
+                    GithubRepositoryResponse(
+                        status_code=None,
+                        internal_code=GHIC.Success,
+                        error_msg="",
+                        errors="",
+                    )
+                )
+        return responses
+
+    def reconcile(
+        self,
+        targets: Sequence[Tuple[str, str]],
+        desired: DesiredConfig,
+        dry_run: bool = False,
+    ) -> Tuple[List[ReconcilePlanEntry], List[GithubRepositoryResponse]]:
+        """! Plan, and apply unless dry_run.
+
+        @return plan, and responses of applying it (empty on dry run).
+        """
+        plan = self.plan(targets, desired)
+        if dry_run:
+            return plan, []
+        return plan, self.apply(plan)
+
+    def _plan_all(
+        self,
+        targets: Sequence[Tuple[str, str, Optional[Dict[str, Any]]]],
+        desired: DesiredConfig,
+    ) -> List[ReconcilePlanEntry]:
+        def plan_one(
+            target: Tuple[str, str, Optional[Dict[str, Any]]]
+        ) -> ReconcilePlanEntry:
+            owner, name, repository = target
+            if repository is None or not all(
+                reconciled_field in repository
+                for reconciled_field in RECONCILED_FIELDS
+            ):
+                repository_or_error = self._read(owner, name)
+                if isinstance(repository_or_error, GithubRepositoryResponse):
+                    return ReconcilePlanEntry(
+                        owner,
+                        name,
+                        ReconcileAction.Failed,
+                        response=repository_or_error,
+                    )
+                repository = repository_or_error
+
+            config = desired(owner, name) if callable(desired) else desired
+            config = replace(config, name=name)
+            changes = diff_config(repository, config)
+            return ReconcilePlanEntry(
+                owner,
+                name,
+                ReconcileAction.Update if changes else ReconcileAction.Skip,
+                desired=config,
+                changes=changes,
+            )
+
+        if not targets:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self._bulk.max_workers, len(targets)),
+            thread_name_prefix="polytope-reconcile",
+        ) as executor:
+            return list(executor.map(plan_one, targets))
+
+    def _read(
+        self, owner: str, name: str
+    ) -> Dict[str, Any] | GithubRepositoryResponse:
+        """! Read a repository, or an error response."""
+        repo_or_error = self._bulk.open(owner, name)
+        if isinstance(repo_or_error, GithubRepositoryResponse):
+            return repo_or_error
+
+        try:
+            result = self._requester.request(
+                RequestVerb.GET, repo_or_error.get_url
+            )
+        except requests.RequestException as e:
+            return GithubRepositoryResponse(
+                status_code=None,
+                internal_code=GHIC.RequestFailed,
+                error_msg=str(e),
+                errors="",
+            )
+
+        if result.status_code != 200:
+            return post_process_error_response(result, GHIC.FailedToRead)
+        try:
+            repository = json.loads(result.content)
+        except ValueError:
+            repository = None
+        if not isinstance(repository, dict):
+            return post_process_error_response(result, GHIC.FailedToRead)
+        return repository
+
+
+def diff_config(
+    repository: Dict[str, Any], desired: GithubRepositoryConfig
+) -> Dict[str, Tuple[Any, Any]]:
+    """! Settings of a repository differing from the desired ones.
+
+    Settings missing in the repository JSON are unknown, so they count
+    as changed. Null description and homepage equal empty strings.
+
+    @param repository: repository JSON of Github REST API.
+    @param desired: desired configuration.
+    @return changed settings, as field -> (current, desired).
+    """
+    desired_fields = asdict(desired)
+    changes = {}
+    for reconciled_field in RECONCILED_FIELDS:
+        current = repository.get(reconciled_field)
+        if current is None and reconciled_field in ("description", "homepage"):
+            current = ""
+        if (
+            reconciled_field not in repository
+            or current != desired_fields[reconciled_field]
+        ):
+            changes[reconciled_field] = (
+                current,
+                desired_fields[reconciled_field],
+            )
+    return changes
@@ -1,27 +1,67 @@
+import base64
+import binascii
 import json
-from dataclasses import asdict
-from typing import Optional, Tuple, Type
+from dataclasses import asdict, fields
+from enum import Enum, auto
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Type,
+)
 
-import re
 import requests
 
-from polytope.github import Requester
+from polytope.github import Requester, RequesterPool
 from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Requester import close_response
 from polytope.github.Session import RequestsSession
 from polytope.github.Session import Session
 from polytope.github.Token import Token
+from polytope.utils.jsonstream import iter_json_array
 
+from .ConfigFileCache import (
+    PolytopeConfigFileCache,
+    get_default_config_file_cache,
+)
 from .InternalCode import GithubRepositoryInternalCode as GHIC
+from .NameValidation import (  # noqa: F401
+    GITHUB_REPONAME_REGEX,
+    GITHUB_USERNAME_REGEX,
+    is_valid_github_repository_name,
+    is_valid_github_user_name,
+)
 from .RepositoryConfig import GithubRepositoryConfig
 from .Response import GithubRepositoryResponse
 
 
-# alphanumeric or hyphen, starts & ends with alphanumeric
-GITHUB_USERNAME_REGEX = (
-    r"^[a-zA-Z\d](?:[a-zA-Z\d]|-(?=[a-zA-Z\d])){0,37}[a-zA-Z\d]$"
-)
-# alphanumeric, hyphen, underscore. starts & ends with alphanumeric.
-GITHUB_REPONAME_REGEX = r"^[a-z0-9]+(?:(?:(?:[._]|__|[-]*)[a-z0-9]+)+)?$"
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-Github-Api-Version": "2022-11-28",
+}
+# contents API media type serving files raw. Directories stay JSON.
+GITHUB_RAW_MEDIA_TYPE = "application/vnd.github.raw+json"
+
+POLYTOPE_CONFIG_FILE_NAME = "polytope.yaml"
+
+# bytes read at once from streamed responses.
+STREAM_CHUNK_SIZE = 8 * 1024
+
+
+class PolytopeConfigLookup(Enum):
+    """! How to detect Polytope config file of a repository."""
+
+    # List the root directory and search the file in it.
+    Listing = auto()
+    # Get the file itself from contents API.
+    Contents = auto()
+    # Send HEAD to the file in contents API, without downloading it.
+    Head = auto()
 
 
 class GithubRepository:
@@ -31,6 +71,13 @@ class GithubRepository:
     @param name         Name of the repository.
     @param token        Personal Access Token.
     @param session      type of session.
+    @param requester    Requester to share with other repositories.
+                        Overrides token and session when given.
+    @param pool         Requester pool to take a shared requester from.
+                        Overrides session when given.
+    @param config_file_cache    Polytope config file detection cache.
+                                Cache of the token if None.
+    @param config_lookup        How to detect Polytope config file.
     """
 
     def __init__(
@@ -39,25 +86,45 @@ class GithubRepository:
         name: str,
         token: Token,
         session_cls: Type[Session] = RequestsSession,
+        requester: Optional[Requester] = None,
+        pool: Optional[RequesterPool] = None,
+        config_file_cache: Optional[PolytopeConfigFileCache] = None,
+        config_lookup: PolytopeConfigLookup = PolytopeConfigLookup.Listing,
     ) -> None:
         assert 0 < len(owner)
         assert is_valid_github_user_name(owner)
         assert 0 < len(name)
         assert is_valid_github_repository_name(name)
 
-        self._requester = Requester(
-            token=token,
-            base_url="https://api.github.com",
-            headers={
-                "Accept": "application/vnd.github+json",
-                "X-Github-Api-Version": "2022-11-28",
-            },
-            SessionClass=session_cls,
-        )
+        if requester is None and pool is not None:
+            requester = pool.get(token, GITHUB_API_URL, GITHUB_API_HEADERS)
+        if requester is None:
+            requester = create_github_requester(token, session_cls)
+        self._requester: Requester = requester
 
         self.owner: str = owner
         self.config: GithubRepositoryConfig = GithubRepositoryConfig(name)
-        self._has_polytope_config_file: Optional[bool] = None
+        if config_file_cache is None:
+            config_file_cache = get_default_config_file_cache(requester)
+        self._config_file_cache: PolytopeConfigFileCache = config_file_cache
+        self.config_lookup: PolytopeConfigLookup = config_lookup
+
+    @property
+    def _has_polytope_config_file(self) -> Optional[bool]:
+        """! Fresh cached detection result of Polytope config file, None if absent."""
+        entry = self._config_file_cache.get(self.owner, self.config.name)
+        if entry is None or not self._config_file_cache.is_fresh(entry):
+            return None
+        return entry.has_polytope_config_file
+
+    @_has_polytope_config_file.setter
+    def _has_polytope_config_file(self, value: Optional[bool]) -> None:
+        if value is None:
+            self._config_file_cache.invalidate(self.owner, self.config.name)
+        else:
+            self._config_file_cache.set(
+                self.owner, self.config.name, value, "cached response"
+            )
 
     @property
     def create_url(self) -> str:
@@ -180,14 +247,27 @@ class GithubRepository:
         return f"/repos/{self.owner}/{self.config.name}"
 
     def update(
-        self, config: Optional[GithubRepositoryConfig] = None
+        self,
+        config: Optional[GithubRepositoryConfig] = None,
+        only_fields: Optional[Iterable[str]] = None,
     ) -> GithubRepositoryResponse:
         """
         Update repository by config.
 
         @param config: GithubRepositoryConfig class. Includes name.
+        @param only_fields: fields of config to send. All fields if None.
+        @exception ValueError   if only_fields has unknown fields.
         """
 
+        if only_fields is not None:
+            only_fields = set(only_fields)
+            unknown = only_fields - {
+                config_field.name
+                for config_field in fields(GithubRepositoryConfig)
+            }
+            if unknown:
+                raise ValueError(f"unknown fields: {sorted(unknown)}")
+
         has_polytope_config_file, reason = self.fetch_polytope_config_file()
         if not has_polytope_config_file:
             return GithubRepositoryResponse(
@@ -210,7 +290,11 @@ class GithubRepository:
             )
 
         data = asdict(config)
+        if only_fields is not None:
+            data = {key: data[key] for key in data if key in only_fields}
 
+        # the repository may change from here, even on failure.
+        self._has_polytope_config_file = None
         result = self._requester.request(
             verb=RequestVerb.PATCH,
             api_url=self.update_url,
@@ -221,6 +305,8 @@ class GithubRepository:
         if result.status_code == 200:
             # Update local config only if update is succeeded.
             self.config = config
+            # drop stale result of the new name, if renamed.
+            self._has_polytope_config_file = None
             return GithubRepositoryResponse(
                 status_code=result.status_code,
                 internal_code=GHIC.Success,
@@ -246,6 +332,7 @@ class GithubRepository:
                 errors="",
             )
 
+        self._has_polytope_config_file = None
         result = self._requester.request(
             verb=RequestVerb.DELETE, api_url=self.delete_url
         )
@@ -266,6 +353,11 @@ class GithubRepository:
         """! URL to fetch contents."""
         return f"/repos/{self.owner}/{self.config.name}/contents"
 
+    @property
+    def fetch_config_file_url(self) -> str:
+        """! URL to fetch Polytope config file itself."""
+        return f"{self.fetch_contents_url}/{POLYTOPE_CONFIG_FILE_NAME}"
+
     # fetch Polytope config file (polytope.yaml)
     def fetch_polytope_config_file(
         self, ignore_cache: bool = False
@@ -273,41 +365,194 @@ class GithubRepository:
         """
         Fetch Polytope config file (currently polytope.yaml).
 
+        Detection results are shared across repositories through the
+        config file cache. Expired results are revalidated by a conditional
+        request, so an unchanged listing is not downloaded again.
+        The request depends on config_lookup: the root directory listing,
+        the file itself, or a HEAD request to the file.
+
         @param ignore_cache: If set to False, use cached value instead of sending requests.
         """
+        cache = self._config_file_cache
+        entry = cache.get(self.owner, self.config.name)
 
         # believe cached result
-        if self._has_polytope_config_file is not None and not ignore_cache:
-            return self._has_polytope_config_file, "cached response"
+        if entry is not None and cache.is_fresh(entry) and not ignore_cache:
+            return entry.has_polytope_config_file, "cached response"
+
+        if ignore_cache:
+            # clear cache
+            cache.invalidate(self.owner, self.config.name)
+            entry = None
+
+        headers: Dict[str, str] = {}
+        if (
+            entry is not None
+            and entry.etag is not None
+            and entry.etag_lookup == self.config_lookup.name
+        ):
+            headers["If-None-Match"] = entry.etag
+
+        kwargs: Dict[str, Any] = {}
+        if self.config_lookup == PolytopeConfigLookup.Listing:
+            # the listing is parsed while it downloads, see below.
+            kwargs["stream"] = True
+            verb, api_url = RequestVerb.GET, self.fetch_contents_url
+        elif self.config_lookup == PolytopeConfigLookup.Contents:
+            verb, api_url = RequestVerb.GET, self.fetch_config_file_url
+        else:
+            # a file is served raw, but a directory still as a JSON listing.
+            headers["Accept"] = GITHUB_RAW_MEDIA_TYPE
+            verb, api_url = RequestVerb.HEAD, self.fetch_config_file_url
+        if headers:
+            kwargs["headers"] = headers
+
+        result = self._requester.request(verb=verb, api_url=api_url, **kwargs)
+        try:
+            if result.status_code == 304 and entry is not None:
+                cache.refresh(self.owner, self.config.name)
+                return entry.has_polytope_config_file, entry.reason
+
+            detected: Optional[Tuple[bool, str]] = None
+            if self.config_lookup == PolytopeConfigLookup.Listing:
+                if result.status_code == 200:
+                    chunks = iter_response_content(result)
+                    try:
+                        detected = parse_polytope_config_stream(chunks)
+                    finally:
+                        # release the connection without reading the rest.
+                        chunks.close()
+            elif result.status_code == 404:
+                detected = False, "could not detect polytope.yaml file"
+            elif self.config_lookup == PolytopeConfigLookup.Contents:
+                if result.status_code == 200:
+                    detected = parse_polytope_config_file_entry(result.content)
+            elif result.status_code == 200:
+                content_type = result.headers.get("Content-Type", "")
+                if content_type.startswith("application/json"):
+                    detected = False, "could not detect polytope.yaml file"
+                else:
+                    detected = True, "detected polytope.yaml file"
+
+            if detected is not None:
+                has_polytope_config_file, reason = detected
+                cache.set(
+                    self.owner,
+                    self.config.name,
+                    has_polytope_config_file,
+                    reason,
+                    etag=result.headers.get("ETag"),
+                    etag_lookup=self.config_lookup.name,
+                )
+                return has_polytope_config_file, reason
+
+            else:
+                # transient failures are not cached, the next call retries.
+                return False, "unsuccessful response"
+        finally:
+            # a streamed body may be left unread, release its connection.
+            close_response(result)
+
+    def read_polytope_config_file(self) -> Tuple[Optional[str], str]:
+        """
+        Read Polytope config file (currently polytope.yaml) in one request.
 
-        # clear cache
-        self._has_polytope_config_file = None
+        The detection result is stored in the config file cache as well,
+        so a following update or delete needs no extra request.
 
+        @return (text of the config file or None if missing, reason)
+        """
+        cache = self._config_file_cache
         result = self._requester.request(
-            verb=RequestVerb.GET, api_url=self.fetch_contents_url
+            verb=RequestVerb.GET, api_url=self.fetch_config_file_url
         )
 
         if result.status_code == 200:
-            (
-                self._has_polytope_config_file,
+            text, reason = decode_polytope_config_file_entry(result.content)
+            # the file was read as the Contents lookup does.
+            cache.set(
+                self.owner,
+                self.config.name,
+                text is not None,
                 reason,
-            ) = parse_polytope_config_file(result.content)
-            return self._has_polytope_config_file, reason
-
+                etag=result.headers.get("ETag"),
+                etag_lookup=PolytopeConfigLookup.Contents.name,
+            )
+            return text, reason
+        elif result.status_code == 404:
+            reason = "could not detect polytope.yaml file"
+            cache.set(self.owner, self.config.name, False, reason)
+            return None, reason
         else:
-            self._has_polytope_config_file = False
-            return self._has_polytope_config_file, "unsuccessful response"
+            return None, "unsuccessful response"
 
+    # Awaitable versions of CRUD requests.
+    # Each one runs its blocking counterpart in the requester's worker pool.
 
-# Utility functions
+    async def acreate(
+        self, description: str = "", private: bool = True
+    ) -> GithubRepositoryResponse:
+        """! Awaitable version of create."""
+        return await self._requester.run_async(
+            self.create, description, private
+        )
 
+    async def acreate_without_template(
+        self, config: Optional[GithubRepositoryConfig] = None
+    ) -> GithubRepositoryResponse:
+        """! Awaitable version of create_without_template."""
+        return await self._requester.run_async(
+            self.create_without_template, config
+        )
 
-def is_valid_github_repository_name(name: str) -> bool:
-    return re.match(GITHUB_REPONAME_REGEX, name) is not None
+    async def aget(self) -> GithubRepositoryResponse:
+        """! Awaitable version of get."""
+        return await self._requester.run_async(self.get)
+
+    async def aupdate(
+        self,
+        config: Optional[GithubRepositoryConfig] = None,
+        only_fields: Optional[Iterable[str]] = None,
+    ) -> GithubRepositoryResponse:
+        """! Awaitable version of update."""
+        return await self._requester.run_async(
+            self.update, config, only_fields
+        )
 
+    async def adelete(self) -> GithubRepositoryResponse:
+        """! Awaitable version of delete."""
+        return await self._requester.run_async(self.delete)
 
-def is_valid_github_user_name(name: str) -> bool:
-    return re.match(GITHUB_USERNAME_REGEX, name) is not None
+    async def afetch_polytope_config_file(
+        self, ignore_cache: bool = False
+    ) -> Tuple[bool, str]:
+        """! Awaitable version of fetch_polytope_config_file."""
+        return await self._requester.run_async(
+            self.fetch_polytope_config_file, ignore_cache
+        )
+
+
+# Utility functions
+
+
+def create_github_requester(
+    token: Token,
+    session_cls: Type[Session] = RequestsSession,
+    session: Optional[Session] = None,
+) -> Requester:
+    """! Create a requester for Github REST API.
+
+    @param token        Personal Access Token.
+    @param session_cls  type of session.
+    @param session      session instance to use instead of session_cls.
+    """
+    return Requester(
+        token=token,
+        base_url=GITHUB_API_URL,
+        headers=GITHUB_API_HEADERS,
+        SessionClass=session_cls,
+        session=session,
+    )
 
 
 def fetch_message_and_errors(
@@ -317,8 +562,10 @@ def fetch_message_and_errors(
     if not result.content:
         return None, None
 
-    # TODO handle error while decoding json
-    dic = json.loads(result.content)
+    try:
+        dic = json.loads(result.content)
+    except ValueError:
+        return None, None
 
     if not isinstance(dic, dict):
         return None, None
@@ -340,23 +587,121 @@ def parse_polytope_config_file(
     if not resp_content:
         return False, "empty response content"
 
-    # @todo error handling while json unmarshal
-    contents = json.loads(resp_content)
+    return parse_polytope_config_stream([resp_content])
+
 
-    if not isinstance(contents, list):
+def parse_polytope_config_stream(
+    resp_chunks: Iterable[str | bytes | bytearray],
+) -> Tuple[bool, str]:
+    """! Parse streamed http response content from Github root directory.
+
+    Entries are decoded one at a time, and reading stops at the Polytope
+    config file, so memory stays flat however large the directory is.
+
+    @param resp_chunks: chunks of http response content.
+    @return (if there is a Polytope config file, error msg while finding configs)
+    """
+    received = False
+
+    def non_empty_chunks() -> Iterator[str | bytes | bytearray]:
+        nonlocal received
+        for chunk in resp_chunks:
+            if chunk:
+                received = True
+                yield chunk
+
+    try:
+        for content in iter_json_array(non_empty_chunks()):
+            if (
+                isinstance(content, dict)
+                and content.get("type") == "file"
+                and content.get("name") == POLYTOPE_CONFIG_FILE_NAME
+            ):
+                return True, "detected polytope.yaml file"
+    except json.JSONDecodeError:
+        if not received:
+            return False, "empty response content"
+        return False, "malformed response content"
+    except ValueError:
         return False, "non-list response for contents"
 
-    sanity = (
-        lambda content: isinstance(content, dict)
-        and content["type"] == "file"
-        and content["name"] == "polytope.yaml"
-    )
-    contents = list(filter(sanity, contents))
+    return False, "could not detect polytope.yaml file"
+
+
+def iter_response_content(
+    result: requests.Response, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Generator[str | bytes, None, None]:
+    """! Iterate content of a response, streaming it if not read yet.
+
+    The response is closed once the iterator is exhausted or closed.
+    """
+    if result.raw is None:
+        # built in memory, e.g. served from cache or mocked.
+        if result.content:
+            yield result.content
+        return
 
-    if len(contents) > 0:
-        return True, "detected polytope.yaml file"
+    try:
+        yield from result.iter_content(chunk_size)
+    finally:
+        result.close()
+
+
+def parse_polytope_config_file_entry(
+    resp_content: str | bytes | bytearray | None,
+) -> Tuple[bool, str]:
+    """! Parse http response content of Polytope config file from contents API.
+
+    @param resp_content: content of http response.
+    @return (if it is a Polytope config file, error msg while finding configs)
+    """
+    entry, reason = _load_polytope_config_file_entry(resp_content)
+    return entry is not None, reason
+
+
+def decode_polytope_config_file_entry(
+    resp_content: str | bytes | bytearray | None,
+) -> Tuple[Optional[str], str]:
+    """! Decode text of Polytope config file from contents API response.
+
+    @param resp_content: content of http response.
+    @return (text of the config file or None, error msg while decoding)
+    """
+    entry, reason = _load_polytope_config_file_entry(resp_content)
+    if entry is None:
+        return None, reason
+
+    if entry.get("encoding") != "base64":
+        return None, "unsupported encoding of polytope.yaml file"
+
+    try:
+        text = base64.b64decode(entry.get("content", "")).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None, "malformed polytope.yaml file"
+
+    return text, "read polytope.yaml file"
+
+
+def _load_polytope_config_file_entry(
+    resp_content: str | bytes | bytearray | None,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """! Contents API entry of Polytope config file, or None with a reason."""
+    if not resp_content:
+        return None, "empty response content"
+
+    try:
+        content = json.loads(resp_content)
+    except ValueError:
+        return None, "malformed response content"
+
+    if (
+        isinstance(content, dict)
+        and content.get("type") == "file"
+        and content.get("name") == POLYTOPE_CONFIG_FILE_NAME
+    ):
+        return content, "detected polytope.yaml file"
     else:
-        return False, "could not detect polytope.yaml file"
+        return None, "could not detect polytope.yaml file"
 
 
 def post_process_error_response(
@@ -1,5 +1,4 @@
 import os
-from dotenv import load_dotenv
 
 GITHUB_TOKEN: str = ""
 
@@ -7,6 +6,9 @@ GITHUB_TOKEN: str = ""
 def load_environment():
     global GITHUB_TOKEN
 
+    # imported here, so importing this module stays cheap.
+    from dotenv import load_dotenv
+
     load_dotenv()
     GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN") or "token-is-not-set"
 
@@ -0,0 +1,679 @@
+import io
+import struct
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from .Contest import Contest
+from .ContestProblem import ContestProblem
+from .Problem import Problem
+from .ProblemChecker import ProblemChecker
+from .ProblemCheckerTest import ProblemCheckerTest, ProblemCheckerVerdict
+from .ProblemSolution import ProblemSolution, ProblemSolutionType
+from .ProblemStatement import ProblemStatement
+from .ProblemTest import (
+    ProblemPublicTest,
+    ProblemTest,
+    ProblemTestRaw,
+    ProblemTestScript,
+)
+from .ProblemValidator import ProblemValidator
+from .ProblemValidatorTest import ProblemValidatorTest, ProblemValidatorVerdict
+from .SourceCode import SourceCode, SourceCodeLanguage
+
+PACKAGE_MAGIC = b"PLTP"
+PACKAGE_VERSION = 1
+
+# magic, version, kind, reserved, number of sections.
+_HEADER = struct.Struct("<4sHBBI")
+# section, offset from the start of the package, length.
+_ENTRY = struct.Struct("<HQQ")
+
+_T = TypeVar("_T")
+
+# kinds of secret tests, in the order of their codes.
+_TEST_KINDS = (ProblemTest, ProblemTestRaw, ProblemTestScript)
+
+
+class PackageFormatError(ValueError):
+    """! Malformed or unsupported Polytope package."""
+
+
+class PackageKind(Enum):
+    """! Kinds of Polytope packages enumeration class."""
+
+    # Package of a problem.
+    Problem = 1
+    # Package of a contest, holding a problem package per problem.
+    Contest = 2
+
+
+class PackageSection(Enum):
+    """! Sections of Polytope packages enumeration class."""
+
+    # Problem or contest metadata. Always loaded.
+    Metadata = 1
+    # Problem statements.
+    Statements = 2
+    # Public test data.
+    PublicTests = 3
+    # Secret test data.
+    Tests = 4
+    # Problem solutions.
+    Solutions = 5
+    # Problem checker and its tests.
+    Checker = 6
+    # Problem validator and its tests.
+    Validator = 7
+    # Problem package of a contest problem.
+    ContestProblem = 8
+
+
+# sections loaded from problem packages, if not specified.
+PROBLEM_SECTIONS = (
+    PackageSection.Statements,
+    PackageSection.PublicTests,
+    PackageSection.Tests,
+    PackageSection.Solutions,
+    PackageSection.Checker,
+    PackageSection.Validator,
+)
+
+
+@dataclass(frozen=True)
+class PackageSectionEntry:
+    """! An entry of the offset table of a package."""
+
+    # content of the section.
+    section: PackageSection
+    # offset from the start of the package.
+    offset: int
+    # length in bytes.
+    length: int
+
+
+def write_problem(problem: Problem, file: BinaryIO) -> None:
+    """! Write a problem package, section by section.
+
+    Items of a section are encoded and written one at a time, so test
+    data is never held in memory twice.
+
+    @param problem  problem to write
+    @param file     seekable binary file, written from its position
+    """
+    _write_package(
+        file,
+        PackageKind.Problem,
+        [
+            (
+                PackageSection.Metadata,
+                lambda f: f.write(_encode_problem_metadata(problem)),
+            ),
+            (
+                PackageSection.Statements,
+                lambda f: _write_items(
+                    f, list(problem.statements.values()), _encode_statement
+                ),
+            ),
+            (
+                PackageSection.PublicTests,
+                lambda f: _write_items(
+                    f, problem.public_tests, _encode_public_test
+                ),
+            ),
+            (
+                PackageSection.Tests,
+                lambda f: _write_items(f, problem.tests, _encode_test),
+            ),
+            (
+                PackageSection.Solutions,
+                lambda f: _write_items(f, problem.solutions, _encode_solution),
+            ),
+            (
+                PackageSection.Checker,
+                lambda f: _write_checker(f, problem.checker),
+            ),
+            (
+                PackageSection.Validator,
+                lambda f: _write_validator(f, problem.validator),
+            ),
+        ],
+    )
+
+
+def write_contest(contest: Contest, file: BinaryIO) -> None:
+    """! Write a contest package, with a problem package per problem.
+
+    @param contest  contest to write
+    @param file     seekable binary file, written from its position
+    """
+    metadata = _Encoder()
+    metadata.string(contest.name)
+    metadata.strings(
+        [contest_problem.index for contest_problem in contest.problems]
+    )
+
+    def problem_writer(problem: Problem) -> Callable[[BinaryIO], None]:
+        return lambda f: write_problem(problem, f)
+
+    _write_package(
+        file,
+        PackageKind.Contest,
+        [(PackageSection.Metadata, lambda f: f.write(metadata.data))]
+        + [
+            (
+                PackageSection.ContestProblem,
+                problem_writer(contest_problem.problem),
+            )
+            for contest_problem in contest.problems
+        ],
+    )
+
+
+def read_problem(
+    file: BinaryIO, sections: Optional[Iterable[PackageSection]] = None
+) -> Problem:
+    """! Read a problem package.
+
+    @param file     seekable binary file, read from its position
+    @param sections sections to load. All if None.
+    @return problem. Sections not loaded are left empty.
+    @exception PackageFormatError   if the package is malformed.
+    """
+    return PackageReader(file).problem(sections)
+
+
+def read_contest(
+    file: BinaryIO,
+    indices: Optional[Iterable[str]] = None,
+    sections: Optional[Iterable[PackageSection]] = None,
+) -> Contest:
+    """! Read a contest package.
+
+    @param file     seekable binary file, read from its position
+    @param indices  indices of problems to load. All if None.
+    @param sections sections of problems to load. All if None.
+    @return contest with loaded problems, in contest order.
+    @exception PackageFormatError   if the package is malformed.
+    """
+    return PackageReader(file).contest(indices, sections)
+
+
+class PackageReader:
+    """! Reader of a Polytope package, loading sections on demand.
+
+    Only the header and the offset table are read on construction.
+    Each section is read by seeking to its offset, so unused test data
+    is never read. Every section must lie inside the package, so a
+    corrupted table never makes the reader seek or allocate past it.
+    """
+
+    def __init__(self, file: BinaryIO, size: Optional[int] = None) -> None:
+        """! PackageReader class initializer.
+
+        @param file     seekable binary file, positioned at the package
+        @param size     bytes of the package. Up to the end of file if None.
+        @exception PackageFormatError   if the header is malformed.
+        """
+        self._file = file
+        self._start = file.tell()
+        if size is None:
+            size = file.seek(0, io.SEEK_END) - self._start
+            file.seek(self._start)
+        self._size = size
+
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise PackageFormatError("package header is truncated.")
+        magic, version, kind, _, count = _HEADER.unpack(header)
+        if magic != PACKAGE_MAGIC:
+            raise PackageFormatError("not a Polytope package.")
+        if PACKAGE_VERSION < version:
+            raise PackageFormatError(f"unsupported package version {version}.")
+        try:
+            self.kind = PackageKind(kind)
+        except ValueError:
+            raise PackageFormatError(f"unknown package kind {kind}.")
+
+        table_size = _ENTRY.size * count
+        if size < _HEADER.size + table_size:
+            raise PackageFormatError("package offset table is truncated.")
+        table = file.read(table_size)
+        if len(table) < table_size:
+            raise PackageFormatError("package offset table is truncated.")
+        self.entries: List[PackageSectionEntry] = []
+        for section, offset, length in _ENTRY.iter_unpack(table):
+            if size < offset + length:
+                raise PackageFormatError(
+                    f"package section {section} is out of the package."
+                )
+            try:
+                self.entries.append(
+                    PackageSectionEntry(
+                        PackageSection(section), offset, length
+                    )
+                )
+            except ValueError:
+                raise PackageFormatError(f"unknown package section {section}.")
+
+    def read_section(self, entry: PackageSectionEntry) -> bytes:
+        """! Read the content of a section."""
+        self._file.seek(self._start + entry.offset)
+        data = self._file.read(entry.length)
+        if len(data) < entry.length:
+            raise PackageFormatError(f"{entry.section.name} is truncated.")
+        return data
+
+    def problem(
+        self, sections: Optional[Iterable[PackageSection]] = None
+    ) -> Problem:
+        """! Load the problem of a problem package.
+
+        @param sections sections to load. All if None.
+        @return problem. Sections not loaded are left empty.
+        """
+        self._expect(PackageKind.Problem)
+        wanted = set(PROBLEM_SECTIONS if sections is None else sections)
+
+        problem = self._decode(
+            self._entry(PackageSection.Metadata), _decode_problem_metadata
+        )
+        for entry in self.entries:
+            if entry.section not in wanted:
+                continue
+            if entry.section == PackageSection.Statements:
+                statements = self._decode(entry, _decode_statements)
+                problem.statements = {
+                    statement.lang: statement for statement in statements
+                }
+            elif entry.section == PackageSection.PublicTests:
+                problem.public_tests = self._decode(
+                    entry, _items(_decode_public_test)
+                )
+            elif entry.section == PackageSection.Tests:
+                problem.tests = self._decode(entry, _items(_decode_test))
+            elif entry.section == PackageSection.Solutions:
+                problem.solutions = self._decode(
+                    entry, _items(_decode_solution)
+                )
+            elif entry.section == PackageSection.Checker:
+                problem.checker = self._decode(entry, _decode_checker)
+            elif entry.section == PackageSection.Validator:
+                problem.validator = self._decode(entry, _decode_validator)
+        return problem
+
+    def contest(
+        self,
+        indices: Optional[Iterable[str]] = None,
+        sections: Optional[Iterable[PackageSection]] = None,
+    ) -> Contest:
+        """! Load the contest of a contest package.
+
+        @param indices  indices of problems to load. All if None.
+        @param sections sections of problems to load. All if None.
+        @return contest with loaded problems, in contest order.
+        """
+        self._expect(PackageKind.Contest)
+        name, contest_indices = self._decode(
+            self._entry(PackageSection.Metadata), _decode_contest_metadata
+        )
+        problem_entries = [
+            entry
+            for entry in self.entries
+            if entry.section == PackageSection.ContestProblem
+        ]
+        if len(problem_entries) != len(contest_indices):
+            raise PackageFormatError("contest problems do not match indices.")
+
+        wanted = None if indices is None else set(indices)
+        problems = []
+        for index, entry in zip(contest_indices, problem_entries):
+            if wanted is not None and index not in wanted:
+                continue
+            self._file.seek(self._start + entry.offset)
+            reader = PackageReader(self._file, entry.length)
+            problems.append(
+                ContestProblem(index=index, problem=reader.problem(sections))
+            )
+        return Contest(name=name, problems=problems)
+
+    def _expect(self, kind: PackageKind) -> None:
+        if self.kind != kind:
+            raise PackageFormatError(
+                f"expected a {kind.name} package, not {self.kind.name}."
+            )
+
+    def _entry(self, section: PackageSection) -> PackageSectionEntry:
+        for entry in self.entries:
+            if entry.section == section:
+                return entry
+        raise PackageFormatError(f"{section.name} section is missing.")
+
+    def _decode(
+        self,
+        entry: PackageSectionEntry,
+        decode: Callable[["_Decoder"], _T],
+    ) -> _T:
+        decoder = _Decoder(self.read_section(entry))
+        try:
+            value = decode(decoder)
+        except (IndexError, UnicodeDecodeError, ValueError) as e:
+            raise PackageFormatError(f"{entry.section.name} is malformed: {e}")
+        if not decoder.done:
+            raise PackageFormatError(
+                f"{entry.section.name} has trailing data."
+            )
+        return value
+
+
+def _write_package(
+    file: BinaryIO,
+    kind: PackageKind,
+    sections: Sequence[Tuple[PackageSection, Callable[[BinaryIO], object]]],
+) -> None:
+    """! Write header, reserve the offset table, and fill it at the end."""
+    start = file.tell()
+    file.write(
+        _HEADER.pack(
+            PACKAGE_MAGIC, PACKAGE_VERSION, kind.value, 0, len(sections)
+        )
+    )
+    table_offset = file.tell()
+    file.write(bytes(_ENTRY.size * len(sections)))
+
+    table = []
+    for section, write in sections:
+        offset = file.tell() - start
+        write(file)
+        table.append(
+            _ENTRY.pack(section.value, offset, file.tell() - start - offset)
+        )
+
+    end = file.tell()
+    file.seek(table_offset)
+    file.write(b"".join(table))
+    file.seek(end)
+
+
+def _write_items(
+    file: BinaryIO, items: Sequence[_T], encode: Callable[[_T], bytes]
+) -> None:
+    file.write(_varint(len(items)))
+    for item in items:
+        file.write(encode(item))
+
+
+def _items(
+    decode: Callable[["_Decoder"], _T]
+) -> Callable[["_Decoder"], List[_T]]:
+    """! Decoder of a section of items prefixed by their number."""
+    return lambda decoder: [decode(decoder) for _ in range(decoder.varint())]
+
+
+def _write_checker(file: BinaryIO, checker: ProblemChecker) -> None:
+    file.write(_encode_optional_code(checker.code))
+    _write_items(file, checker.tests, _encode_checker_test)
+
+
+def _write_validator(file: BinaryIO, validator: ProblemValidator) -> None:
+    file.write(_encode_optional_code(validator.code))
+    _write_items(file, validator.tests, _encode_validator_test)
+
+
+class _Encoder:
+    """! Encoder of values into bytes.
+
+    Integers are zigzag LEB128 varints, strings are UTF-8 prefixed by
+    their length, and enums are their integer values.
+    """
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def integer(self, value: int) -> None:
+        self.data += _varint(value << 1 if 0 <= value else (~value << 1) | 1)
+
+    def string(self, value: str) -> None:
+        encoded = value.encode("utf-8")
+        self.data += _varint(len(encoded))
+        self.data += encoded
+
+    def boolean(self, value: bool) -> None:
+        self.data.append(1 if value else 0)
+
+    def strings(self, values: Sequence[str]) -> None:
+        self.data += _varint(len(values))
+        for value in values:
+            self.string(value)
+
+    def code(self, code: SourceCode) -> None:
+        self.string(code.context)
+        self.integer(code.lang.value)
+
+
+class _Decoder:
+    """! Decoder of values encoded by _Encoder."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    @property
+    def done(self) -> bool:
+        return len(self.data) <= self.pos
+
+    def varint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def integer(self) -> int:
+        value = self.varint()
+        return ~(value >> 1) if value & 1 else value >> 1
+
+    def string(self) -> str:
+        length = self.varint()
+        start = self.pos
+        end = start + length
+        if len(self.data) < end:
+            raise IndexError("string runs past the section.")
+        self.pos = end
+        return self.data[start:end].decode("utf-8")
+
+    def boolean(self) -> bool:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value != 0
+
+    def strings(self) -> List[str]:
+        return [self.string() for _ in range(self.varint())]
+
+    def code(self) -> SourceCode:
+        return SourceCode(
+            context=self.string(), lang=SourceCodeLanguage(self.integer())
+        )
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while 0x80 <= value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _encode_problem_metadata(problem: Problem) -> bytes:
+    encoder = _Encoder()
+    encoder.string(problem.id)
+    encoder.string(problem.name)
+    encoder.string(problem.note)
+    encoder.integer(problem.time_limit_in_ms)
+    encoder.integer(problem.memory_limit_in_mib)
+    encoder.strings(problem.tags)
+    encoder.strings(problem.owners)
+    return bytes(encoder.data)
+
+
+def _decode_problem_metadata(decoder: _Decoder) -> Problem:
+    return Problem(
+        _id=decoder.string(),
+        name=decoder.string(),
+        note=decoder.string(),
+        time_limit_in_ms=decoder.integer(),
+        memory_limit_in_mib=decoder.integer(),
+        tags=decoder.strings(),
+        owners=decoder.strings(),
+        checker=ProblemChecker(),
+        validator=ProblemValidator(),
+    )
+
+
+def _decode_contest_metadata(decoder: _Decoder) -> Tuple[str, List[str]]:
+    return decoder.string(), decoder.strings()
+
+
+def _encode_statement(statement: ProblemStatement) -> bytes:
+    encoder = _Encoder()
+    encoder.string(statement.lang)
+    encoder.string(statement.context)
+    return bytes(encoder.data)
+
+
+def _decode_statements(decoder: _Decoder) -> List[ProblemStatement]:
+    return [
+        ProblemStatement(lang=decoder.string(), context=decoder.string())
+        for _ in range(decoder.varint())
+    ]
+
+
+def _encode_public_test(test: ProblemPublicTest) -> bytes:
+    encoder = _Encoder()
+    encoder.string(test.input)
+    encoder.string(test.output)
+    encoder.boolean(test.verify_output)
+    return bytes(encoder.data)
+
+
+def _decode_public_test(decoder: _Decoder) -> ProblemPublicTest:
+    return ProblemPublicTest(
+        input=decoder.string(),
+        output=decoder.string(),
+        verify_output=decoder.boolean(),
+    )
+
+
+def _encode_test(test: ProblemTest) -> bytes:
+    if type(test) not in _TEST_KINDS:
+        raise TypeError(f"unsupported test type {type(test).__name__}.")
+
+    encoder = _Encoder()
+    encoder.data += _varint(_TEST_KINDS.index(type(test)))
+    encoder.string(test.id)
+    if isinstance(test, ProblemTestRaw):
+        encoder.string(test.input)
+    elif isinstance(test, ProblemTestScript):
+        encoder.string(test.script)
+    return bytes(encoder.data)
+
+
+def _decode_test(decoder: _Decoder) -> ProblemTest:
+    kind = _TEST_KINDS[decoder.varint()]
+    _id = decoder.string()
+    if kind is ProblemTestRaw:
+        return ProblemTestRaw(_id=_id, input=decoder.string())
+    if kind is ProblemTestScript:
+        return ProblemTestScript(_id=_id, script=decoder.string())
+    return ProblemTest(_id=_id)
+
+
+def _encode_solution(solution: ProblemSolution) -> bytes:
+    encoder = _Encoder()
+    encoder.string(solution.id)
+    encoder.string(solution.author)
+    encoder.string(solution.name)
+    encoder.code(solution.code)
+    encoder.integer(solution.type.value)
+    return bytes(encoder.data)
+
+
+def _decode_solution(decoder: _Decoder) -> ProblemSolution:
+    return ProblemSolution(
+        _id=decoder.string(),
+        author=decoder.string(),
+        name=decoder.string(),
+        code=decoder.code(),
+        type=ProblemSolutionType(decoder.integer()),
+    )
+
+
+def _encode_optional_code(code: Optional[SourceCode]) -> bytes:
+    encoder = _Encoder()
+    encoder.boolean(code is not None)
+    if code is not None:
+        encoder.code(code)
+    return bytes(encoder.data)
+
+
+def _decode_optional_code(decoder: _Decoder) -> Optional[SourceCode]:
+    return decoder.code() if decoder.boolean() else None
+
+
+def _encode_checker_test(test: ProblemCheckerTest) -> bytes:
+    encoder = _Encoder()
+    encoder.string(test.id)
+    encoder.string(test.input)
+    encoder.string(test.output)
+    encoder.string(test.answer)
+    encoder.integer(test.expected.value)
+    return bytes(encoder.data)
+
+
+def _decode_checker(decoder: _Decoder) -> ProblemChecker:
+    code = _decode_optional_code(decoder)
+    tests = [
+        ProblemCheckerTest(
+            _id=decoder.string(),
+            input=decoder.string(),
+            output=decoder.string(),
+            answer=decoder.string(),
+            expected=ProblemCheckerVerdict(decoder.integer()),
+        )
+        for _ in range(decoder.varint())
+    ]
+    return ProblemChecker(code=code, tests=tests)
+
+
+def _encode_validator_test(test: ProblemValidatorTest) -> bytes:
+    encoder = _Encoder()
+    encoder.string(test.id)
+    encoder.string(test.input)
+    encoder.integer(test.expected.value)
+    return bytes(encoder.data)
+
+
+def _decode_validator(decoder: _Decoder) -> ProblemValidator:
+    code = _decode_optional_code(decoder)
+    tests = [
+        ProblemValidatorTest(
+            _id=decoder.string(),
+            input=decoder.string(),
+            expected=ProblemValidatorVerdict(decoder.integer()),
+        )
+        for _ in range(decoder.varint())
+    ]
+    return ProblemValidator(code=code, tests=tests)
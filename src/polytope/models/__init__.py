@@ -1,6 +1,10 @@
 __all__ = [
     "Contest",
     "ContestProblem",
+    "PackageFormatError",
+    "PackageKind",
+    "PackageReader",
+    "PackageSection",
     "Problem",
     "ProblemChecker",
     "ProblemCheckerTest",
@@ -17,10 +21,24 @@ __all__ = [
     "ProblemValidatorVerdict",
     "SourceCode",
     "SourceCodeLanguage",
+    "read_contest",
+    "read_problem",
+    "write_contest",
+    "write_problem",
 ]
 
 from .Contest import Contest
 from .ContestProblem import ContestProblem
+from .Package import (
+    PackageFormatError,
+    PackageKind,
+    PackageReader,
+    PackageSection,
+    read_contest,
+    read_problem,
+    write_contest,
+    write_problem,
+)
 from .Problem import Problem
 from .ProblemChecker import ProblemChecker
 from .ProblemCheckerTest import ProblemCheckerTest, ProblemCheckerVerdict
@@ -1,7 +1,21 @@
 __all__ = [
+    "iter_json_array",
     "PolytopeUUID",
+    "SortablePolytopeUUID",
+    "UUIDBlock",
+    "UUIDIndex",
+    "UUIDPool",
     "uuid",
     "uuid_bulk",
 ]
 
-from .uuidgen import PolytopeUUID, uuid, uuid_bulk
+from .uuidgen import (
+    PolytopeUUID,
+    SortablePolytopeUUID,
+    UUIDBlock,
+    UUIDPool,
+    uuid,
+    uuid_bulk,
+)
+from .uuidindex import UUIDIndex
+from .jsonstream import iter_json_array
@@ -0,0 +1,133 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_TERMINATORS = _WHITESPACE + ",]"
+
+# consumed characters kept in buffer before it is trimmed.
+_TRIM_THRESHOLD = 64 * 1024
+
+
+class _Buffer:
+    """! Text buffer filled from chunks on demand."""
+
+    def __init__(self, chunks: Iterable[str | bytes | bytearray]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text: str = ""
+        self.pos: int = 0
+        self.exhausted: bool = False
+
+    def fill(self, size: int = 0) -> bool:
+        """! Append chunks until size characters follow pos, or one chunk.
+
+        @param size     characters wanted after pos. One chunk if 0.
+        @return False if no chunk is left.
+        """
+        if self.exhausted:
+            return False
+
+        pieces = []
+        buffered = len(self.text) - self.pos
+        while True:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.exhausted = True
+                pieces.append(self._decoder.decode(b"", final=True))
+                break
+            if isinstance(chunk, str):
+                piece = chunk
+            else:
+                piece = self._decoder.decode(bytes(chunk))
+            pieces.append(piece)
+            buffered += len(piece)
+            if size <= buffered:
+                break
+
+        # drop consumed text, so the buffer stays as small as one item.
+        consumed = self.pos if _TRIM_THRESHOLD < self.pos else 0
+        self.text = self.text[consumed:] + "".join(pieces)
+        self.pos -= consumed
+        return not self.exhausted or 1 < len(pieces)
+
+    def peek(self) -> str:
+        """! Next non-whitespace character, empty string at the end."""
+        while True:
+            while (
+                self.pos < len(self.text)
+                and self.text[self.pos] in _WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+
+def iter_json_array(
+    chunks: Iterable[str | bytes | bytearray],
+) -> Iterator[Any]:
+    """! Incrementally parse a JSON array, yielding its items one by one.
+
+    Chunks are read only as far as needed, so a consumer that stops early
+    never reads the rest, and memory is bounded by twice the largest item.
+
+    @param chunks   Pieces of UTF-8 encoded JSON text, e.g. Response.iter_content().
+    @exception json.JSONDecodeError if the text is not valid JSON.
+    @exception ValueError   if the text is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _Buffer(chunks)
+
+    first = buffer.peek()
+    if first == "":
+        raise json.JSONDecodeError("Expecting value", buffer.text, buffer.pos)
+    if first != "[":
+        raise ValueError("JSON text is not an array")
+    buffer.pos += 1
+
+    if buffer.peek() == "]":
+        return
+
+    while True:
+        if buffer.peek() == "":
+            raise json.JSONDecodeError(
+                "Expecting value", buffer.text, buffer.pos
+            )
+
+        # decode an item, reading more until it is complete.
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer.text, buffer.pos)
+            except json.JSONDecodeError:
+                # retry once the buffered item doubled, not on every chunk,
+                # so a large item is decoded a logarithmic number of times.
+                if buffer.fill(2 * (len(buffer.text) - buffer.pos)):
+                    continue
+                raise
+
+            # a number cut by a chunk boundary (e.g. "1.5e" of "1.5e3")
+            # decodes as its prefix, so it is complete only if terminated.
+            if (
+                not isinstance(item, (dict, list, str))
+                and (
+                    end == len(buffer.text)
+                    or buffer.text[end] not in _TERMINATORS
+                )
+                and buffer.fill()
+            ):
+                continue
+            break
+
+        buffer.pos = end
+        yield item
+
+        delimiter = buffer.peek()
+        if delimiter == "]":
+            return
+        if delimiter != ",":
+            raise json.JSONDecodeError(
+                "Expecting ',' delimiter", buffer.text, buffer.pos
+            )
+        buffer.pos += 1
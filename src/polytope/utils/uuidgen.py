@@ -1,26 +1,63 @@
+import itertools
 import random
 import math
-from typing import List
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+from .uuidindex import UUIDIndex
 
 # collision probability in 150,000 entries ~ 1%
 # lowercase alphabet + digit except [l, 1, o, 0]
 DEFAULT_ALPHABET = "abcdefghijkmnpqrstuvwxyz23456789"
 DEFAULT_LENGTH = 8
 
+# fraction of all uuids an index may hold. Past it, most draws collide.
+MAX_INDEX_FILL = 0.5
+
+# uuids of one prefix partition held in memory at most, while streaming.
+DEFAULT_PARTITION_SIZE = 1 << 16
+# uuids claimed from an index at once, while streaming.
+DEFAULT_CLAIM_BATCH_SIZE = 4096
+# uuids a pool generates at once.
+DEFAULT_POOL_BATCH_SIZE = 1024
+
+# length of sortable uuids: time prefix, then random suffix.
+DEFAULT_SORTABLE_LENGTH = 14
+# start of time of sortable uuids, 2020-01-01T00:00:00Z.
+SORTABLE_EPOCH = 1577836800.0
+# seconds the time prefix of sortable uuids covers from the epoch.
+SORTABLE_TIME_SPAN = 80 * 365.25 * 24 * 3600
+# seconds per tick of the time prefix.
+DEFAULT_RESOLUTION = 0.001
+# shortest random suffix of sortable uuids.
+MIN_RANDOM_LENGTH = 3
+
+# characters drawn per os.urandom call at most, to bound memory of a batch.
+MAX_BATCH_CHARS = 1 << 20
+
 
 class PolytopeUUID:
     """UUID generator class."""
 
     def __init__(
-        self, alphabet: str = DEFAULT_ALPHABET, length: int = DEFAULT_LENGTH
+        self,
+        alphabet: str = DEFAULT_ALPHABET,
+        length: int = DEFAULT_LENGTH,
+        index: Optional[UUIDIndex] = None,
     ) -> None:
         """! PolytopeUUID class initializer.
 
         @param alphabet     alphabet for generating uuid
         @param length       length of uuid
+        @param index        persistent index of issued uuids. If given, uuids
+                            are distinct from every uuid issued through it.
         """
         self.alphabet = alphabet
         self.length = length
+        self.index = index
 
     @property
     def alphabet(self) -> str:
@@ -36,6 +73,7 @@ class PolytopeUUID:
             raise ValueError("alphabet must consist of distinct characters.")
 
         self._alphabet = value
+        self._byte_tables = _byte_tables(value)
 
     @property
     def length(self) -> int:
@@ -52,6 +90,9 @@ class PolytopeUUID:
 
     def uuid(self) -> str:
         """! A method for generating uuid."""
+        if self.index is not None:
+            return self.uuid_bulk(1)[0]
+
         char_list = [random.choice(self.alphabet) for _ in range(self.length)]
         return "".join(char_list)
 
@@ -64,21 +105,527 @@ class PolytopeUUID:
             raise ValueError("count must be non-negative.")
         if 0 == count:
             return []
+        if self.index is not None:
+            return self._claim_uuids(count)
         if 1 == count:
             return [self.uuid()]
 
+        self._check_capacity(count)
+
+        # draw the whole batch, and draw again only for collisions.
+        uuids = dict.fromkeys(self._random_uuids(count))
+        while len(uuids) < count:
+            uuids.update(dict.fromkeys(self._random_uuids(count - len(uuids))))
+        return list(uuids)
+
+    def iter_uuids(
+        self,
+        count: Optional[int] = None,
+        worker: int = 0,
+        workers: int = 1,
+        partition_size: int = DEFAULT_PARTITION_SIZE,
+    ) -> Iterator[str]:
+        """! Lazily generate distinct uuids.
+
+        The uuid space is dealt to workers by a prefix chosen from the
+        alphabet, length and workers only, so workers streaming with the
+        same alphabet, length and workers never share a uuid, even in
+        separate processes and with different counts. Each worker splits
+        its own prefixes further into partitions, visited once each in
+        random order. Only uuids of the current partition are kept to
+        detect collisions, so memory is bounded by partition_size
+        however many uuids are streamed.
+
+        With an index, uuids are claimed from it in batches instead.
+
+        @param count    number of uuids to generate per worker. If None,
+                        stream until the collision bound of uuid_bulk.
+        @param worker   number of this worker, in [0, workers)
+        @param workers  number of workers streaming at once
+        @param partition_size   uuids of one partition at most
+        @exception ValueError   if count is too large.
+        """
+        if count is not None and count < 0:
+            raise ValueError("count must be non-negative.")
+        if not 0 <= worker < workers:
+            raise ValueError("worker must be in [0, workers).")
+        if partition_size < 1:
+            raise ValueError("partition_size must be positive.")
+
+        if self.index is not None:
+            return self._iter_claimed(count)
+
+        size = len(self.alphabet)
+        # 0.01 * (|alphabet| ** length), as in uuid_bulk.
+        capacity = int(0.01 * size**self.length)
+        total = capacity if count is None else count * workers
+        if capacity < total:
+            raise ValueError("count is too large to generate distinct uuids")
+
+        # the prefix picking the worker depends on nothing per stream.
+        worker_length = 1
+        while (
+            worker_length < self.length - 1 and size**worker_length < workers
+        ):
+            worker_length += 1
+        if size**worker_length < workers:
+            raise ValueError("workers must not exceed partitions.")
+
+        # then partitions of this worker are bounded by partition_size.
+        owned = (size**worker_length - worker + workers - 1) // workers
+        wanted = (
+            count
+            if count is not None
+            else capacity * owned // size**worker_length
+        )
+        sub_length = 0
+        while (
+            worker_length + sub_length < self.length - 1
+            and partition_size * owned * size**sub_length < wanted
+        ):
+            sub_length += 1
+
+        prefix_length = worker_length + sub_length
+        if count is None:
+            quota = math.ceil(capacity / size**prefix_length)
+        else:
+            quota = math.ceil(count / (owned * size**sub_length))
+        if size ** (self.length - prefix_length) < quota:
+            raise ValueError("count is too large to generate distinct uuids")
+        return self._iter_partitioned(
+            count, worker, workers, worker_length, sub_length, quota
+        )
+
+    def _iter_partitioned(
+        self,
+        count: Optional[int],
+        worker: int,
+        workers: int,
+        worker_length: int,
+        sub_length: int,
+        quota: int,
+    ) -> Iterator[str]:
+        size = len(self.alphabet)
+        prefix_length = worker_length + sub_length
+        subs = size**sub_length
+        owned = (size**worker_length - worker + workers - 1) // workers
+        partitions = owned * subs
+
+        # visit partitions in the random order of an affine permutation.
+        multiplier = 1
+        if 1 < partitions:
+            multiplier = random.randrange(1, partitions)
+            while math.gcd(multiplier, partitions) != 1:
+                multiplier = random.randrange(1, partitions)
+        offset = random.randrange(partitions)
+
+        remaining = count
+        for position in range(partitions):
+            if remaining is not None and remaining <= 0:
+                return
+
+            partition = (multiplier * position + offset) % partitions
+            owner_prefix = (partition // subs) * workers + worker
+            wanted = quota if remaining is None else min(quota, remaining)
+            prefix = _encode(
+                owner_prefix, worker_length, self.alphabet
+            ) + _encode(partition % subs, sub_length, self.alphabet)
+            suffixes = dict.fromkeys(
+                self._random_uuids(wanted, self.length - prefix_length)
+            )
+            while len(suffixes) < wanted:
+                suffixes.update(
+                    dict.fromkeys(
+                        self._random_uuids(
+                            wanted - len(suffixes),
+                            self.length - prefix_length,
+                        )
+                    )
+                )
+            for suffix in suffixes:
+                yield prefix + suffix
+            if remaining is not None:
+                remaining -= wanted
+
+    def _iter_claimed(self, count: Optional[int]) -> Iterator[str]:
+        remaining = count
+        while remaining is None or 0 < remaining:
+            batch = DEFAULT_CLAIM_BATCH_SIZE
+            if remaining is not None:
+                batch = min(batch, remaining)
+                remaining -= batch
+            yield from self._claim_uuids(batch)
+
+    def reserve(self, count: int) -> "UUIDBlock":
+        """! Reserve a block of uuids, e.g. for a worker process.
+
+        With an index, uuids are recorded as issued on reservation, so a
+        worker mints from its block without touching the index. Unused
+        uuids of a block are never issued again.
+
+        @param count    number of uuids to reserve
+        """
+        return UUIDBlock(self.uuid_bulk(count))
+
+    def _claim_uuids(self, count: int) -> List[str]:
+        """! Generate uuids never issued through the index, and issue them."""
+        assert self.index is not None
+        # issued uuids only cost redraws, so the index may fill the space
+        # far beyond the collision bound of unindexed generation.
+        issued = len(self.index) + count
+        if math.log(issued) - self.length * math.log(
+            len(self.alphabet)
+        ) > math.log(MAX_INDEX_FILL):
+            raise ValueError("count is too large for uuids left in the index")
+
+        uuids: List[str] = []
+        while len(uuids) < count:
+            uuids.extend(
+                self.index.claim(self._random_uuids(count - len(uuids)))
+            )
+        return uuids
+
+    def _check_capacity(self, count: int) -> None:
         # 0.01 * (|alphabet| ** length) < count
         if math.log(count) - self.length * math.log(
             len(self.alphabet)
         ) > -math.log(100):
             raise ValueError("count is too large to generate distinct uuids")
 
-        uuid_set: set = set()
-        while len(uuid_set) < count:
-            uuid = self.uuid()
-            if uuid not in uuid_set:
-                uuid_set.add(uuid)
-        return list(uuid_set)
+    def _random_uuids(
+        self, count: int, length: Optional[int] = None
+    ) -> List[str]:
+        """! Generate uuids in a batch, not necessarily distinct.
+
+        @param count    number of uuids to generate
+        @param length   length of uuids. self.length if None.
+        """
+        if length is None:
+            length = self.length
+        text = self._random_text(count * length)
+        bounds = zip(
+            range(0, len(text), length),
+            range(length, len(text) + 1, length),
+        )
+        return [text[start:end] for start, end in bounds]
+
+    def _random_text(self, size: int) -> str:
+        """! Uniformly random text over alphabet.
+
+        Random bytes are mapped to characters by bytes.translate, deleting
+        bytes above the largest multiple of the alphabet size, so every
+        character is equally likely.
+        """
+        if self._byte_tables is None:
+            # characters do not fit in a byte.
+            return "".join(random.choices(self.alphabet, k=size))
+
+        table, rejected, accept_ratio = self._byte_tables
+        chunks = []
+        remaining = size
+        while 0 < remaining:
+            # draw a little more than expected, so one draw usually suffices.
+            wanted = min(remaining, MAX_BATCH_CHARS)
+            draw = int(wanted / accept_ratio * 1.05) + 16
+            chunk = os.urandom(draw).translate(table, rejected)[:wanted]
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks).decode("latin-1")
+
+
+class SortablePolytopeUUID(PolytopeUUID):
+    """! Generator of uuids sorted by creation order.
+
+    A uuid is a time prefix followed by a random suffix, both written
+    with the characters of the alphabet in code point order, so uuids
+    compare as strings like their creation times. Within a tick the
+    suffix starts at a random value and counts up, so uuids of one
+    generator strictly increase. Past the last suffix of a tick, the
+    next tick is borrowed ahead of the clock.
+
+    Generators in other processes draw their own random suffix start,
+    so they rarely collide; distinct worker numbers, or an index, rule
+    collisions out.
+    """
+
+    def __init__(
+        self,
+        alphabet: str = DEFAULT_ALPHABET,
+        length: int = DEFAULT_SORTABLE_LENGTH,
+        index: Optional[UUIDIndex] = None,
+        resolution: float = DEFAULT_RESOLUTION,
+        worker: int = 0,
+        workers: int = 1,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """! SortablePolytopeUUID class initializer.
+
+        @param alphabet     alphabet for generating uuid
+        @param length       length of uuid, time prefix included
+        @param index        persistent index of issued uuids
+        @param resolution   seconds per tick of the time prefix
+        @param worker       number of this generator, in [0, workers)
+        @param workers      number of generators whose uuids never collide
+        @param clock        current time in seconds since the Unix epoch
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive.")
+        if not 0 <= worker < workers:
+            raise ValueError("worker must be in [0, workers).")
+
+        self._resolution = resolution
+        self.worker = worker
+        self.workers = workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        # tick and suffix of the last uuid. Suffix is None for a new tick.
+        self._last_tick = -1
+        self._last_suffix: Optional[int] = None
+        super().__init__(alphabet, length, index)
+
+    @property
+    def alphabet(self) -> str:
+        """! An alphabet property for generating uuid."""
+        return self._alphabet
+
+    @alphabet.setter
+    def alphabet(self, value: str) -> None:
+        """! A setter method for alphabet property."""
+        PolytopeUUID.alphabet.fset(self, value)  # type: ignore[attr-defined]
+        self._digits = "".join(sorted(value))
+        if hasattr(self, "_length"):
+            self._check_layout()
+
+    @property
+    def length(self) -> int:
+        """! A length property of uuid."""
+        return self._length
+
+    @length.setter
+    def length(self, value: int) -> None:
+        """! A setter method for length property."""
+        PolytopeUUID.length.fset(self, value)  # type: ignore[attr-defined]
+        self._check_layout()
+
+    @property
+    def resolution(self) -> float:
+        """! Seconds per tick of the time prefix."""
+        return self._resolution
+
+    @property
+    def time_length(self) -> int:
+        """! Length of the time prefix, covering SORTABLE_TIME_SPAN."""
+        ticks = SORTABLE_TIME_SPAN / self._resolution
+        return math.ceil(math.log(ticks) / math.log(len(self._digits)))
+
+    def uuid(self) -> str:
+        """! A method for generating uuid."""
+        if self.index is not None:
+            return super().uuid()
+        return self._random_uuids(1)[0]
+
+    def iter_uuids(
+        self,
+        count: Optional[int] = None,
+        worker: int = 0,
+        workers: int = 1,
+        partition_size: int = DEFAULT_PARTITION_SIZE,
+    ) -> Iterator[str]:
+        """! Lazily generate distinct, increasing uuids.
+
+        Uuids of a generator never repeat, so nothing is kept in memory.
+        Workers are set on the generator, not per stream.
+
+        @param count    number of uuids to generate. Endless if None.
+        @exception ValueError   if worker or workers is given.
+        """
+        if count is not None and count < 0:
+            raise ValueError("count must be non-negative.")
+        if (worker, workers) != (0, 1):
+            raise ValueError("set worker and workers on the generator.")
+        if self.index is not None:
+            return self._iter_claimed(count)
+        return self._iter_sequence(count)
+
+    def _iter_sequence(self, count: Optional[int]) -> Iterator[str]:
+        remaining = count
+        while remaining is None or 0 < remaining:
+            batch = DEFAULT_CLAIM_BATCH_SIZE
+            if remaining is not None:
+                batch = min(batch, remaining)
+                remaining -= batch
+            yield from self._random_uuids(batch)
+
+    def _random_uuids(
+        self, count: int, length: Optional[int] = None
+    ) -> List[str]:
+        """! Generate increasing uuids, distinct within this generator."""
+        assert length is None
+        time_length = self.time_length
+        random_length = self.length - time_length
+        suffixes = len(self._digits) ** random_length
+
+        with self._lock:
+            tick = int((self._clock() - SORTABLE_EPOCH) / self._resolution)
+            if self._last_tick < tick:
+                self._last_tick, self._last_suffix = tick, None
+
+            uuids = []
+            prefix = _encode(self._last_tick, time_length, self._digits)
+            for _ in range(count):
+                if self._last_suffix is not None:
+                    self._last_suffix += self.workers
+                if self._last_suffix is None or suffixes <= self._last_suffix:
+                    if self._last_suffix is not None:
+                        self._last_tick += 1
+                        prefix = _encode(
+                            self._last_tick, time_length, self._digits
+                        )
+                    # start low in the suffix space, leaving room to count up.
+                    start = random.randrange(suffixes // 2 // self.workers)
+                    self._last_suffix = start * self.workers + self.worker
+                uuids.append(
+                    prefix
+                    + _encode(self._last_suffix, random_length, self._digits)
+                )
+
+        if not 0 <= self._last_tick < len(self._digits) ** time_length:
+            raise ValueError("clock is out of range of sortable uuids.")
+        return uuids
+
+    def _check_layout(self) -> None:
+        if self._length - self.time_length < MIN_RANDOM_LENGTH:
+            raise ValueError(
+                f"length must exceed the time prefix of {self.time_length}"
+                f" characters by {MIN_RANDOM_LENGTH} or more."
+            )
+        if len(self._digits) ** (self._length - self.time_length) < (
+            2 * self.workers
+        ):
+            raise ValueError("workers must not exceed random suffixes.")
+
+
+class UUIDBlock:
+    """! Reserved uuids, handed out one at a time.
+
+    A block holds plain strings, so it can be pickled to a worker process.
+    """
+
+    def __init__(self, uuids: List[str]) -> None:
+        self._uuids = uuids
+        self._next = 0
+
+    def __len__(self) -> int:
+        """! Number of uuids left."""
+        return len(self._uuids) - self._next
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        if len(self._uuids) <= self._next:
+            raise StopIteration
+        self._next += 1
+        return self._uuids[self._next - 1]
+
+    def take(self, count: int) -> List[str]:
+        """! Take count uuids.
+
+        @exception ValueError   if fewer than count uuids are left.
+        """
+        if len(self) < count:
+            raise ValueError("block has fewer uuids than requested.")
+        start, end = self._next, self._next + count
+        self._next = end
+        return self._uuids[start:end]
+
+
+class UUIDPool:
+    """! Thread-safe pool handing out distinct uuids in batches.
+
+    Batches are drawn from PolytopeUUID.iter_uuids. Threads share one
+    pool. Processes each create their own pool with a distinct worker
+    number and the same workers, or share an index through the
+    generator, and never hand out the same uuid.
+    """
+
+    def __init__(
+        self,
+        generator: PolytopeUUID,
+        batch_size: int = DEFAULT_POOL_BATCH_SIZE,
+        worker: int = 0,
+        workers: int = 1,
+    ) -> None:
+        """! UUIDPool class initializer.
+
+        @param generator    generator of uuids
+        @param batch_size   uuids generated at once
+        @param worker       number of this process, in [0, workers)
+        @param workers      number of processes with a pool
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive.")
+
+        self.batch_size = batch_size
+        self._stream = generator.iter_uuids(worker=worker, workers=workers)
+        self._buffer: Deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """! Hand out a uuid.
+
+        @exception ValueError   if the pool is exhausted.
+        """
+        with self._lock:
+            if not self._buffer:
+                self._buffer.extend(
+                    itertools.islice(self._stream, self.batch_size)
+                )
+            if not self._buffer:
+                raise ValueError("pool is exhausted.")
+            return self._buffer.popleft()
+
+    def get_batch(self, count: Optional[int] = None) -> List[str]:
+        """! Hand out a batch of uuids.
+
+        @param count    number of uuids. batch_size if None.
+        @exception ValueError   if the pool is exhausted.
+        """
+        if count is None:
+            count = self.batch_size
+        with self._lock:
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(count, len(self._buffer)))
+            ]
+            batch.extend(itertools.islice(self._stream, count - len(batch)))
+        if len(batch) < count:
+            raise ValueError("pool is exhausted.")
+        return batch
+
+
+def _encode(number: int, length: int, digits: str) -> str:
+    """! Digits of number in base |digits|, most significant first."""
+    encoded = []
+    for _ in range(length):
+        number, digit = divmod(number, len(digits))
+        encoded.append(digits[digit])
+    return "".join(reversed(encoded))
+
+
+def _byte_tables(alphabet: str) -> Optional[Tuple[bytes, bytes, float]]:
+    """! Map random bytes to an alphabet.
+
+    @return translation table, rejected bytes and ratio of accepted bytes.
+            None if characters of the alphabet do not fit in a byte.
+    """
+    size = len(alphabet)
+    if 256 < size or any(255 < ord(c) for c in alphabet):
+        return None
+
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[b % size]) for b in range(256))
+    return table, bytes(range(limit, 256)), limit / 256
 
 
 def uuid(
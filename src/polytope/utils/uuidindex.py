@@ -0,0 +1,235 @@
+import contextlib
+import hashlib
+import json
+import math
+import os
+import threading
+import warnings
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on POSIX
+    fcntl = None  # type: ignore[assignment]
+
+# number of files issued uuids are partitioned into.
+DEFAULT_SHARDS = 64
+# number of uuids the bloom filter is sized for. More only raise its
+# false positive rate, which costs exact lookups, never correctness.
+DEFAULT_CAPACITY = 1_000_000
+# false positive rate of the bloom filter at capacity.
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+LOCK_FILE_NAME = "lock"
+# settings fixed when the index is created, e.g. number of shards.
+META_FILE_NAME = "meta.json"
+
+
+class UUIDIndex:
+    """! Persistent set of issued uuids, shared by processes.
+
+    Issued uuids are appended to shard files, chosen by a hash of each
+    uuid, under a directory. A bloom filter in memory answers most
+    lookups, and only its positives are confirmed against one shard
+    file. Claims hold an exclusive file lock, so processes sharing the
+    directory never issue the same uuid twice.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shards: Optional[int] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        fsync: bool = False,
+    ) -> None:
+        """! UUIDIndex class initializer.
+
+        @param directory    directory of index files, created if missing
+        @param shards       number of shard files. Must match existing index.
+                            That of existing index, or DEFAULT_SHARDS if None.
+        @param capacity     number of uuids the bloom filter is sized for
+        @param false_positive_rate  bloom filter false positive rate at capacity
+        @param fsync        flush shard files to disk on every claim
+        @exception ValueError   if shards does not match existing index.
+        """
+        if shards is not None and not 0 < shards <= 256:
+            raise ValueError("shards must be in [1, 256].")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be in (0, 1).")
+
+        if fcntl is None:
+            warnings.warn(
+                "file locks are unavailable, so UUIDIndex is only safe"
+                " within one process.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self.shards = self._load_shards(shards)
+
+        bits = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self._bits = bits
+        self._hashes = max(1, round(bits / capacity * math.log(2)))
+        self._bloom = bytearray((bits + 7) // 8)
+
+        # bytes of each shard file already added to the bloom filter.
+        self._offsets: List[int] = [0] * self.shards
+        self._count = 0
+
+    def claim(self, candidates: Iterable[str]) -> List[str]:
+        """! Issue candidates not issued before, atomically.
+
+        @param candidates   uuids to issue
+        @return issued candidates, in order. Duplicates are issued once.
+        """
+        with self._locked():
+            self._refresh()
+
+            # shard -> its uuids on disk, read only for bloom positives.
+            confirmed: Dict[int, Set[str]] = {}
+            accepted: Dict[str, None] = {}
+            for uuid in candidates:
+                if "\n" in uuid:
+                    raise ValueError("uuid must not contain a line break.")
+                if uuid in accepted:
+                    continue
+                if self._maybe_contains(uuid):
+                    shard = self._shard(uuid)
+                    if shard not in confirmed:
+                        confirmed[shard] = self._read_shard(shard)
+                    if uuid in confirmed[shard]:
+                        continue
+                accepted[uuid] = None
+
+            self._append(list(accepted))
+            return list(accepted)
+
+    def __contains__(self, uuid: object) -> bool:
+        if not isinstance(uuid, str):
+            return False
+        with self._locked():
+            self._refresh()
+            if not self._maybe_contains(uuid):
+                return False
+            return uuid in self._read_shard(self._shard(uuid))
+
+    def __len__(self) -> int:
+        """! Number of issued uuids."""
+        with self._locked():
+            self._refresh()
+            return self._count
+
+    def _load_shards(self, shards: Optional[int]) -> int:
+        """! Number of shards of the index, recorded on its creation."""
+        path = os.path.join(self.directory, META_FILE_NAME)
+        with self._locked():
+            try:
+                with open(path, "r") as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                meta = {"shards": DEFAULT_SHARDS if shards is None else shards}
+                with open(path, "w") as f:
+                    json.dump(meta, f)
+
+        if shards is not None and shards != meta["shards"]:
+            raise ValueError(
+                f"index has {meta['shards']} shards, not {shards}."
+            )
+        return int(meta["shards"])
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """! Hold the index exclusively, across threads and processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+
+            path = os.path.join(self.directory, LOCK_FILE_NAME)
+            with open(path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """! Add uuids appended since last refresh, by any process."""
+        for shard in range(self.shards):
+            path = self._shard_path(shard)
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            if size <= self._offsets[shard]:
+                continue
+
+            with open(path, "rb") as f:
+                f.seek(self._offsets[shard])
+                appended = f.read(size - self._offsets[shard])
+            for uuid in appended.decode("utf-8").split("\n"):
+                if uuid:
+                    self._add_to_bloom(uuid)
+                    self._count += 1
+            self._offsets[shard] = size
+
+    def _append(self, uuids: List[str]) -> None:
+        by_shard: Dict[int, List[str]] = {}
+        for uuid in uuids:
+            by_shard.setdefault(self._shard(uuid), []).append(uuid)
+
+        for shard, shard_uuids in by_shard.items():
+            data = "".join(f"{uuid}\n" for uuid in shard_uuids).encode()
+            with open(self._shard_path(shard), "ab") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._offsets[shard] += len(data)
+            for uuid in shard_uuids:
+                self._add_to_bloom(uuid)
+            self._count += len(shard_uuids)
+
+    def _read_shard(self, shard: int) -> Set[str]:
+        try:
+            with open(self._shard_path(shard), "rb") as f:
+                return set(f.read().decode("utf-8").split("\n")) - {""}
+        except FileNotFoundError:
+            return set()
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard-{shard:02x}.ids")
+
+    def _shard(self, uuid: str) -> int:
+        return _digest(uuid)[0] % self.shards
+
+    def _positions(self, uuid: str) -> Iterator[int]:
+        # double hashing: k positions from two 64-bit hashes.
+        digest = _digest(uuid)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._bits
+
+    def _add_to_bloom(self, uuid: str) -> None:
+        for position in self._positions(uuid):
+            self._bloom[position >> 3] |= 1 << (position & 7)
+
+    def _maybe_contains(self, uuid: str) -> bool:
+        return all(
+            self._bloom[position >> 3] & (1 << (position & 7))
+            for position in self._positions(uuid)
+        )
+
+
+def _digest(uuid: str) -> bytes:
+    return hashlib.blake2b(uuid.encode(), digest_size=16).digest()
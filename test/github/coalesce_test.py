@@ -0,0 +1,113 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.Instrumentation import MetricsAggregator
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import MockSession
+
+
+def get_gated_requester(**kwargs):
+    """Requester whose session blocks until the gate opens."""
+    gate = threading.Event()
+    entered = threading.Event()
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession, **kwargs)
+
+    def mock_request(verb, url, **kwargs):
+        entered.set()
+        gate.wait(5)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.headers['ETag'] = '"etag"'
+        resp._content = url.encode()
+        return resp
+
+    requester.session.inject_request(mock_request)
+    return requester, gate, entered
+
+
+def run_concurrently(requester, gate, entered, calls):
+    with ThreadPoolExecutor(len(calls)) as executor:
+        first = executor.submit(requester.request, *calls[0][0], **calls[0][1])
+        assert entered.wait(5)
+        rest = [executor.submit(requester.request, *args, **kwargs) for args, kwargs in calls[1:]]
+        # let followers join the flight before it lands.
+        while requester.coalesced_requests < len(calls) - 1:
+            time.sleep(0.01)
+        gate.set()
+        return [first.result()] + [future.result() for future in rest]
+
+
+def test_concurrent_identical_gets_share_one_request():
+    metrics = MetricsAggregator()
+    requester, gate, entered = get_gated_requester(coalesce_requests=True, instruments=[metrics])
+    calls = [((RequestVerb.GET, '/repos/owner/repo'), {})] * 4
+
+    responses = run_concurrently(requester, gate, entered, calls)
+
+    assert 1 == len(requester.session.logs)
+    assert 3 == requester.coalesced_requests
+    assert all(b'https://api.github.com/repos/owner/repo' == r.content for r in responses)
+    assert 4 == len({id(r) for r in responses})
+    # each caller owns its headers.
+    responses[1].headers['ETag'] = 'changed'
+    assert '"etag"' == responses[2].headers['ETag']
+    assert 3 == metrics.export()['endpoints']['GET /repos/{owner}/{repo}']['coalesced']
+
+
+def test_different_or_non_idempotent_requests_are_not_shared():
+    requester, gate, entered = get_gated_requester(coalesce_requests=True)
+    gate.set()
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda args: requester.request(*args[0], **args[1]), [
+            ((RequestVerb.GET, '/repos/owner/repo'), {}),
+            ((RequestVerb.GET, '/repos/owner/repo'), {'params': {'page': 2}}),
+            ((RequestVerb.GET, '/repos/owner/repo'), {'stream': True}),
+            ((RequestVerb.PATCH, '/repos/owner/repo'), {'data': '{}'}),
+        ]))
+
+    assert 4 == len(requester.session.logs)
+
+
+def test_coalescing_is_off_by_default():
+    requester, gate, entered = get_gated_requester()
+    gate.set()
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: requester.request(RequestVerb.GET, '/user'), range(4)))
+
+    assert 4 == len(requester.session.logs)
+    assert 0 == requester.coalesced_requests
+
+
+def test_followers_get_leader_error():
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession, coalesce_requests=True)
+    gate = threading.Event()
+    entered = threading.Event()
+
+    def mock_request(verb, url, **kwargs):
+        entered.set()
+        gate.wait(5)
+        raise requests.ConnectionError('down')
+
+    requester.session.inject_request(mock_request)
+
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(requester.request, RequestVerb.GET, '/user', allow_retry=False)
+        assert entered.wait(5)
+        second = executor.submit(requester.request, RequestVerb.GET, '/user', allow_retry=False)
+        while requester.coalesced_requests < 1:
+            time.sleep(0.01)
+        gate.set()
+
+        with pytest.raises(requests.ConnectionError):
+            first.result()
+        with pytest.raises(requests.ConnectionError):
+            second.result()
+
+    assert 1 == len(requester.session.logs)
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from fake_github_server import FakeGithubServer
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Retry import RetryPolicy
+from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
+from polytope.github.repository.Repository import GITHUB_API_HEADERS, GithubRepository, PolytopeConfigLookup
+from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
+
+
+@pytest.fixture
+def server():
+    with FakeGithubServer() as server:
+        yield server
+
+
+def get_requester(server, **kwargs):
+    return Requester(Token('token'), server.base_url, headers=GITHUB_API_HEADERS, **kwargs)
+
+
+def get_repository(server, name='repo', **kwargs):
+    return GithubRepository(
+        'owner', name, Token('token'),
+        requester=get_requester(server, **kwargs),
+        config_file_cache=PolytopeConfigFileCache(),
+    )
+
+
+def test_crud(server):
+    repo = get_repository(server)
+
+    assert GHIC.Success == repo.create(description='desc').internal_code
+    assert GHIC.FailedToCreate == repo.create().internal_code
+    assert GHIC.Success == repo.get().internal_code
+    assert 'desc' == server.repository('owner', 'repo')['description']
+
+    config = GithubRepositoryConfig('renamed', has_wiki=False)
+    assert GHIC.Success == repo.update(config).internal_code
+    assert server.repository('owner', 'repo') is None
+    assert not server.repository('owner', 'renamed')['has_wiki']
+
+    assert GHIC.Success == repo.delete().internal_code
+    assert GHIC.FailedToRead == repo.get().internal_code
+
+
+def test_create_without_template_has_no_config_file(server):
+    server.login = 'owner'
+    repo = get_repository(server)
+
+    assert GHIC.Success == repo.create_without_template().internal_code
+    assert GHIC.UpdateWithoutPolytopeFile == repo.update().internal_code
+
+    server.add_repository('owner', 'other', files={'polytope.yaml': b'a: 1\n'})
+    text, _ = get_repository(server, 'other').read_polytope_config_file()
+    assert 'a: 1\n' == text
+
+
+def test_rate_limit_headers(server):
+    server.rate_limit = 2
+    requester = get_requester(server)
+
+    first = requester.request(RV.GET, '/repos/owner/none')
+    assert '1' == first.headers['X-RateLimit-Remaining']
+    assert requester.rate_limit.remaining == 1
+
+    requester.request(RV.GET, '/repos/owner/none')
+    limited = requester.request(RV.GET, '/repos/owner/none')
+    assert 403 == limited.status_code
+    assert '0' == limited.headers['X-RateLimit-Remaining']
+
+
+def test_etag(server):
+    server.add_repository('owner', 'repo')
+    requester = get_requester(server)
+
+    first = requester.request(RV.GET, '/repos/owner/repo')
+    second = requester.request(RV.GET, '/repos/owner/repo', headers={'If-None-Match': first.headers['ETag']})
+    assert 304 == second.status_code
+    # 304 is not charged against the rate limit.
+    assert first.headers['X-RateLimit-Remaining'] == second.headers['X-RateLimit-Remaining']
+    third = requester.request(RV.GET, '/repos/owner/repo')
+    assert int(first.headers['X-RateLimit-Remaining']) - 1 == int(third.headers['X-RateLimit-Remaining'])
+
+
+def test_injected_failures_are_retried(server):
+    server.add_repository('owner', 'repo')
+    server.fail_next(2)
+    requester = get_requester(server, retry_policy=RetryPolicy(backoff_base=0, jitter=False))
+
+    response = requester.request(RV.GET, '/repos/owner/repo')
+    assert 200 == response.status_code
+    assert 'owner/repo' == json.loads(response.content)['full_name']
+    assert 3 == server.requests_served
+
+    server.error_rate = 1.0
+    assert 503 == get_requester(server).request(RV.GET, '/repos/owner/repo').status_code
+
+
+def test_head_lookup_serves_file_raw(server):
+    server.add_repository('owner', 'repo', files={'polytope.yaml': b'name: a\n'})
+    repo = get_repository(server)
+    repo.config_lookup = PolytopeConfigLookup.Head
+    assert (True, 'detected polytope.yaml file') == repo.fetch_polytope_config_file()
+
+    response = get_requester(server).request(
+        RV.GET, '/repos/owner/repo/contents/polytope.yaml',
+        headers={'Accept': 'application/vnd.github.raw+json'},
+    )
+    assert b'name: a\n' == response.content
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.Instrumentation import Instrument, MetricsAggregator, RequestEvent, normalize_endpoint
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Retry import RetryPolicy
+from polytope.github.Session import MockSession
+
+
+class RecordingInstrument(Instrument):
+    def __init__(self):
+        self.before = []
+        self.after = []
+
+    def before_request(self, event):
+        self.before.append((event.verb, event.endpoint, event.status_code))
+
+    def after_request(self, event):
+        self.after.append(event)
+
+
+def get_test_requester(outcomes, *instruments):
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession,
+                          retry_policy=RetryPolicy(sleep=lambda _: None), instruments=list(instruments))
+    queue = list(outcomes)
+
+    def mock_request(verb, url, **kwargs):
+        outcome = queue.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        resp = requests.Response()
+        resp.status_code = outcome
+        resp._content = b'{"id": 1}'
+        return resp
+
+    requester.session.inject_request(mock_request)
+    return requester
+
+
+def test_normalize_endpoint():
+    assert '/repos/{owner}/{repo}' == normalize_endpoint('/repos/test-owner/test_repo')
+    assert '/repos/{owner}/{repo}/contents/{path}' == normalize_endpoint('/repos/o/r/contents/a/b.yaml?ref=main')
+    assert '/orgs/{org}/repos' == normalize_endpoint('/orgs/studio/repos')
+    assert '/user/repos' == normalize_endpoint('/user/repos')
+
+
+def test_hooks_receive_measurements():
+    instrument = RecordingInstrument()
+    requester = get_test_requester([503, 200], instrument)
+
+    data = json.dumps({'name': 'repo'})
+    requester.request(RequestVerb.PATCH, '/repos/owner/repo', allow_retry=True, data=data)
+
+    assert [(RequestVerb.PATCH, '/repos/{owner}/{repo}', None)] == instrument.before
+    event, = instrument.after
+    assert 200 == event.status_code
+    assert (2, 1) == (event.attempts, event.retries)
+    assert len(data) == event.bytes_out
+    assert len(b'{"id": 1}') == event.bytes_in
+    assert 0 <= event.network_time <= event.total_time
+    assert event.error is None
+
+
+def test_failed_request_reported():
+    instrument = RecordingInstrument()
+    requester = get_test_requester([requests.ConnectionError('reset')], instrument)
+
+    with pytest.raises(requests.ConnectionError):
+        requester.request(RequestVerb.POST, '/user/repos')
+
+    event, = instrument.after
+    assert event.status_code is None
+    assert 'reset' in event.error
+
+
+def test_metrics_aggregator_export():
+    metrics = MetricsAggregator(buckets=(0.1, 1.0))
+    requester = get_test_requester([200, 200, 404, 200], metrics)
+
+    for name in ('a', 'b', 'c'):
+        requester.request(RequestVerb.GET, f'/repos/owner/{name}')
+    requester.add_instrument(RecordingInstrument())
+    requester.request(RequestVerb.GET, '/user')
+
+    exported = metrics.export()
+    repos = exported['endpoints']['GET /repos/{owner}/{repo}']
+    assert 3 == repos['count']
+    assert {'200': 2, '404': 1} == repos['statuses']
+    assert 3 == sum(repos['histogram'])
+    assert 0.1 == repos['p50'] == repos['p99']
+    assert 27 == repos['bytes_in']
+    assert 1 == exported['endpoints']['GET /user']['count']
+
+    json.dumps(exported)
+    metrics.reset()
+    assert {} == metrics.export()['endpoints']
+
+
+def test_quantile_overflow_bucket():
+    metrics = MetricsAggregator(buckets=(0.1,))
+    assert metrics.quantile('GET /user', 0.5) is None
+
+    def record(total_time):
+        metrics.after_request(RequestEvent(
+            verb=RequestVerb.GET, api_url='/user', endpoint='/user',
+            status_code=200, total_time=total_time,
+        ))
+
+    record(0.05)
+    record(0.5)
+    record(2.0)
+    key = f'{RequestVerb.GET} /user'
+    assert [1, 2] == metrics.export()['endpoints'][key]['histogram']
+    assert 0.1 == metrics.quantile(key, 0.3)
+    assert float('inf') == metrics.quantile(key, 0.5)
+    assert float('inf') == metrics.quantile(key, 1.0)
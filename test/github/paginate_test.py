@@ -0,0 +1,135 @@
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.Session import MockSession
+
+BASE_URL = 'https://api.github.com'
+
+
+def make_paged_server(total, requested):
+    lock = threading.Lock()
+
+    def mock_request(verb, url, **kwargs):
+        query = parse_qs(urlparse(url).query)
+        params = {k: v[0] for k, v in query.items()}
+        params.update({k: str(v) for k, v in (kwargs.get('params') or {}).items()})
+        page, per_page = int(params.get('page', 1)), int(params['per_page'])
+        with lock:
+            requested.append(page)
+
+        start = (page - 1) * per_page
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps(list(range(start, min(start + per_page, total)))).encode()
+        if start + per_page < total:
+            path = urlparse(url).path
+            resp.headers['Link'] = (
+                f'<{BASE_URL}{path}?per_page={per_page}&page={page + 1}>; rel="next", '
+                f'<{BASE_URL}{path}?per_page={per_page}&page=99>; rel="last"'
+            )
+        return resp
+
+    return mock_request
+
+
+def get_test_requester(total):
+    requested = []
+    requester = Requester(Token('token'), BASE_URL, MockSession)
+    requester.session.inject_request(make_paged_server(total, requested))
+    return requester, requested
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_paginate_all_items(prefetch):
+    requester, requested = get_test_requester(total=25)
+
+    items = list(requester.paginate('/orgs/test-org/repos', per_page=10, prefetch=prefetch))
+
+    assert list(range(25)) == items
+    assert [1, 2, 3] == sorted(requested)
+    assert requester.session.logs[0].kwargs['params'] == {'per_page': 10}
+
+
+def test_paginate_max_items_stops_fetching():
+    requester, requested = get_test_requester(total=1000)
+
+    items = list(requester.paginate('/orgs/test-org/repos', per_page=10, max_items=15))
+
+    assert list(range(15)) == items
+    assert [1, 2] == sorted(requested)
+
+
+def test_paginate_is_lazy():
+    requester, requested = get_test_requester(total=1000)
+
+    iterator = requester.paginate('/orgs/test-org/repos', per_page=10, prefetch=False)
+    assert [] == requested
+    assert 0 == next(iterator)
+    assert [1] == requested
+    iterator.close()
+
+
+def test_paginate_items_key():
+    requester = Requester(Token('token'), BASE_URL, MockSession)
+
+    def mock_request(verb, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b'{"total_count": 2, "items": [{"name": "a"}, {"name": "b"}]}'
+        return resp
+
+    requester.session.inject_request(mock_request)
+    items = list(requester.paginate('/search/repositories', items_key='items', params={'q': 'polytope'}))
+
+    assert ['a', 'b'] == [item['name'] for item in items]
+    assert {'q': 'polytope', 'per_page': 100} == requester.session.logs[0].kwargs['params']
+
+
+def test_paginate_failed_page():
+    requester = Requester(Token('token'), BASE_URL, MockSession)
+    requester.session.inject_request(lambda verb, url, **kwargs: requests.Response())
+
+    with pytest.raises(requests.HTTPError):
+        list(requester.paginate('/orgs/test-org/repos'))
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_paginate_rejects_foreign_next_page(prefetch):
+    def foreign_server(verb, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b'[1, 2]'
+        resp.headers['Link'] = '<https://evil.example.com/orgs/test-org/repos?page=2>; rel="next"'
+        return resp
+
+    requester = Requester(Token('token'), BASE_URL, MockSession)
+    requester.session.inject_request(foreign_server)
+
+    with pytest.raises(requests.HTTPError, match='evil.example.com'):
+        list(requester.paginate('/orgs/test-org/repos', prefetch=prefetch))
+    assert 1 == len(requester.session.logs)
+
+
+def test_paginate_base_url_with_path():
+    base_url = 'https://github.example.com/api/v3'
+
+    def enterprise_server(verb, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        if 'page=2' in url:
+            resp._content = b'[3]'
+        else:
+            resp._content = b'[1, 2]'
+            resp.headers['Link'] = f'<{base_url}/orgs/test-org/repos?page=2>; rel="next"'
+        return resp
+
+    requester = Requester(Token('token'), base_url, MockSession)
+    requester.session.inject_request(enterprise_server)
+
+    assert [1, 2, 3] == list(requester.paginate('/orgs/test-org/repos'))
+    assert f'{base_url}/orgs/test-org/repos?page=2' == requester.session.logs[1].url
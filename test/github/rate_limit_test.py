@@ -0,0 +1,130 @@
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.RateLimit import RateLimiter, is_rate_limited, rate_limit_resource
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import MockSession
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code=200, **headers):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers.update({k.replace('_', '-'): str(v) for k, v in headers.items()})
+    return resp
+
+
+def get_test_requester(clock, responses, **limiter_kwargs):
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep, **limiter_kwargs)
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession, rate_limiter=limiter)
+    queue = list(responses)
+    requester.session.inject_request(lambda verb, url, **kwargs: queue.pop(0))
+    return requester
+
+
+def test_budget_tracked_from_headers():
+    clock = FakeClock()
+    requester = get_test_requester(clock, [
+        make_response(X_RateLimit_Limit=5000, X_RateLimit_Remaining=4999,
+                      X_RateLimit_Reset=int(clock.now) + 3600, X_RateLimit_Resource='core'),
+    ])
+    assert requester.rate_limit.remaining is None
+
+    requester.request(RequestVerb.GET, '/user')
+
+    budget = requester.rate_limit
+    assert (5000, 4999, 'core') == (budget.limit, budget.remaining, budget.resource)
+    assert budget.reset_at == clock.now + 3600
+    assert [] == clock.sleeps
+
+
+def test_exhausted_budget_waits_for_reset():
+    clock = FakeClock()
+    reset = int(clock.now) + 30
+    requester = get_test_requester(clock, [
+        make_response(X_RateLimit_Limit=60, X_RateLimit_Remaining=0, X_RateLimit_Reset=reset),
+        make_response(X_RateLimit_Limit=60, X_RateLimit_Remaining=59, X_RateLimit_Reset=reset + 3600),
+    ])
+
+    requester.request(RequestVerb.GET, '/user')
+    requester.request(RequestVerb.GET, '/user')
+
+    assert [30] == clock.sleeps
+
+
+def test_secondary_rate_limit_requeued():
+    clock = FakeClock()
+    limited = make_response(403, Retry_After=5)
+    requester = get_test_requester(clock, [limited, make_response(200)])
+
+    assert is_rate_limited(limited)
+    response = requester.request(RequestVerb.GET, '/user')
+
+    assert 200 == response.status_code
+    assert [5] == clock.sleeps
+    assert 2 == len(requester.session.logs)
+
+
+def test_requeue_gives_up_beyond_max_wait():
+    clock = FakeClock()
+    requester = get_test_requester(clock, [make_response(429, Retry_After=600)], max_wait=60)
+
+    response = requester.request(RequestVerb.GET, '/user')
+
+    assert 429 == response.status_code
+    assert [] == clock.sleeps
+    assert 1 == len(requester.session.logs)
+
+
+def test_pacing_below_threshold():
+    clock = FakeClock()
+    reset = int(clock.now) + 100
+    requester = get_test_requester(clock, [
+        make_response(X_RateLimit_Limit=100, X_RateLimit_Remaining=10, X_RateLimit_Reset=reset)
+        for _ in range(3)
+    ], pace_threshold=0.5)
+
+    for _ in range(3):
+        requester.request(RequestVerb.GET, '/user')
+
+    # first request learns the budget, following ones are spread over the window.
+    assert 1 == len(clock.sleeps)
+    assert abs(clock.sleeps[0] - 100 / 9) < 1e-6
+
+
+def test_rate_limit_resource():
+    assert 'graphql' == rate_limit_resource('/graphql')
+    assert 'search' == rate_limit_resource('/search/repositories?q=polytope')
+    assert 'core' == rate_limit_resource('/repos/owner/repo')
+    assert 'core' == rate_limit_resource('/user')
+
+
+def test_budgets_are_kept_per_resource():
+    clock = FakeClock()
+    requester = get_test_requester(clock, [
+        make_response(X_RateLimit_Limit=5000, X_RateLimit_Remaining=0,
+                      X_RateLimit_Reset=int(clock.now) + 30, X_RateLimit_Resource='graphql'),
+        make_response(X_RateLimit_Limit=5000, X_RateLimit_Remaining=4999,
+                      X_RateLimit_Reset=int(clock.now) + 3600, X_RateLimit_Resource='core'),
+    ])
+
+    requester.request(RequestVerb.POST, '/graphql', data='{}')
+    # exhausted GraphQL budget never holds REST requests.
+    requester.request(RequestVerb.GET, '/repos/a/b')
+
+    assert [] == clock.sleeps
+    assert 0 == requester.resource_rate_limit('graphql').remaining
+    assert 4999 == requester.rate_limit.remaining
+    assert 'core' == requester.resource_rate_limit('core').resource
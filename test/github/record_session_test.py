@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.RecordSession import RecordingSession, ReplaySession, load_recording
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import MockSession
+
+
+def record_traffic(path):
+    recording = RecordingSession(MockSession)
+    counter = {'n': 0}
+
+    def mock_request(verb, url, **kwargs):
+        counter['n'] += 1
+        time.sleep(0.01)
+        resp = requests.Response()
+        resp.status_code = 201 if verb == RequestVerb.POST else 200
+        resp.headers['X-RateLimit-Remaining'] = str(5000 - counter['n'])
+        resp._content = json.dumps({'call': counter['n']}).encode()
+        return resp
+
+    recording._session.inject_request(mock_request)
+    requester = Requester(Token('token'), 'https://api.github.com', session=recording)
+    requester.request(RequestVerb.GET, '/repos/owner/repo')
+    requester.request(RequestVerb.POST, '/user/repos', data=json.dumps({'name': 'a'}))
+    requester.request(RequestVerb.POST, '/user/repos', data=json.dumps({'name': 'b'}))
+    requester.request(RequestVerb.GET, '/repos/owner/repo')
+    recording.save(str(path))
+    return recording
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    recording = record_traffic(path)
+
+    exchanges = load_recording(str(path))
+    assert 4 == len(exchanges) == len(recording.exchanges)
+    assert all(exchange.latency >= 0.01 for exchange in exchanges)
+
+    replay = ReplaySession.load(str(path))
+    requester = Requester(Token('token'), 'https://api.github.com', session=replay)
+
+    # identical requests are answered in recorded order, bodies are matched.
+    assert {'call': 1} == requester.request(RequestVerb.GET, '/repos/owner/repo').json()
+    assert {'call': 3} == requester.request(RequestVerb.POST, '/user/repos', data=json.dumps({'name': 'b'})).json()
+    second = requester.request(RequestVerb.GET, '/repos/owner/repo')
+    assert {'call': 4} == second.json()
+    assert '4996' == second.headers['x-ratelimit-remaining']
+    assert 1 == replay.remaining
+
+    with pytest.raises(LookupError):
+        requester.request(RequestVerb.GET, '/repos/owner/repo')
+
+
+def test_replay_speed(tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    record_traffic(path)
+
+    replay = ReplaySession.load(str(path), speed=1.0)
+    started = time.monotonic()
+    replay.request(RequestVerb.GET, 'https://api.github.com/repos/owner/repo')
+    assert 0.01 <= time.monotonic() - started
+
+
+def test_load_invalid_file(tmp_path):
+    import gzip
+    path = tmp_path / 'other.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('{"format": "other"}\n')
+
+    with pytest.raises(ValueError):
+        load_recording(str(path))
+
+
+def test_replay_think_time():
+    from polytope.github.RecordSession import RecordedExchange
+
+    def exchange(path, offset):
+        return RecordedExchange(verb=str(RequestVerb.GET), url=f'https://api.github.com{path}', params=None,
+                                body_digest=None, status_code=200, headers={}, content=b'{}',
+                                latency=0.1, offset=offset)
+
+    now = [100.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(round(seconds, 6))
+        now[0] += seconds
+
+    replay = ReplaySession([exchange('/a', 5.0), exchange('/b', 7.0), exchange('/c', 7.5)],
+                           speed=2.0, clock=lambda: now[0], sleep=sleep)
+    replay.request(RequestVerb.GET, 'https://api.github.com/a')
+    replay.request(RequestVerb.GET, 'https://api.github.com/b')
+    # the client is busy past the recorded offset of /c, no think time is added.
+    now[0] += 5.0
+    replay.request(RequestVerb.GET, 'https://api.github.com/c')
+
+    # /a at 0, /b at (7 - 5) / 2 = 1 after /a took 0.05, then latencies / 2.
+    assert [0.05, 0.95 + 0.05, 0.05] == slept
@@ -0,0 +1,110 @@
+import json
+
+import requests
+
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Session import MockSession
+from polytope.github.Token import Token
+
+from polytope.github.repository.BatchRead import (
+    build_repository_status_query,
+    fetch_repository_statuses,
+)
+from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+from polytope.github.repository.Repository import create_github_requester
+from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
+
+
+def repository_node(name, has_config_file):
+    return {
+        "name": name,
+        "description": f"problem {name}",
+        "homepageUrl": None,
+        "isPrivate": True,
+        "hasWikiEnabled": False,
+        "squashMergeCommitTitle": "COMMIT_OR_PR_TITLE",
+        "polytopeConfigFile": {"__typename": "Blob"} if has_config_file else None,
+    }
+
+
+def graphql_server(verb: RV, url: str, **kwargs) -> requests.Response:
+    assert (RV.POST, "https://api.github.com/graphql") == (verb, url)
+    variables = json.loads(kwargs["data"])["variables"]
+
+    data, errors = {}, []
+    for key, name in variables.items():
+        if not key.startswith("name"):
+            continue
+        alias = "r" + key[len("name"):]
+        if name.startswith("missing"):
+            data[alias] = None
+            errors.append({"type": "NOT_FOUND", "path": [alias], "message": f"Could not resolve {name}"})
+        else:
+            data[alias] = repository_node(name, has_config_file=not name.startswith("plain"))
+
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"data": data, "errors": errors}).encode()
+    return resp
+
+
+def get_test_requester(mock_request=graphql_server):
+    requester = create_github_requester(Token("test_token"), MockSession)
+    requester.session.inject_request(mock_request)
+    return requester
+
+
+def test_query_uses_variables_and_aliases():
+    body = build_repository_status_query([("owner-a", "repo_a"), ("owner-b", "repo_b")])
+
+    assert {"owner0": "owner-a", "name0": "repo_a", "owner1": "owner-b", "name1": "repo_b"} == body["variables"]
+    assert "r1: repository(owner: $owner1, name: $name1)" in body["query"]
+    assert 'object(expression: "HEAD:polytope.yaml")' in body["query"]
+    assert "repo_a" not in body["query"]
+
+
+def test_fetch_statuses_in_batches():
+    requester = get_test_requester()
+    cache = PolytopeConfigFileCache()
+    targets = [("test-owner", f"repo{i}") for i in range(5)] + [
+        ("test-owner", "missing_repo"),
+        ("test-owner", "plain_repo"),
+    ]
+
+    statuses = fetch_repository_statuses(requester, targets, batch_size=3, config_file_cache=cache)
+
+    assert 3 == len(requester.session.logs)
+    assert [name for _, name in targets] == [status.name for status in statuses]
+
+    found = statuses[0]
+    assert GHIC.Success == found.response.internal_code
+    assert found.has_polytope_config_file is True
+    assert "problem repo0" == found.config.description
+    assert "" == found.config.homepage
+    assert found.config.has_wiki is False
+    assert "COMMIT_OR_PR_TITLE" == found.config.squash_merge_commit_title
+
+    missing = statuses[5]
+    assert GHIC.FailedToRead == missing.response.internal_code
+    assert "Could not resolve missing_repo" in missing.response.error_msg
+    assert missing.config is None
+
+    assert statuses[6].has_polytope_config_file is False
+    assert cache.get("test-owner", "repo3").has_polytope_config_file
+    assert not cache.get("test-owner", "plain_repo").has_polytope_config_file
+    assert cache.get("test-owner", "missing_repo") is None
+
+
+def test_failed_batch_reported_per_item():
+    def unauthorized(verb, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 401
+        resp._content = b'{"message": "Bad credentials", "errors": []}'
+        return resp
+
+    statuses = fetch_repository_statuses(
+        get_test_requester(unauthorized), [("test-owner", "repo0"), ("test-owner", "repo1")]
+    )
+
+    assert [401, 401] == [status.response.status_code for status in statuses]
+    assert all(status.response.internal_code == GHIC.FailedToRead for status in statuses)
@@ -0,0 +1,187 @@
+import json
+
+import requests
+
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Session import MockSession
+from polytope.github.Token import Token
+
+from polytope.github.repository.Bulk import GithubRepositoryBulk
+from polytope.github.repository.Repository import create_github_requester
+from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
+from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
+from polytope.models import Contest, ContestProblem, Problem, ProblemChecker, ProblemValidator
+
+
+def get_test_bulk(mock_request, max_workers=4):
+    requester = create_github_requester(Token("test_token"), MockSession)
+    requester.session.inject_request(mock_request)
+    return GithubRepositoryBulk(requester, max_workers=max_workers), requester.session
+
+
+def full_response(verb: RV, url: str, **kwargs) -> requests.Response:
+    resp = requests.Response()
+    if verb == RV.POST:
+        resp.status_code = 201
+    elif verb == RV.GET and url.endswith("/contents"):
+        resp.status_code = 200
+        resp._content = json.dumps([{"type": "file", "name": "polytope.yaml"}])
+    elif verb in (RV.GET, RV.PATCH):
+        resp.status_code = 200
+    else:
+        resp.status_code = 404
+    return resp
+
+
+def make_problem(_id):
+    return Problem(
+        _id=_id,
+        name=f"problem {_id}",
+        note="",
+        time_limit_in_ms=1000,
+        memory_limit_in_mib=256,
+        tags=[],
+        owners=["test-owner"],
+        checker=ProblemChecker(),
+        validator=ProblemValidator(),
+    )
+
+
+def test_provision_success():
+    bulk, session = get_test_bulk(full_response)
+    targets = [("test-owner", f"repo{i}") for i in range(10)]
+
+    responses = bulk.provision(targets, config=GithubRepositoryConfig("ignored", has_wiki=False))
+
+    assert 10 == len(responses)
+    assert all(resp.internal_code == GHIC.Success for resp in responses)
+    patches = [log for log in session.logs if log.verb == RV.PATCH]
+    assert 10 == len(patches)
+    for log in patches:
+        data = json.loads(log.kwargs["data"])
+        assert log.url.endswith("/" + data["name"])
+        assert data["has_wiki"] is False
+
+
+def test_provision_partial_failure():
+    def mock_request(verb: RV, url: str, **kwargs) -> requests.Response:
+        if "repo3" in kwargs.get("data", ""):
+            raise requests.ConnectionError("connection reset")
+        if "repo5" in kwargs.get("data", ""):
+            resp = requests.Response()
+            resp.status_code = 422
+            resp._content = b'{"message": "exists", "errors": []}'
+            return resp
+        return full_response(verb, url, **kwargs)
+
+    bulk, _ = get_test_bulk(mock_request)
+    targets = [("test-owner", f"repo{i}") for i in range(8)] + [("test-owner", "Invalid/Name")]
+
+    responses = bulk.provision(targets)
+
+    assert 9 == len(responses)
+    assert responses[3].internal_code == GHIC.RequestFailed
+    assert responses[5].internal_code == GHIC.FailedToCreate
+    assert responses[5].status_code == 422
+    assert responses[8].internal_code == GHIC.InvalidName
+    for i in (0, 1, 2, 4, 6, 7):
+        assert responses[i].internal_code == GHIC.Success
+
+
+def test_provision_contest():
+    bulk, session = get_test_bulk(full_response, max_workers=2)
+    contest = Contest(
+        name="test contest",
+        problems=[
+            ContestProblem(index=index, problem=make_problem(_id))
+            for index, _id in (("A", "abcd2345"), ("B", "efgh6789"))
+        ],
+    )
+
+    responses = bulk.provision_contest("test-owner", contest)
+
+    assert [GHIC.Success, GHIC.Success] == [resp.internal_code for resp in responses]
+    names = {json.loads(log.kwargs["data"])["name"] for log in session.logs if log.verb == RV.POST}
+    assert {"abcd2345", "efgh6789"} == names
+
+
+def graphql_response(has_file):
+    """Mock answering repository status queries; has_file maps name to config file presence."""
+    def mock_request(verb: RV, url: str, **kwargs) -> requests.Response:
+        resp = requests.Response()
+        if url.endswith("/graphql"):
+            variables = json.loads(kwargs["data"])["variables"]
+            data = {}
+            errors = []
+            for key, name in variables.items():
+                if not key.startswith("name"):
+                    continue
+                alias = "r" + key[len("name"):]
+                if name in has_file:
+                    config_file = {"__typename": "Blob"} if has_file[name] else None
+                    data[alias] = {"name": name, "polytopeConfigFile": config_file}
+                else:
+                    data[alias] = None
+                    errors.append({"path": [alias], "message": "Could not resolve to a Repository"})
+            resp.status_code = 200
+            resp._content = json.dumps({"data": data, "errors": errors}).encode()
+        elif verb == RV.PATCH:
+            resp.status_code = 200
+        elif verb == RV.DELETE:
+            resp.status_code = 204
+        else:
+            resp.status_code = 404
+        return resp
+    return mock_request
+
+
+def test_pipelined_update():
+    bulk, session = get_test_bulk(graphql_response({"repo0": True, "repo1": False, "repo3": True}))
+    targets = [("test-owner", "repo0"), ("test-owner", "repo1"), ("test-owner", "repo2"), ("-bad", "repo"), ("test-owner", "repo3")]
+
+    responses = bulk.update(targets, GithubRepositoryConfig("ignored", has_wiki=False), batch_size=2)
+
+    assert [GHIC.Success, GHIC.UpdateWithoutPolytopeFile, GHIC.FailedToRead, GHIC.InvalidName, GHIC.Success] == [
+        resp.internal_code for resp in responses
+    ]
+    # two detection batches, then one request per updated repository.
+    assert 2 == len([log for log in session.logs if log.url.endswith("/graphql")])
+    patches = [log for log in session.logs if log.verb == RV.PATCH]
+    assert ["repo0", "repo3"] == sorted(json.loads(log.kwargs["data"])["name"] for log in patches)
+    assert all(not json.loads(log.kwargs["data"])["has_wiki"] for log in patches)
+    assert 4 == len(session.logs)
+
+
+def test_pipelined_delete():
+    bulk, session = get_test_bulk(graphql_response({"repo0": True, "repo1": False}))
+
+    responses = bulk.delete([("test-owner", "repo0"), ("test-owner", "repo1")])
+
+    assert [GHIC.Success, GHIC.DeleteWithoutPolytopeFile] == [resp.internal_code for resp in responses]
+    assert [RV.POST, RV.DELETE] == [log.verb for log in session.logs]
+
+
+def test_pipelined_update_detection_failure():
+    def failing(verb: RV, url: str, **kwargs) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = 502
+        return resp
+
+    bulk, session = get_test_bulk(failing)
+
+    responses = bulk.update([("test-owner", "repo0")], GithubRepositoryConfig("ignored"))
+
+    assert [GHIC.FailedToRead] == [resp.internal_code for resp in responses]
+    assert all(log.verb == RV.POST for log in session.logs)
+
+
+def test_pipelined_update_detection_request_exception():
+    def failing(verb: RV, url: str, **kwargs) -> requests.Response:
+        raise requests.ConnectionError("connection reset")
+
+    bulk, session = get_test_bulk(failing)
+
+    responses = bulk.update([("test-owner", "repo0"), ("test-owner", "repo1")], GithubRepositoryConfig("ignored"))
+
+    assert [GHIC.RequestFailed, GHIC.RequestFailed] == [resp.internal_code for resp in responses]
+    assert all(log.verb == RV.POST for log in session.logs)
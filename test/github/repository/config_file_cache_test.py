@@ -0,0 +1,146 @@
+import json
+
+import requests
+
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Session import MockSession
+from polytope.github.Token import Token
+
+from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+from polytope.github.repository.Repository import GithubRepository, create_github_requester
+from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
+from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def contents_server(verb: RV, url: str, **kwargs) -> requests.Response:
+    resp = requests.Response()
+    if verb == RV.GET and url.endswith("/contents"):
+        if (kwargs.get("headers") or {}).get("If-None-Match") == '"listing"':
+            resp.status_code = 304
+        else:
+            resp.status_code = 200
+            resp._content = json.dumps([{"type": "file", "name": "polytope.yaml"}])
+        resp.headers["ETag"] = '"listing"'
+    elif verb == RV.PATCH:
+        resp.status_code = 200
+    elif verb == RV.DELETE:
+        resp.status_code = 204
+    return resp
+
+
+def get_test_repositories(count, cache):
+    requester = create_github_requester(Token("test_token"), MockSession)
+    requester.session.inject_request(contents_server)
+    repos = [
+        GithubRepository("test-owner", "test_repo_name", Token("test_token"),
+                         requester=requester, config_file_cache=cache)
+        for _ in range(count)
+    ]
+    return repos, requester.session
+
+
+def contents_logs(session):
+    return [log for log in session.logs if log.url.endswith("/contents")]
+
+
+def test_cache_shared_across_instances():
+    cache = PolytopeConfigFileCache(ttl=60)
+    (first, second), session = get_test_repositories(2, cache)
+
+    assert (True, "detected polytope.yaml file") == first.fetch_polytope_config_file()
+    assert (True, "cached response") == second.fetch_polytope_config_file()
+    assert 1 == len(contents_logs(session))
+
+
+def test_expired_entry_revalidated_with_etag():
+    clock = FakeClock()
+    cache = PolytopeConfigFileCache(ttl=60, clock=clock)
+    (repo,), session = get_test_repositories(1, cache)
+
+    repo.fetch_polytope_config_file()
+    clock.now = 61
+    assert repo._has_polytope_config_file is None
+
+    has_file, reason = repo.fetch_polytope_config_file()
+
+    assert (True, "detected polytope.yaml file") == (has_file, reason)
+    logs = contents_logs(session)
+    assert 2 == len(logs)
+    assert '"listing"' == logs[1].kwargs["headers"]["If-None-Match"]
+    assert repo._has_polytope_config_file is True
+
+
+def test_ignore_cache_sends_unconditional_request():
+    cache = PolytopeConfigFileCache(ttl=60)
+    (repo,), session = get_test_repositories(1, cache)
+
+    repo.fetch_polytope_config_file()
+    repo.fetch_polytope_config_file(ignore_cache=True)
+
+    logs = contents_logs(session)
+    assert 2 == len(logs)
+    assert "headers" not in logs[1].kwargs
+
+
+def test_mutations_invalidate_cache():
+    cache = PolytopeConfigFileCache(ttl=60)
+    (repo,), session = get_test_repositories(1, cache)
+
+    assert GHIC.Success == repo.update().internal_code
+    assert 0 == len(cache)
+
+    cache.set("test-owner", "renamed_repo", False, "stale")
+    assert GHIC.Success == repo.update(GithubRepositoryConfig("renamed_repo")).internal_code
+    assert cache.get("test-owner", "renamed_repo") is None
+    assert cache.get("test-owner", "test_repo_name") is None
+
+    assert GHIC.Success == repo.delete().internal_code
+    assert 0 == len(cache)
+
+
+def test_keys_are_case_insensitive():
+    cache = PolytopeConfigFileCache()
+    cache.set("Test-Owner", "repo", True, "detected")
+    assert cache.get("test-owner", "REPO").has_polytope_config_file
+
+def test_default_cache_is_shared_per_token():
+    def make_repo(token):
+        requester = create_github_requester(Token(token), MockSession)
+        requester.session.inject_request(contents_server)
+        return GithubRepository("test-owner", "test_repo_name", Token(token), requester=requester)
+
+    first, second = make_repo("test_token"), make_repo("test_token")
+    assert (True, "detected polytope.yaml file") == first.fetch_polytope_config_file()
+    # another requester with the same token shares the result.
+    assert (True, "cached response") == second.fetch_polytope_config_file()
+    assert [] == second._requester.session.logs
+
+    # a requester with another token does not see it.
+    other = make_repo("other_token")
+    assert (True, "detected polytope.yaml file") == other.fetch_polytope_config_file()
+
+
+def test_unsuccessful_response_not_cached():
+    cache = PolytopeConfigFileCache(ttl=60)
+    (repo,), session = get_test_repositories(1, cache)
+    down = [True]
+
+    def flaky_server(verb, url, **kwargs):
+        resp = contents_server(verb, url, **kwargs)
+        if down[0] and url.endswith("/contents"):
+            resp.status_code = 503
+        return resp
+
+    session.inject_request(flaky_server)
+    assert (False, "unsuccessful response") == repo.fetch_polytope_config_file()
+    assert cache.get("test-owner", "test_repo_name") is None
+    down[0] = False
+    assert (True, "detected polytope.yaml file") == repo.fetch_polytope_config_file()
@@ -0,0 +1,158 @@
+import base64
+import json
+
+import pytest
+import requests
+
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Session import MockSession
+from polytope.github.Token import Token
+
+from polytope.github.repository.Repository import (
+    GithubRepository,
+    PolytopeConfigLookup,
+    decode_polytope_config_file_entry,
+    parse_polytope_config_file_entry,
+)
+
+CONFIG_TEXT = "name: test problem\ntime_limit_in_ms: 1000\n"
+
+
+def config_file_server(exists):
+    def mock_request(verb: RV, url: str, **kwargs) -> requests.Response:
+        resp = requests.Response()
+        if not url.endswith("/contents/polytope.yaml") or not exists:
+            resp.status_code = 404
+            return resp
+        resp.status_code = 200
+        if verb == RV.GET:
+            resp._content = json.dumps({
+                "type": "file",
+                "name": "polytope.yaml",
+                "encoding": "base64",
+                "content": base64.b64encode(CONFIG_TEXT.encode()).decode(),
+            }).encode()
+        return resp
+    return mock_request
+
+
+def get_test_repository(lookup, exists=True):
+    repo = GithubRepository("test-owner", "test_repo_name", Token("test_token"),
+                            MockSession, config_lookup=lookup)
+    repo._requester.session.inject_request(config_file_server(exists))
+    return repo
+
+
+@pytest.mark.parametrize("lookup, verb", [
+    (PolytopeConfigLookup.Contents, RV.GET),
+    (PolytopeConfigLookup.Head, RV.HEAD),
+])
+def test_targeted_lookup(lookup, verb):
+    repo = get_test_repository(lookup)
+    assert repo.fetch_config_file_url == "/repos/test-owner/test_repo_name/contents/polytope.yaml"
+
+    assert (True, "detected polytope.yaml file") == repo.fetch_polytope_config_file()
+
+    log, = repo._requester.session.logs
+    assert verb == log.verb
+    assert log.url.endswith("/contents/polytope.yaml")
+
+
+@pytest.mark.parametrize("lookup", [PolytopeConfigLookup.Contents, PolytopeConfigLookup.Head])
+def test_targeted_lookup_missing_file(lookup):
+    repo = get_test_repository(lookup, exists=False)
+    assert (False, "could not detect polytope.yaml file") == repo.fetch_polytope_config_file()
+
+
+def test_read_config_file_fills_detection_cache():
+    repo = get_test_repository(PolytopeConfigLookup.Contents)
+
+    text, reason = repo.read_polytope_config_file()
+    assert CONFIG_TEXT == text
+    assert "read polytope.yaml file" == reason
+
+    # existence check is answered by the read above.
+    assert (True, "cached response") == repo.fetch_polytope_config_file()
+    assert 1 == len(repo._requester.session.logs)
+
+
+def test_read_missing_config_file():
+    repo = get_test_repository(PolytopeConfigLookup.Contents, exists=False)
+    assert (None, "could not detect polytope.yaml file") == repo.read_polytope_config_file()
+    assert repo._has_polytope_config_file is False
+
+
+def test_parse_config_file_entry():
+    assert (False, "empty response content") == parse_polytope_config_file_entry(b"")
+    assert (False, "malformed response content") == parse_polytope_config_file_entry(b"{")
+    # a directory named polytope.yaml is listed, not a file.
+    assert not parse_polytope_config_file_entry(json.dumps([{"name": "polytope.yaml"}]))[0]
+    assert (None, "unsupported encoding of polytope.yaml file") == decode_polytope_config_file_entry(
+        json.dumps({"type": "file", "name": "polytope.yaml", "encoding": "none"})
+    )
+
+
+def test_head_lookup_rejects_directory():
+    repo = get_test_repository(PolytopeConfigLookup.Head)
+
+    def directory_server(verb, url, **kwargs):
+        assert "raw" in kwargs["headers"]["Accept"]
+        resp = requests.Response()
+        # the raw media type is ignored for directories.
+        resp.status_code = 200
+        resp.headers["Content-Type"] = "application/json; charset=utf-8"
+        return resp
+
+    repo._requester.session.inject_request(directory_server)
+    assert (False, "could not detect polytope.yaml file") == repo.fetch_polytope_config_file()
+
+
+def test_etag_not_sent_to_another_lookup():
+    from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+
+    cache = PolytopeConfigFileCache(ttl=0)
+    cache.set("test-owner", "test_repo_name", True, "listed", etag='"listing"', etag_lookup="Listing")
+    repo = GithubRepository("test-owner", "test_repo_name", Token("test_token"),
+                            MockSession, config_lookup=PolytopeConfigLookup.Contents,
+                            config_file_cache=cache)
+    serve = config_file_server(True)
+
+    def etag_server(verb, url, **kwargs):
+        resp = serve(verb, url, **kwargs)
+        resp.headers["ETag"] = '"file"'
+        return resp
+
+    repo._requester.session.inject_request(etag_server)
+
+    assert (True, "detected polytope.yaml file") == repo.fetch_polytope_config_file()
+    log, = repo._requester.session.logs
+    assert "If-None-Match" not in (log.kwargs.get("headers") or {})
+    entry = cache.get("test-owner", "test_repo_name")
+    assert ('"file"', "Contents") == (entry.etag, entry.etag_lookup)
+
+
+@pytest.mark.parametrize("status", [304, 404, 422, 500, 200])
+def test_listing_lookup_closes_streamed_responses(status):
+    import io
+    from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+
+    cache = PolytopeConfigFileCache(ttl=0)
+    cache.set("test-owner", "test_repo_name", True, "listed", etag='"listing"', etag_lookup="Listing")
+    repo = GithubRepository("test-owner", "test_repo_name", Token("test_token"),
+                            MockSession, config_file_cache=cache)
+    opened = []
+
+    def streamed_server(verb, url, **kwargs):
+        assert kwargs["stream"]
+        resp = requests.Response()
+        resp.status_code = status
+        body = b'[{"type": "file", "name": "polytope.yaml"}, {"type": "dir", "name": "x"}]'
+        resp.raw = io.BytesIO(body if status == 200 else b'{"message": "error"}')
+        opened.append(resp.raw)
+        return resp
+
+    repo._requester.session.inject_request(streamed_server)
+    repo.fetch_polytope_config_file()
+
+    assert opened
+    assert [] == [raw for raw in opened if not raw.closed]
@@ -0,0 +1,11 @@
+import pytest
+
+from polytope.github.repository.ConfigFileCache import clear_default_config_file_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_config_file_caches():
+    """Keep the default detection caches, shared per token, from leaking between tests."""
+    clear_default_config_file_caches()
+    yield
+    clear_default_config_file_caches()
@@ -0,0 +1,82 @@
+from polytope.github.repository.NameValidation import (
+    GithubNameError,
+    NameValidationFailure as NVF,
+    _github_repository_name_failure,
+    github_repository_name_failure,
+    github_user_name_failure,
+    is_valid_github_repository_name,
+    is_valid_github_user_name,
+    validate_github_repository_names,
+    validate_github_repository_targets,
+    validate_github_user_names,
+)
+
+
+def test_user_name_failures():
+    assert github_user_name_failure('studio-polytope') is None
+    assert NVF.Empty == github_user_name_failure('')
+    assert NVF.TooShort == github_user_name_failure('a')
+    assert NVF.TooLong == github_user_name_failure('a' * 40)
+    assert github_user_name_failure('a' * 39) is None
+    assert NVF.InvalidCharacter == github_user_name_failure('user_name')
+    assert NVF.InvalidBoundary == github_user_name_failure('-user')
+    assert NVF.InvalidBoundary == github_user_name_failure('user-')
+    assert NVF.InvalidSeparator == github_user_name_failure('us--er')
+
+
+def test_repository_name_failures():
+    assert github_repository_name_failure('test_repo-name.v2') is None
+    assert NVF.Empty == github_repository_name_failure('')
+    assert NVF.InvalidCharacter == github_repository_name_failure('Repo')
+    assert NVF.InvalidCharacter == github_repository_name_failure('re po')
+    assert NVF.InvalidBoundary == github_repository_name_failure('_repo')
+    assert NVF.InvalidBoundary == github_repository_name_failure('repo.')
+    assert NVF.InvalidSeparator == github_repository_name_failure('re._po')
+    assert NVF.InvalidSeparator == github_repository_name_failure('re___po')
+
+
+def test_is_valid_agrees_with_failures():
+    for name in ['a', 'ab', 'a-b', 'a--b', '-ab', 'a_b', 'Ab', 'a' * 39, 'a' * 40]:
+        assert is_valid_github_user_name(name) == (github_user_name_failure(name) is None)
+        assert is_valid_github_repository_name(name) == (github_repository_name_failure(name) is None)
+
+
+def test_validate_names_in_bulk():
+    assert {} == validate_github_user_names(['owner', 'owner', 'other'])
+    assert {'-bad': NVF.InvalidBoundary} == validate_github_user_names(['owner', '-bad', '-bad'])
+    assert {'Bad': NVF.InvalidCharacter, '': NVF.Empty} == validate_github_repository_names(['ok', 'Bad', ''])
+
+
+def test_non_string_names():
+    for name in [None, 1, ['owner']]:
+        assert NVF.InvalidType == github_user_name_failure(name)
+        assert NVF.InvalidType == github_repository_name_failure(name)
+        assert not is_valid_github_user_name(name)
+        assert not is_valid_github_repository_name(name)
+
+    assert {'None': NVF.InvalidType, "['a']": NVF.InvalidType} == validate_github_user_names(['owner', None, ['a']])
+    assert {'1': NVF.InvalidType} == validate_github_repository_names([1, 'repo'])
+    assert [
+        GithubNameError(0, 'owner', None, NVF.InvalidType),
+        GithubNameError(1, 'name', ['repo'], NVF.InvalidType),
+    ] == validate_github_repository_targets([(None, 'repo'), ('owner', ['repo'])])
+
+
+def test_validate_targets_never_raises():
+    targets = [('owner', 'repo'), ('-owner', 'Repo'), ('owner', 'repo.')]
+
+    assert [
+        GithubNameError(1, 'owner', '-owner', NVF.InvalidBoundary),
+        GithubNameError(1, 'name', 'Repo', NVF.InvalidCharacter),
+        GithubNameError(2, 'name', 'repo.', NVF.InvalidBoundary),
+    ] == validate_github_repository_targets(targets)
+
+
+def test_repeated_names_hit_cache():
+    _github_repository_name_failure.cache_clear()
+    targets = [('owner', f'problem-{i % 100}') for i in range(10000)]
+
+    assert [] == validate_github_repository_targets(targets)
+    info = _github_repository_name_failure.cache_info()
+    assert 100 == info.misses
+    assert 9900 == info.hits
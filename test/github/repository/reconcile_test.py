@@ -0,0 +1,142 @@
+import json
+
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from fake_github_server import FakeGithubServer
+from polytope.github.RequestVerb import RequestVerb as RV
+from polytope.github.Session import MockSession
+
+from polytope.github.repository.ConfigFileCache import PolytopeConfigFileCache
+from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
+from polytope.github.repository.Reconcile import (
+    GithubRepositoryReconciler,
+    ReconcileAction,
+    diff_config,
+)
+from polytope.github.repository.Repository import GITHUB_API_HEADERS
+from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
+
+POLYTOPE_FILES = {'polytope.yaml': b'name: x\n'}
+
+
+@pytest.fixture
+def server():
+    with FakeGithubServer() as server:
+        yield server
+
+
+def get_reconciler(server):
+    requester = Requester(Token('token'), server.base_url, headers=GITHUB_API_HEADERS)
+    return GithubRepositoryReconciler(requester, config_file_cache=PolytopeConfigFileCache())
+
+
+def test_diff_config():
+    repository = {'description': None, 'homepage': None, 'has_wiki': True}
+    changes = diff_config(repository, GithubRepositoryConfig('repo', has_wiki=False))
+
+    assert (True, False) == changes['has_wiki']
+    assert 'description' not in changes
+    # settings not reported are unknown, so they are sent.
+    assert 'has_issues' in changes
+    assert 'name' not in changes and 'auto_init' not in changes
+
+
+def test_plan_and_apply(server):
+    server.add_repository('owner', 'synced', files=POLYTOPE_FILES)
+    server.add_repository('owner', 'drifted', files=POLYTOPE_FILES, has_wiki=False, description='old')
+    server.add_repository('owner', 'foreign', has_wiki=False)
+    reconciler = get_reconciler(server)
+    desired = GithubRepositoryConfig('ignored')
+    targets = [('owner', 'synced'), ('owner', 'drifted'), ('owner', 'missing'), ('owner', 'foreign')]
+
+    plan, responses = reconciler.reconcile(targets, desired, dry_run=True)
+    assert [] == responses
+    assert [ReconcileAction.Skip, ReconcileAction.Update, ReconcileAction.Failed, ReconcileAction.Update] == [
+        entry.action for entry in plan
+    ]
+    assert {'has_wiki': (False, True), 'description': ('old', '')} == plan[1].changes
+    assert 'owner/drifted: update\n  description: "old" -> ""\n  has_wiki: false -> true' == plan[1].describe()
+    assert 'owner/synced: in sync' == plan[0].describe()
+    assert not server.repository('owner', 'drifted')['has_wiki']
+
+    served = server.requests_served
+    responses = reconciler.apply(plan)
+
+    assert [GHIC.Success, GHIC.Success, GHIC.FailedToRead, GHIC.UpdateWithoutPolytopeFile] == [
+        resp.internal_code for resp in responses
+    ]
+    assert server.repository('owner', 'drifted')['has_wiki']
+    assert '' == server.repository('owner', 'drifted')['description']
+    # config file checks of drifted and foreign, and one update.
+    assert 3 == server.requests_served - served
+
+    plan = reconciler.plan(targets[:2], desired)
+    assert all(entry.action == ReconcileAction.Skip for entry in plan)
+
+
+def test_update_only_fields(server):
+    server.add_repository('owner', 'repo', files=POLYTOPE_FILES, description='keep')
+    reconciler = get_reconciler(server)
+    repo = reconciler._bulk.open('owner', 'repo')
+
+    response = repo.update(GithubRepositoryConfig('repo', has_wiki=False), only_fields=['has_wiki'])
+
+    assert GHIC.Success == response.internal_code
+    assert 'keep' == server.repository('owner', 'repo')['description']
+    assert not server.repository('owner', 'repo')['has_wiki']
+
+    served = server.requests_served
+    with pytest.raises(ValueError):
+        repo.update(only_fields=['no_such_field'])
+    assert served == server.requests_served
+
+
+def test_apply_duplicate_targets(server):
+    server.add_repository('owner', 'drifted', files=POLYTOPE_FILES, has_wiki=False)
+    server.add_repository('owner', 'synced', files=POLYTOPE_FILES)
+    reconciler = get_reconciler(server)
+    targets = [('owner', 'drifted'), ('owner', 'synced'), ('owner', 'drifted')]
+
+    plan = reconciler.plan(targets, GithubRepositoryConfig('ignored'))
+    responses = reconciler.apply(plan)
+
+    assert [GHIC.Success, GHIC.Success, GHIC.Success] == [resp.internal_code for resp in responses]
+    assert server.repository('owner', 'drifted')['has_wiki']
+
+
+def test_plan_organization_reads_only_incomplete_listings():
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession)
+    full = {**{f: False for f in ('private', 'has_issues', 'has_projects', 'has_wiki', 'has_discussions',
+                                  'allow_squash_merge', 'allow_merge_commit', 'allow_rebase_merge',
+                                  'allow_auto_merge', 'delete_branch_on_merge', 'has_downloads', 'is_template')},
+            'description': '', 'homepage': '', 'squash_merge_commit_title': 'PR_TITLE',
+            'squash_merge_commit_message': 'COMMIT_MESSAGES', 'merge_commit_title': 'PR_TITLE',
+            'merge_commit_message': 'PR_BODY'}
+
+    def mock_request(verb, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        if url.endswith('/orgs/org/repos'):
+            resp._content = json.dumps([
+                {**full, 'name': 'complete'},
+                {'name': 'partial', 'private': False},
+                {'name': 'excluded'},
+            ]).encode()
+        else:
+            resp._content = json.dumps({**full, 'name': 'partial', 'has_wiki': True}).encode()
+        return resp
+
+    requester.session.inject_request(mock_request)
+    reconciler = GithubRepositoryReconciler(requester)
+    desired = GithubRepositoryConfig('ignored', **{f: v for f, v in full.items()})
+
+    plan = reconciler.plan_organization('org', desired, include=lambda name: name != 'excluded')
+
+    assert ['complete', 'partial'] == [entry.name for entry in plan]
+    assert [ReconcileAction.Skip, ReconcileAction.Update] == [entry.action for entry in plan]
+    assert {'has_wiki': (True, False)} == plan[1].changes
+    assert ['https://api.github.com/orgs/org/repos', 'https://api.github.com/repos/org/partial'] == [
+        log.url for log in requester.session.logs
+    ]
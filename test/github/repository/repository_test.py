@@ -1,12 +1,13 @@
+import asyncio
 import pytest
 import requests
 import json
 
 from polytope.github.RequestVerb import RequestVerb as RV
-from polytope.github.Session import MockSession
+from polytope.github.Session import AsyncSession, MockSession
 from polytope.github.Token import Token
 
-from polytope.github.repository.Repository import GithubRepository
+from polytope.github.repository.Repository import GithubRepository, create_github_requester
 from polytope.github.repository.RepositoryConfig import GithubRepositoryConfig
 from polytope.github.repository.InternalCode import GithubRepositoryInternalCode as GHIC
 
@@ -153,3 +154,32 @@ def test_invalid_repo_init():
     # invalid user name
     with pytest.raises(AssertionError):
         _ = GithubRepository("test-owner", "malicious/endpoint/like/user?name=kk", Token("test_token"), MockSession)
+
+# Async cases
+
+def test_async_crud_with_shared_requester():
+    requester = create_github_requester(
+        Token("test_token"), session=AsyncSession(MockSession, max_concurrency=4)
+    )
+    repos = [
+        GithubRepository("test-owner", f"test_repo_{i}", Token("test_token"), requester=requester)
+        for i in range(8)
+    ]
+
+    def mock_request(verb: RV, url: str, **kwargs) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = {RV.POST: 201, RV.GET: 200}.get(verb, 404)
+        return resp
+
+    requester.session.session.inject_request(mock_request)
+
+    async def run():
+        created = await asyncio.gather(*[repo.acreate() for repo in repos])
+        fetched = await asyncio.gather(*[repo.aget() for repo in repos])
+        return created, fetched
+
+    created, fetched = asyncio.run(run())
+    requester.session.close()
+
+    assert all(resp.internal_code == GHIC.Success for resp in created + fetched)
+    assert 16 == len(requester.session.session.logs)
@@ -2,7 +2,7 @@ import pytest
 
 import json
 import requests
-from polytope.github.repository.Repository import fetch_message_and_errors
+from polytope.github.repository.Repository import fetch_message_and_errors, parse_polytope_config_stream
 
 def test_fetch_message_and_errors_empty():
     resp = requests.Response()
@@ -34,3 +34,20 @@ def test_fetch_message_and_errors_normal():
 
     assert json.dumps(msg) == error_msg
     assert json.dumps(errors) == errors_detail
+
+def test_parse_polytope_config_stream():
+    listing = [{"type": "dir", "name": "tests"}] * 500 + [{"type": "file", "name": "polytope.yaml"}]
+    data = json.dumps(listing).encode()
+    chunks = [data[i:i + 64] for i in range(0, len(data), 64)]
+
+    assert (True, "detected polytope.yaml file") == parse_polytope_config_stream(chunks)
+    assert (False, "could not detect polytope.yaml file") == parse_polytope_config_stream([json.dumps(listing[:-1])])
+    assert (False, "empty response content") == parse_polytope_config_stream([b"", b""])
+    assert (False, "malformed response content") == parse_polytope_config_stream([b"[{"])
+    assert (False, "non-list response for contents") == parse_polytope_config_stream([b'{"message": "x"}'])
+
+def test_fetch_message_and_errors_malformed():
+    resp = requests.Response()
+    resp._content = b'<html>bad gateway</html>'
+
+    assert (None, None) == fetch_message_and_errors(resp)
@@ -20,3 +20,9 @@ def test_all_verbs():
     """Test method name."""
     for [req, name] in testdata:
         assert req == name
+
+
+def test_idempotent_verbs():
+    idempotent = {RequestVerb.GET, RequestVerb.HEAD, RequestVerb.PUT, RequestVerb.DELETE}
+    for verb in RequestVerb:
+        assert verb.is_idempotent == (verb in idempotent)
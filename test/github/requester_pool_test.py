@@ -0,0 +1,49 @@
+from polytope.github import RequesterPool, Token
+from polytope.github.Session import ConnectionPoolConfig, MockSession, RequestsSession
+from polytope.github.repository.Repository import GithubRepository, GITHUB_API_URL
+
+
+def test_same_key_shares_requester():
+    pool = RequesterPool(SessionClass=MockSession)
+    first = pool.get(Token('token-a'), 'https://api.github.com')
+    second = pool.get(Token('token-a'), 'https://api.github.com')
+
+    assert first is second
+    assert first.session is second.session
+    assert 1 == len(pool)
+
+
+def test_different_keys_do_not_share():
+    pool = RequesterPool(SessionClass=MockSession)
+    a = pool.get(Token('token-a'), 'https://api.github.com')
+    b = pool.get(Token('token-b'), 'https://api.github.com')
+    c = pool.get(Token('token-a'), 'http://localhost:8080')
+
+    assert len({id(a), id(b), id(c)}) == 3
+    assert a.session.headers['Authorization'] == Token('token-a').token
+    assert b.session.headers['Authorization'] == Token('token-b').token
+
+    pool.clear()
+    assert 0 == len(pool)
+
+
+def test_pool_config_applied_to_adapter():
+    config = ConnectionPoolConfig(pool_connections=2, pool_maxsize=64, keep_alive=False)
+    pool = RequesterPool(pool_config=config)
+    requester = pool.get(Token('token-a'), 'https://api.github.com')
+
+    session: RequestsSession = requester.session
+    adapter = session._session.get_adapter('https://api.github.com')
+    assert 64 == adapter._pool_maxsize
+    assert 2 == adapter._pool_connections
+    assert 'close' == session.headers['Connection']
+
+
+def test_repositories_reuse_pooled_requester():
+    pool = RequesterPool(SessionClass=MockSession)
+    token = Token('token-a')
+    repos = [GithubRepository('test-owner', f'repo{i}', token, pool=pool) for i in range(5)]
+
+    assert 1 == len({id(repo._requester) for repo in repos})
+    assert repos[0]._requester.base_url == GITHUB_API_URL
+    assert repos[0]._requester.session.headers['Accept'] == 'application/vnd.github+json'
@@ -1,8 +1,9 @@
+import asyncio
 import pytest
 
 from polytope.github import Token, Requester
 from polytope.github.RequestVerb import RequestVerb
-from polytope.github.Session import MockSession
+from polytope.github.Session import AsyncSession, MockSession
 
 
 def test_auth_injection():
@@ -32,3 +33,23 @@ def test_get_user_method():
     log_entry = session.logs[0]
     assert 'https://api.github.com/user' == log_entry.url
     assert RequestVerb.GET == log_entry.verb
+
+
+def test_async_request():
+    token = Token('token-key-value')
+    session = AsyncSession(MockSession, max_concurrency=4)
+    requester = Requester(token, 'https://api.github.com', session=session)
+
+    async def run():
+        return await asyncio.gather(
+            *[requester.arequest(RequestVerb.GET, f'/user/{i}') for i in range(10)]
+        )
+
+    responses = asyncio.run(run())
+    session.close()
+
+    assert 10 == len(responses)
+    assert 10 == len(session.session.logs)
+    assert session.headers['Authorization'] == token.token
+    assert {f'https://api.github.com/user/{i}' for i in range(10)}\
+        == {log_entry.url for log_entry in session.session.logs}
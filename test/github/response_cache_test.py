@@ -0,0 +1,96 @@
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.ResponseCache import (
+    CACHE_STATUS_HEADER,
+    CachedResponse,
+    DiskResponseCache,
+    LRUResponseCache,
+)
+from polytope.github.Session import MockSession
+
+
+def make_etag_server(content=b'[{"name": "polytope.yaml"}]', etag='"v1"'):
+    """A mock endpoint honoring If-None-Match."""
+    def mock_request(verb, url, **kwargs):
+        resp = requests.Response()
+        headers = kwargs.get('headers') or {}
+        if headers.get('If-None-Match') == etag:
+            resp.status_code = 304
+        else:
+            resp.status_code = 200
+            resp._content = content
+            resp.headers['Content-Type'] = 'application/json; charset=utf-8'
+        resp.headers['ETag'] = etag
+        return resp
+    return mock_request
+
+
+def get_test_requester(cache):
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession, cache=cache)
+    requester.session.inject_request(make_etag_server())
+    return requester
+
+
+def test_not_modified_served_from_cache():
+    cache = LRUResponseCache()
+    requester = get_test_requester(cache)
+
+    first = requester.request(RequestVerb.GET, '/repos/owner/repo/contents')
+    second = requester.request(RequestVerb.GET, '/repos/owner/repo/contents')
+
+    assert 200 == first.status_code and 200 == second.status_code
+    assert first.content == second.content
+    assert CACHE_STATUS_HEADER not in first.headers
+    assert 'HIT' == second.headers[CACHE_STATUS_HEADER]
+    assert [{'name': 'polytope.yaml'}] == second.json()
+
+    logs = requester.session.logs
+    assert 'If-None-Match' not in (logs[0].kwargs.get('headers') or {})
+    assert '"v1"' == logs[1].kwargs['headers']['If-None-Match']
+    assert (1, 1) == (cache.hits, cache.misses)
+
+
+def test_mutations_and_streams_bypass_cache():
+    cache = LRUResponseCache()
+    requester = get_test_requester(cache)
+
+    requester.request(RequestVerb.PATCH, '/repos/owner/repo')
+    requester.request(RequestVerb.GET, '/repos/owner/repo', stream=True)
+
+    assert 0 == len(cache)
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = LRUResponseCache(max_entries=2, max_bytes=10)
+    cache.set('a', CachedResponse(200, b'1234', etag='a'))
+    cache.set('b', CachedResponse(200, b'1234', etag='b'))
+    cache.get('a')
+    cache.set('c', CachedResponse(200, b'1234', etag='c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+    cache.set('d', CachedResponse(200, b'123456789', etag='d'))
+    assert 1 == len(cache)
+    assert 9 == cache.size_in_bytes
+
+    cache.set('e', CachedResponse(200, b'12345678901', etag='e'))
+    assert cache.get('e') is None
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    cache = DiskResponseCache(str(tmp_path / 'cache'))
+    requester = get_test_requester(cache)
+    requester.request(RequestVerb.GET, '/repos/owner/repo/contents')
+
+    # another process sharing the directory revalidates instead of downloading.
+    other = get_test_requester(DiskResponseCache(str(tmp_path / 'cache')))
+    response = other.request(RequestVerb.GET, '/repos/owner/repo/contents')
+
+    assert 'HIT' == response.headers[CACHE_STATUS_HEADER]
+    assert b'[{"name": "polytope.yaml"}]' == response.content
+
+    cache.clear()
+    assert [] == list((tmp_path / 'cache').iterdir())
@@ -0,0 +1,94 @@
+import pytest
+import requests
+
+from polytope.github import Requester, Token
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Retry import RetryPolicy
+from polytope.github.Session import MockSession
+
+
+def make_response(status_code):
+    resp = requests.Response()
+    resp.status_code = status_code
+    return resp
+
+
+def get_test_requester(outcomes, **policy_kwargs):
+    sleeps = []
+    policy = RetryPolicy(sleep=sleeps.append, rand=lambda: 1.0, **policy_kwargs)
+    requester = Requester(Token('token'), 'https://api.github.com', MockSession, retry_policy=policy)
+    queue = list(outcomes)
+
+    def mock_request(verb, url, **kwargs):
+        outcome = queue.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(outcome)
+
+    requester.session.inject_request(mock_request)
+    return requester, sleeps
+
+
+def test_retry_transient_status_with_backoff():
+    requester, sleeps = get_test_requester([502, 503, 200], max_attempts=3, backoff_base=0.5)
+
+    response = requester.request(RequestVerb.GET, '/user')
+
+    assert 200 == response.status_code
+    assert [0.5, 1.0] == sleeps
+    stats = requester.retry_stats
+    assert (1, 3, 2, 0) == (stats.requests, stats.attempts, stats.retries, stats.exhausted)
+    assert 1.5 == stats.retry_wait
+
+
+def test_retry_connection_error():
+    requester, sleeps = get_test_requester([requests.ConnectionError('reset'), 204])
+
+    response = requester.request(RequestVerb.DELETE, '/repos/owner/repo')
+
+    assert 204 == response.status_code
+    assert 1 == requester.retry_stats.retries
+
+
+def test_exhausted_retries_return_last_response():
+    requester, sleeps = get_test_requester([503, 503, 503], max_attempts=3)
+
+    response = requester.request(RequestVerb.GET, '/user')
+
+    assert 503 == response.status_code
+    assert 1 == requester.retry_stats.exhausted
+
+
+def test_exhausted_retries_raise_connection_error():
+    requester, _ = get_test_requester([requests.Timeout('timeout')] * 2, max_attempts=2)
+
+    with pytest.raises(requests.Timeout):
+        requester.request(RequestVerb.GET, '/user')
+    assert 1 == requester.retry_stats.exhausted
+
+
+def test_post_retried_only_on_opt_in():
+    requester, sleeps = get_test_requester([502, 502, 201])
+
+    assert 502 == requester.request(RequestVerb.POST, '/user/repos').status_code
+    assert [] == sleeps
+
+    assert 201 == requester.request(RequestVerb.POST, '/user/repos', allow_retry=True).status_code
+    assert 1 == len(sleeps)
+
+
+def test_retry_time_cap():
+    requester, sleeps = get_test_requester([503, 503, 503, 200], max_attempts=5,
+                                           backoff_base=1.0, max_retry_time=2.5)
+
+    response = requester.request(RequestVerb.GET, '/user')
+
+    # 1.0 + 2.0 exceeds the cap, so only the first retry is made.
+    assert 503 == response.status_code
+    assert [1.0] == sleeps
+
+
+def test_jitter_bounds():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0, rand=lambda: 0.25)
+    assert 0.25 == policy.backoff(0)
+    assert 1.0 == policy.backoff(5)
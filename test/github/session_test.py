@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+import requests
+
+from polytope.github.RequestVerb import RequestVerb
+from polytope.github.Session import AsyncSession, MockSession
+
+
+def test_async_session_concurrency_cap():
+    session = AsyncSession(MockSession, max_concurrency=3)
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def slow_request(verb, url, **kwargs) -> requests.Response:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        resp = requests.Response()
+        resp.status_code = 200
+        return resp
+
+    session.session.inject_request(slow_request)
+
+    async def run():
+        return await asyncio.gather(
+            *[session.arequest(RequestVerb.GET, f'https://example.com/{i}') for i in range(12)]
+        )
+
+    responses = asyncio.run(run())
+    session.close()
+
+    assert 12 == len(responses)
+    assert all(resp.status_code == 200 for resp in responses)
+    assert 1 < max_in_flight <= 3
+
+
+def test_async_session_headers_delegation():
+    session = AsyncSession(MockSession)
+    session.headers['X-Test'] = 'value'
+    assert session.session.headers['X-Test'] == 'value'
+    assert session.request(RequestVerb.GET, 'https://example.com') is not None
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import polytope
+
+
+def run_python(code):
+    src = os.path.dirname(os.path.dirname(polytope.__file__))
+    env = {**os.environ, 'PYTHONPATH': src}
+    return subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_light_imports_do_not_load_heavy_dependencies():
+    output = run_python(
+        'import sys\n'
+        'import polytope, polytope.main, polytope.github, polytope.github.Token\n'
+        'import polytope.github.repository.RepositoryConfig\n'
+        'print(sorted(name for name in ("requests", "dotenv", "asyncio") if name in sys.modules))\n'
+    )
+    assert '[]' == output.strip()
+
+
+def test_exported_names_load_on_first_access():
+    output = run_python(
+        'import sys\n'
+        'import polytope\n'
+        'from polytope.github.RequesterPool import RequesterPool\n'
+        'from polytope.github import Requester\n'
+        'import polytope.github.Requester as by_module\n'
+        'print(Requester.__name__, by_module is Requester, polytope.github.Requester is Requester)\n'
+        'print(polytope.models.Problem.__name__, "requests" in sys.modules)\n'
+    )
+    assert 'Requester True True\nProblem True' == output.strip()
@@ -0,0 +1,211 @@
+import io
+import struct
+
+import pytest
+
+from polytope.models import (
+    Contest,
+    ContestProblem,
+    PackageFormatError,
+    PackageKind,
+    PackageReader,
+    PackageSection,
+    Problem,
+    ProblemChecker,
+    ProblemCheckerTest,
+    ProblemCheckerVerdict,
+    ProblemPublicTest,
+    ProblemSolution,
+    ProblemSolutionType,
+    ProblemStatement,
+    ProblemTest,
+    ProblemTestRaw,
+    ProblemTestScript,
+    ProblemValidator,
+    ProblemValidatorTest,
+    ProblemValidatorVerdict,
+    SourceCode,
+    SourceCodeLanguage,
+    read_contest,
+    read_problem,
+    write_contest,
+    write_problem,
+)
+
+
+def make_problem(_id='abcdefgh', tests=3):
+    return Problem(
+        _id=_id,
+        name='A + B',
+        note='넌 할 수 있어',
+        time_limit_in_ms=1000,
+        memory_limit_in_mib=-1,
+        tags=['math', 'implementation'],
+        owners=['polytope'],
+        statements={
+            'en': ProblemStatement(lang='en', context='Add two numbers.'),
+            'ko': ProblemStatement(lang='ko', context='두 수를 더하세요.'),
+        },
+        checker=ProblemChecker(
+            code=SourceCode(context='int main() {}', lang=SourceCodeLanguage.Cpp20),
+            tests=[
+                ProblemCheckerTest(
+                    _id='chk00001',
+                    input='1 2',
+                    output='3',
+                    answer='3',
+                    expected=ProblemCheckerVerdict.Correct,
+                ),
+            ],
+        ),
+        validator=ProblemValidator(
+            tests=[
+                ProblemValidatorTest(
+                    _id='val00001',
+                    input='1 2 3',
+                    expected=ProblemValidatorVerdict.Invalid,
+                ),
+            ],
+        ),
+        public_tests=[ProblemPublicTest(input='1 2\n', output='3\n', verify_output=True)],
+        tests=[ProblemTestRaw(_id=f'raw{i:05d}', input=f'{i} {i}\n' * 100) for i in range(tests)]
+        + [ProblemTestScript(_id='script01', script='gen 10'), ProblemTest(_id='plain001')],
+        solutions=[
+            ProblemSolution(
+                _id='sol00001',
+                author='polytope',
+                name='main',
+                code=SourceCode(context='print(sum(map(int, input().split())))', lang=SourceCodeLanguage.Python3_10),
+                type=ProblemSolutionType.MainCorrect,
+            ),
+        ],
+    )
+
+
+def dump(write, value):
+    file = io.BytesIO()
+    write(value, file)
+    file.seek(0)
+    return file
+
+
+def test_problem_round_trip():
+    problem = make_problem()
+    assert problem == read_problem(dump(write_problem, problem))
+
+def test_problem_selective_load():
+    problem = make_problem()
+    file = dump(write_problem, problem)
+
+    loaded = read_problem(file, [PackageSection.Solutions])
+    assert problem.name == loaded.name
+    assert problem.tags == loaded.tags
+    assert problem.solutions == loaded.solutions
+    assert [] == loaded.tests
+    assert {} == loaded.statements
+    assert ProblemChecker() == loaded.checker
+
+def test_reader_reads_only_requested_sections():
+    file = dump(write_problem, make_problem(tests=100))
+    reader = PackageReader(file)
+    assert PackageKind.Problem == reader.kind
+    tests = next(e for e in reader.entries if e.section == PackageSection.Tests)
+    assert 100 * 400 < tests.length
+
+    reads = []
+    read = file.read
+    file.read = lambda size=-1: reads.append(size) or read(size)
+    reader.problem([PackageSection.Statements])
+    assert tests.length not in reads
+
+def test_contest_round_trip():
+    contest = Contest(
+        name='Polytope Cup',
+        problems=[
+            ContestProblem(index='A', problem=make_problem('aaaaaaaa')),
+            ContestProblem(index='B', problem=make_problem('bbbbbbbb', tests=0)),
+        ],
+    )
+    file = dump(write_contest, contest)
+    assert contest == read_contest(file)
+
+    file.seek(0)
+    loaded = read_contest(file, indices=['B'], sections=[])
+    assert ['B'] == [p.index for p in loaded.problems]
+    assert 'bbbbbbbb' == loaded.problems[0].problem.id
+    assert [] == loaded.problems[0].problem.solutions
+
+def test_package_at_offset():
+    file = io.BytesIO()
+    file.write(b'prefix')
+    write_problem(make_problem(), file)
+    file.seek(6)
+    assert make_problem() == read_problem(file)
+
+def test_malformed_package():
+    with pytest.raises(PackageFormatError):
+        read_problem(io.BytesIO(b'PLT'))
+    with pytest.raises(PackageFormatError):
+        read_problem(io.BytesIO(b'JSON' + bytes(8)))
+    with pytest.raises(PackageFormatError):
+        read_problem(io.BytesIO(struct.pack('<4sHBBI', b'PLTP', 99, 1, 0, 0)))
+
+    data = dump(write_problem, make_problem()).getvalue()
+    with pytest.raises(PackageFormatError):
+        read_problem(io.BytesIO(data[:-3]))
+
+    # a problem package is not a contest package.
+    with pytest.raises(PackageFormatError):
+        read_contest(io.BytesIO(data))
+
+def corrupt_entry(data, package_start, index, offset=None, length=None):
+    """Rewrite an offset table entry of the package starting at package_start."""
+    data = bytearray(data)
+    at = package_start + 12 + 18 * index
+    section, old_offset, old_length = struct.unpack_from('<HQQ', data, at)
+    struct.pack_into('<HQQ', data, at, section, old_offset if offset is None else offset,
+                     old_length if length is None else length)
+    return bytes(data)
+
+def test_corrupted_offset_table():
+    data = dump(write_problem, make_problem()).getvalue()
+
+    # offsets past 2^63 overflowed seek, lengths past the file were allocated.
+    for corrupted in [
+        corrupt_entry(data, 0, 0, offset=2 ** 64 - 1),
+        corrupt_entry(data, 0, 1, length=2 ** 62),
+        corrupt_entry(data, 0, 1, offset=len(data) - 1, length=2),
+        data[:8] + struct.pack('<I', 2 ** 32 - 1) + data[12:],
+    ]:
+        with pytest.raises(PackageFormatError):
+            read_problem(io.BytesIO(corrupted))
+
+def test_contest_problem_stays_in_its_section():
+    contest = Contest(
+        name='Polytope Cup',
+        problems=[
+            ContestProblem(index='A', problem=make_problem('aaaaaaaa')),
+            ContestProblem(index='B', problem=make_problem('bbbbbbbb')),
+        ],
+    )
+    data = dump(write_contest, contest).getvalue()
+    file = io.BytesIO(data)
+    first, second = [e for e in PackageReader(file).entries if e.section == PackageSection.ContestProblem]
+    file.seek(second.offset)
+    metadata = PackageReader(file).entries[0]
+
+    # the first problem's metadata now points to the valid metadata of the second one.
+    corrupted = corrupt_entry(
+        data, first.offset, 0, offset=second.offset - first.offset + metadata.offset, length=metadata.length
+    )
+    with pytest.raises(PackageFormatError):
+        read_contest(io.BytesIO(corrupted))
+
+def test_unsupported_test_type():
+    class CustomTest(ProblemTestRaw):
+        pass
+
+    problem = make_problem()
+    problem.tests.append(CustomTest(_id='custom01', input=''))
+    with pytest.raises(TypeError):
+        write_problem(problem, io.BytesIO())
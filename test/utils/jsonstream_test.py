@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from polytope.utils import iter_json_array
+
+
+def chunked(text, size):
+    data = text.encode() if isinstance(text, str) else text
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_items_across_chunk_boundaries():
+    items = [{"name": "파일", "size": 12345}, 67890, "a,b]c", [1, [2, 3]], None, 1.5e3]
+    text = json.dumps(items)
+
+    for size in (1, 2, 3, 7, len(text)):
+        assert items == list(iter_json_array(chunked(text, size)))
+
+
+def test_empty_array_and_whitespace():
+    assert [] == list(iter_json_array([" [ ", " ] "]))
+    assert [1, 2] == list(iter_json_array(["\n[1 ,", "\t2]\n"]))
+
+
+def test_stops_reading_early():
+    read = []
+
+    def chunks():
+        for i in range(1000):
+            read.append(i)
+            yield (("[" if i == 0 else ",") + json.dumps({"index": i})).encode()
+        yield b"]"
+
+    for item in iter_json_array(chunks()):
+        if item["index"] == 3:
+            break
+
+    assert len(read) <= 5
+
+
+def test_large_item_is_not_decoded_per_chunk(monkeypatch):
+    item = {"files": [{"name": f"file{i:06d}", "size": i} for i in range(100000)]}
+    text = json.dumps([item, 1])
+    chunks = chunked(text, 8 * 1024)
+    assert 300 < len(chunks)
+
+    calls = []
+    raw_decode = json.JSONDecoder.raw_decode
+    monkeypatch.setattr(json.JSONDecoder, "raw_decode", lambda self, s, idx=0: calls.append(idx) or raw_decode(self, s, idx))
+
+    assert [item, 1] == list(iter_json_array(chunks))
+    # retries double the buffered text, instead of one retry per chunk.
+    assert len(calls) < 20
+
+
+def test_invalid_input():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array([]))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(["[1, 2"]))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(["[1 2]"]))
+    with pytest.raises(ValueError):
+        list(iter_json_array(['{"a": 1}']))
@@ -97,3 +97,167 @@ def test_value_error():
     # Too large count
     with pytest.raises(ValueError):
         uuids = uuidgen.uuid_bulk(1100, '0123456789', 5)
+
+def test_bulk_regenerates_collisions():
+    # 1000 of 10^5 ids collide often, but all must be distinct.
+    gen = uuidgen.PolytopeUUID(alphabet='0123456789', length=5)
+    for _ in range(10):
+        uuids = gen.uuid_bulk(1000)
+        assert 1000 == len(set(uuids))
+        assert all(5 == len(uuid) for uuid in uuids)
+
+def test_bulk_is_uniform():
+    # 256 is not a multiple of 10, so naive byte mapping would be biased.
+    gen = uuidgen.PolytopeUUID(alphabet='0123456789', length=20)
+    text = ''.join(gen.uuid_bulk(5000))
+    counts = [text.count(c) for c in gen.alphabet]
+    expected = len(text) / 10
+    assert all(abs(count - expected) < expected * 0.05 for count in counts)
+
+def test_bulk_non_byte_alphabet():
+    alphabet = 'абвгдежзийклмнопрстуф'
+    uuids = uuidgen.uuid_bulk(count=500, alphabet=alphabet, length=6)
+    assert 500 == len(set(uuids))
+    for uuid in uuids:
+        assert 6 == len(uuid)
+        assert set(uuid) <= set(alphabet)
+
+def test_iter_uuids():
+    gen = uuidgen.PolytopeUUID()
+    uuids = list(gen.iter_uuids(5000))
+    assert 5000 == len(set(uuids))
+    assert all(8 == len(uuid) and set(uuid) <= set(gen.alphabet) for uuid in uuids)
+
+    assert [] == list(gen.iter_uuids(0))
+    with pytest.raises(ValueError):
+        gen.iter_uuids(-1)
+
+def test_iter_uuids_is_lazy():
+    stream = uuidgen.PolytopeUUID().iter_uuids()
+    assert 3 == len({next(stream) for _ in range(3)})
+
+def test_iter_uuids_bounded_partitions():
+    # small partitions force many prefixes, each drawn to its quota.
+    gen = uuidgen.PolytopeUUID('0123456789', 6)
+    uuids = list(gen.iter_uuids(10000, partition_size=100))
+    assert 10000 == len(set(uuids))
+    assert all(6 == len(uuid) for uuid in uuids)
+
+def test_iter_uuids_until_capacity():
+    # 1% of 10^5 ids.
+    gen = uuidgen.PolytopeUUID('0123456789', 5)
+    uuids = list(gen.iter_uuids())
+    assert 1000 <= len(uuids) == len(set(uuids))
+
+    with pytest.raises(ValueError):
+        gen.iter_uuids(1100)
+
+def test_iter_uuids_workers_are_disjoint():
+    gen = uuidgen.PolytopeUUID('0123456789', 6)
+    streams = [list(gen.iter_uuids(2000, worker, 3)) for worker in range(3)]
+    assert all(2000 == len(stream) for stream in streams)
+    assert 6000 == len(set().union(*streams))
+
+    with pytest.raises(ValueError):
+        gen.iter_uuids(10, worker=3, workers=3)
+
+def test_iter_uuids_workers_with_different_counts_are_disjoint():
+    # the prefix picking a worker must not depend on count or partition_size.
+    gen = uuidgen.PolytopeUUID(length=5)
+    first = list(gen.iter_uuids(count=100000, worker=0, workers=2, partition_size=4096))
+    second = list(gen.iter_uuids(count=1000, worker=1, workers=2, partition_size=64))
+    assert 100000 == len(set(first)) and 1000 == len(set(second))
+    assert not set(first) & set(second)
+    assert not {uuid[0] for uuid in first} & {uuid[0] for uuid in second}
+
+def test_pool_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = uuidgen.UUIDPool(uuidgen.PolytopeUUID(), batch_size=64)
+    with ThreadPoolExecutor(8) as executor:
+        batches = list(executor.map(lambda _: pool.get_batch(), range(50)))
+        singles = list(executor.map(lambda _: pool.get(), range(500)))
+    uuids = [uuid for batch in batches for uuid in batch] + singles
+    assert 50 * 64 + 500 == len(set(uuids))
+
+def test_pool_exhausted():
+    pool = uuidgen.UUIDPool(uuidgen.PolytopeUUID('0123456789', 5))
+    assert 1000 <= len(pool.get_batch(1000))
+    with pytest.raises(ValueError):
+        pool.get_batch(1000)
+
+def test_sortable_increases():
+    gen = uuidgen.SortablePolytopeUUID()
+    assert 14 == gen.length
+    assert 9 == gen.time_length
+    uuids = gen.uuid_bulk(10000) + [gen.uuid() for _ in range(100)]
+    uuids += list(gen.iter_uuids(1000))
+    assert uuids == sorted(uuids)
+    assert len(uuids) == len(set(uuids))
+    assert all(14 == len(uuid) and set(uuid) <= set(gen.alphabet) for uuid in uuids)
+
+def test_sortable_follows_clock():
+    now = [uuidgen.SORTABLE_EPOCH + 1000.0]
+    gen = uuidgen.SortablePolytopeUUID(clock=lambda: now[0])
+    first = gen.uuid()
+    now[0] -= 10
+    # clock going back does not break the order.
+    second = gen.uuid()
+    now[0] += 20
+    third = gen.uuid()
+    assert first < second < third
+    assert first[:gen.time_length] == second[:gen.time_length]
+    assert second[:gen.time_length] < third[:gen.time_length]
+
+    # generators sort by time first, whatever their random suffixes.
+    later = uuidgen.SortablePolytopeUUID(clock=lambda: now[0] + 0.002)
+    assert all(uuid < later.uuid() for uuid in gen.uuid_bulk(100))
+
+def test_sortable_borrows_next_tick():
+    # 10^3 suffixes, half used as random start: a burst spills over.
+    gen = uuidgen.SortablePolytopeUUID(
+        '0123456789', 16, clock=lambda: uuidgen.SORTABLE_EPOCH
+    )
+    assert 13 == gen.time_length
+    uuids = gen.uuid_bulk(3000)
+    assert uuids == sorted(uuids) and 3000 == len(set(uuids))
+    assert 3 <= len({uuid[:13] for uuid in uuids})
+
+def test_sortable_workers_are_disjoint():
+    now = lambda: uuidgen.SORTABLE_EPOCH + 5.0
+    gens = [
+        uuidgen.SortablePolytopeUUID('0123456789', 16, worker=worker, workers=3, clock=now)
+        for worker in range(3)
+    ]
+    uuids = [uuid for gen in gens for uuid in gen.uuid_bulk(1000)]
+    assert 3000 == len(set(uuids))
+
+    with pytest.raises(ValueError):
+        gens[0].iter_uuids(10, worker=1, workers=3)
+
+def test_sortable_validation():
+    # time prefix leaves too short a random suffix.
+    with pytest.raises(ValueError):
+        uuidgen.SortablePolytopeUUID(length=11)
+    with pytest.raises(ValueError):
+        uuidgen.SortablePolytopeUUID('0123456789')
+    with pytest.raises(ValueError):
+        uuidgen.SortablePolytopeUUID(alphabet='aaabbbcccdddeee')
+    gen = uuidgen.SortablePolytopeUUID()
+    with pytest.raises(ValueError):
+        gen.length = 8
+    with pytest.raises(ValueError):
+        uuidgen.SortablePolytopeUUID(resolution=0)
+
+    # before the epoch.
+    gen = uuidgen.SortablePolytopeUUID(clock=lambda: 0.0)
+    with pytest.raises(ValueError):
+        gen.uuid()
+
+def test_sortable_with_index(tmp_path):
+    from polytope.utils.uuidindex import UUIDIndex
+
+    gen = uuidgen.SortablePolytopeUUID(index=UUIDIndex(str(tmp_path)))
+    uuids = gen.uuid_bulk(100) + list(gen.iter_uuids(100))
+    assert uuids == sorted(uuids)
+    assert 200 == len(gen.index)
@@ -0,0 +1,97 @@
+import multiprocessing
+
+import pytest
+
+from polytope.utils import uuidindex
+from polytope.utils.uuidgen import PolytopeUUID
+from polytope.utils.uuidindex import UUIDIndex
+
+
+def test_claim_rejects_issued(tmp_path):
+    index = UUIDIndex(str(tmp_path), capacity=1000)
+    assert ['abcde', 'fghij'] == index.claim(['abcde', 'fghij', 'abcde'])
+    assert ['klmno'] == index.claim(['fghij', 'klmno'])
+    assert 'abcde' in index
+    assert 'zzzzz' not in index
+    assert 3 == len(index)
+
+def test_index_persists(tmp_path):
+    UUIDIndex(str(tmp_path)).claim(['abcde', 'fghij'])
+
+    reopened = UUIDIndex(str(tmp_path))
+    assert 2 == len(reopened)
+    assert [] == reopened.claim(['abcde'])
+
+def test_index_sees_other_instances(tmp_path):
+    first = UUIDIndex(str(tmp_path))
+    second = UUIDIndex(str(tmp_path))
+    first.claim(['abcde'])
+    assert [] == second.claim(['abcde'])
+    assert ['fghij'] == second.claim(['fghij'])
+    assert 'fghij' in first
+
+def test_bloom_false_positives_are_confirmed(tmp_path):
+    # a tiny filter answers "maybe" for nearly everything.
+    index = UUIDIndex(str(tmp_path), shards=4, capacity=1)
+    issued = [f'id{i:05d}' for i in range(500)]
+    assert issued == index.claim(issued)
+    fresh = [f'new{i:05d}' for i in range(500)]
+    assert fresh == index.claim(fresh)
+
+def test_shards_are_persisted(tmp_path):
+    UUIDIndex(str(tmp_path), shards=4).claim(['abcde'])
+
+    reopened = UUIDIndex(str(tmp_path))
+    assert 4 == reopened.shards
+    assert 'abcde' in reopened
+    with pytest.raises(ValueError):
+        UUIDIndex(str(tmp_path), shards=8)
+
+def test_warns_without_file_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(uuidindex, 'fcntl', None)
+    with pytest.warns(RuntimeWarning):
+        index = UUIDIndex(str(tmp_path))
+    assert ['abcde'] == index.claim(['abcde'])
+
+def test_claim_rejects_line_break(tmp_path):
+    with pytest.raises(ValueError):
+        UUIDIndex(str(tmp_path)).claim(['ab\ncd'])
+
+def test_allocator_never_repeats(tmp_path):
+    # 2 * 10^4 ids fill a fifth of 10^5, so collisions with issued ids are common.
+    gen = PolytopeUUID('0123456789', 5, index=UUIDIndex(str(tmp_path)))
+    uuids = gen.uuid_bulk(1000) + [gen.uuid() for _ in range(100)]
+    for _ in range(20):
+        uuids += gen.uuid_bulk(1000)
+    assert len(uuids) == len(set(uuids))
+    assert len(uuids) == len(gen.index)
+
+    # at most half of all ids are issued.
+    with pytest.raises(ValueError):
+        gen.uuid_bulk(30000)
+
+def test_reserve(tmp_path):
+    gen = PolytopeUUID(index=UUIDIndex(str(tmp_path)))
+    block = gen.reserve(10)
+    assert 10 == len(block)
+    first = next(block)
+    rest = block.take(9)
+    assert 0 == len(block)
+    with pytest.raises(StopIteration):
+        next(block)
+    with pytest.raises(ValueError):
+        block.take(1)
+
+    issued = [first] + rest
+    assert all(uuid in gen.index for uuid in issued)
+    assert not set(issued) & set(gen.uuid_bulk(100))
+
+def _reserve_in_worker(directory):
+    gen = PolytopeUUID('0123456789', 6, index=UUIDIndex(directory))
+    return [uuid for _ in range(5) for uuid in gen.reserve(400)]
+
+def test_reserve_across_processes(tmp_path):
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        results = pool.map(_reserve_in_worker, [str(tmp_path)] * 4)
+    uuids = [uuid for result in results for uuid in result]
+    assert 8000 == len(set(uuids))